@@ -2,17 +2,18 @@ import functools
 
 from dotenv import load_dotenv
 import uvicorn
-import http.server
 import socketserver
 import threading
-import os
+
+import static_assets
 
 load_dotenv()
 
 
 def run_static_server():
-	directory = os.path.join(os.path.dirname(__file__), "src", "website")
-	handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=directory)
+	# Hashed, precompressed copy of src/website; rebuilt on every start so it never goes stale
+	static_assets.build()
+	handler = functools.partial(static_assets.PrecompressedRequestHandler, directory=static_assets.BUILD_DIR)
 	with socketserver.TCPServer(("", 8080), handler) as httpd:
 		print("Serving static website at http://127.0.0.1:8080")
 		httpd.serve_forever()
@@ -5,6 +5,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from src.api.models.category import Category as Model
+from src.api.util import category_snapshot
 
 
 def create(db: Session, request):
@@ -17,30 +18,24 @@ def create(db: Session, request):
 		db.add(new_item)
 		db.commit()
 		db.refresh(new_item)
+		category_snapshot.load(db)
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 	return new_item
 
 
-def read_all(db: Session) -> List[type[Model]]:
-	try:
-		result = db.query(Model).all()
-	except SQLAlchemyError as e:
-		error = str(e.__dict__['orig'])
-		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-	return result
-
+def read_all() -> List[category_snapshot.CategoryEntry]:
+	"""
+	All categories, served from the in-memory snapshot without a database session.
+	"""
+	return list(category_snapshot.current().items)
 
-def read_one(db: Session, id):
-	try:
-		item = db.query(Model).filter(Model.id == id).first()
-		if not item:
-			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
-	except SQLAlchemyError as e:
-		error = str(e.__dict__['orig'])
-		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+def read_one(id) -> category_snapshot.CategoryEntry:
+	item = category_snapshot.current().by_id.get(id)
+	if not item:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
 	return item
 
 
@@ -52,6 +47,7 @@ def update(db: Session, id, request):
 		update_data = request.model_dump(exclude_unset=True)
 		item.update(update_data, synchronize_session=False)
 		db.commit()
+		category_snapshot.load(db)
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -65,6 +61,7 @@ def delete(db: Session, id):
 			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
 		item.delete(synchronize_session=False)
 		db.commit()
+		category_snapshot.load(db)
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -0,0 +1,62 @@
+"""Batched reads behind the GraphQL data loaders (see schemas/graphql.py).
+
+Each ``*_by_*`` function answers one loader batch with a single ``IN`` query and returns
+results in the order of the requested keys, with None for keys that do not exist.
+"""
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from src.api.models.ingredient import Ingredient
+from src.api.models.pantry_ingredient import PantryIngredient
+from src.api.models.recipe import Recipe
+from src.api.models.user import User
+from src.api.util import category_snapshot, meal_plan
+from src.api.util.category_snapshot import CategoryEntry
+
+
+def recipes_by_id(db: Session, ids: Sequence[int]) -> List[Optional[Recipe]]:
+	found = {recipe.id: recipe for recipe in db.query(Recipe).filter(Recipe.id.in_(set(ids)))}
+	return [found.get(recipe_id) for recipe_id in ids]
+
+
+def ingredients_by_id(db: Session, ids: Sequence[int]) -> List[Optional[Ingredient]]:
+	found = {ingredient.id: ingredient for ingredient in db.query(Ingredient).filter(Ingredient.id.in_(set(ids)))}
+	return [found.get(ingredient_id) for ingredient_id in ids]
+
+
+def categories_by_id(ids: Sequence[int]) -> List[Optional[CategoryEntry]]:
+	# Served from the category snapshot, so no query at all
+	by_id = category_snapshot.current().by_id
+	return [by_id.get(category_id) for category_id in ids]
+
+
+def list_categories() -> List[CategoryEntry]:
+	return list(category_snapshot.current().items)
+
+
+def recipe_ids_by_category(db: Session, category_ids: Sequence[int]) -> List[List[int]]:
+	# The plan index already maps categories to recipes and is kept per catalogue version
+	categories = meal_plan.get_index(db).categories
+	return [sorted(categories.get(category_id, ())) for category_id in category_ids]
+
+
+def users_by_username(db: Session, usernames: Sequence[str]) -> List[Optional[User]]:
+	found = {user.username: user for user in db.query(User).filter(User.username.in_(set(usernames)))}
+	return [found.get(username) for username in usernames]
+
+
+def pantries_by_user(db: Session, user_ids: Sequence[int]) -> List[List[PantryIngredient]]:
+	pantries: Dict[int, List[PantryIngredient]] = {user_id: [] for user_id in user_ids}
+	rows = db.query(PantryIngredient).filter(PantryIngredient.user_id.in_(set(user_ids))).order_by(PantryIngredient.id)
+	for item in rows:
+		pantries[item.user_id].append(item)
+	return [pantries[user_id] for user_id in user_ids]
+
+
+def list_recipes(db: Session, limit: int, offset: int) -> List[Recipe]:
+	return db.query(Recipe).order_by(Recipe.id).offset(offset).limit(limit).all()
+
+
+def list_ingredients(db: Session, limit: int, offset: int) -> List[Ingredient]:
+	return db.query(Ingredient).order_by(Ingredient.id).offset(offset).limit(limit).all()
@@ -0,0 +1,49 @@
+import logging
+
+from fastapi import HTTPException, status
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.api.models.recipe import Recipe
+from src.api.util import images
+
+logger = logging.getLogger(__name__)
+
+# Versioned URLs (?v=...) change whenever image_url does, so they can be cached forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=3600"
+
+
+def read(db: Session, recipe_id: int, size: str, accept: str, versioned: bool):
+	"""
+	A recipe's image at ``size`` (thumb, card, large or placeholder), as WebP when the client
+	accepts it and JPEG otherwise.
+	"""
+	if size not in images.SIZES and size != images.PLACEHOLDER:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+		                    detail=f"Unknown size: {size}. Use one of {', '.join([*images.SIZES, images.PLACEHOLDER])}")
+	try:
+		image_url = db.query(Recipe.image_url).filter(Recipe.id == recipe_id).scalar()
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+	if not image_url:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found!")
+
+	if not images.pipeline.available:
+		return RedirectResponse(image_url, headers={"Cache-Control": REVALIDATE})
+
+	image_format = "webp" if "image/webp" in accept else "jpeg"
+	try:
+		path = images.pipeline.render(image_url, size, image_format)
+	except images.ImageSourceError as e:
+		# The reason can describe internal hosts; keep it in the logs only
+		logger.warning("Image for recipe %s unavailable: %s", recipe_id, e)
+		raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Could not load the recipe image")
+
+	# FileResponse streams from disk (zero-copy where the server supports the pathsend extension)
+	return FileResponse(path, media_type=images.MEDIA_TYPES[image_format], headers={
+		"Cache-Control": IMMUTABLE if versioned else REVALIDATE,
+		"Vary": "Accept",
+	})
@@ -1,29 +1,126 @@
 from typing import List
 
 from fastapi import HTTPException, status, Response
-from fuzzywuzzy import fuzz
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from src.api.models.ingredient import Ingredient as Model
+from src.api.models.ingredient_alias import IngredientAlias
+from src.api.util import catalogue_store, jobs, lazy, spelling
+from src.api.util.live_updates import hub
+from src.api.util.ingredient_names import normalize, resolver
+from src.api.util.search_cache import search_cache, normalize_query
 
+fuzz = lazy.module("fuzzywuzzy.fuzz")
 
-def create(db: Session, request):
-	new_item = Model(
-		name=request.name,
-	)
 
+def _publish(item: Model):
+	hub.publish("ingredient", {"op": "upsert", "item": {"id": item.id, "name": item.name}})
+
+
+def _add(db: Session, name: str) -> Model:
+	new_item = Model(name=name.strip())
+	db.add(new_item)
+	db.flush()
+	jobs.enqueue(db, "reindex_ingredient", {"ingredient_id": new_item.id})
+	return new_item
+
+
+def create(db: Session, request):
+	"""
+	Create an ingredient, or return the existing one when the name normalizes to it
+	(e.g. "butters " for "Butter"), so near-duplicates are never stored.
+	"""
 	try:
-		db.add(new_item)
+		existing = resolver.resolve_ingredient(db, request.name)
+		if existing is not None:
+			return existing
+
+		new_item = _add(db, request.name)
 		db.commit()
 		db.refresh(new_item)
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+	resolver.remember(new_item.normalized_name, new_item.id)
+	spelling.on_ingredient_saved(new_item.id, new_item.name)
+	_publish(new_item)
 	return new_item
 
 
+def create_many(db: Session, request) -> List[type[Model]]:
+	"""
+	Bulk import: resolve every name to its canonical ingredient, creating the missing ones in
+	a single transaction. Results follow the order of the request names.
+	"""
+	try:
+		items_by_key = {}
+		created = []
+		for name in request.names:
+			key = normalize(name)
+			if not key or key in items_by_key:
+				continue
+			item = resolver.resolve_ingredient(db, name)
+			if item is None:
+				item = _add(db, name)
+				created.append(item)
+			items_by_key[key] = item
+		ids = [item.id for item in items_by_key.values()]
+		db.commit()
+		# Reload the instances the commit expired in one query
+		db.query(Model).filter(Model.id.in_(ids)).all()
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	for new_item in created:
+		resolver.remember(new_item.normalized_name, new_item.id)
+		spelling.on_ingredient_saved(new_item.id, new_item.name)
+		_publish(new_item)
+	return list(items_by_key.values())
+
+
+def resolve(db: Session, name: str):
+	"""
+	Get the canonical ingredient a name (or alias) refers to.
+	"""
+	try:
+		item = resolver.resolve_ingredient(db, name)
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+	if item is None:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingredient not found!")
+	return item
+
+
+def create_alias(db: Session, id, request):
+	"""
+	Make another name (e.g. "scallion" for "Green Onion") resolve to an ingredient.
+	"""
+	read_one(db, id)
+	key = normalize(request.name)
+	if not key:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Alias is empty")
+
+	try:
+		existing = resolver.resolve_ingredient(db, request.name)
+		existing_id = existing.id if existing is not None else None
+		if existing_id is not None and existing_id != id:
+			raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+			                    detail=f"Name already refers to ingredient {existing_id}")
+		if existing_id is None:
+			db.add(IngredientAlias(normalized_name=key, ingredient_id=id))
+			db.commit()
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	resolver.remember(key, id)
+	return read_one(db, id)
+
+
 def read_all(db: Session, skip: int = 0, limit: int = 100) -> List[type[Model]]:
 	try:
 		result = db.query(Model).offset(skip).limit(limit).all()
@@ -33,16 +130,33 @@ def read_all(db: Session, skip: int = 0, limit: int = 100) -> List[type[Model]]:
 	return result
 
 
-def search(db: Session, query: str, threshold: int = 60) -> List[type[Model]]:
-	"""Search for ingredients by name with fuzzy matching."""
+def search(db: Session, query: str, threshold: int = 60) -> List[dict]:
+	"""Search for ingredients by name with fuzzy matching.
+
+	Query tokens are completed or spell-corrected through the vocabulary's deletion
+	dictionary, so only ingredients sharing a matching term are fetched and scored.
+	Results are cached until the next catalogue write.
+	"""
+	try:
+		version = catalogue_store.get_store(db).version
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+	# The vocabulary may still be catching up with the store, so its version is part of the key
+	key = search_cache.key("ingredients", version, query, threshold, spelling.vocabulary.version)
+	cached = search_cache.get(key)
+	if cached is not None:
+		return cached
+
+	query = normalize_query(query)
 	try:
-		# Get all ingredients
-		all_ingredients = db.query(Model).all()
+		candidate_ids = spelling.get_vocabulary(db).ingredient_candidates(query)
+		candidates = db.query(Model).filter(Model.id.in_(candidate_ids)).all() if candidate_ids else []
 
 		results = []
-		for ingredient in all_ingredients:
+		for ingredient in candidates:
 			# Calculate fuzzy match score
-			score = fuzz.partial_ratio(query.lower(), ingredient.name.lower())
+			score = fuzz.partial_ratio(query, ingredient.name.lower())
 
 			# Only include if above threshold
 			if score >= threshold:
@@ -55,12 +169,15 @@ def search(db: Session, query: str, threshold: int = 60) -> List[type[Model]]:
 		results.sort(key=lambda x: x['score'], reverse=True)
 
 		# Return just the ingredients, limited to 50
-		return [r['ingredient'] for r in results][:50]
+		rows = [{'id': r['ingredient'].id, 'name': r['ingredient'].name} for r in results][:50]
 
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+	search_cache.put(key, rows)
+	return rows
+
 
 def read_one(db: Session, id):
 	try:
@@ -80,12 +197,21 @@ def update(db: Session, id, request):
 		if not item.first():
 			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
 		update_data = request.model_dump(exclude_unset=True)
+		if update_data.get("name") is not None:
+			# Bulk updates skip the ORM attribute events that normally keep this in sync
+			update_data["normalized_name"] = normalize(update_data["name"])
 		item.update(update_data, synchronize_session=False)
+		jobs.enqueue(db, "reindex_ingredient", {"ingredient_id": int(id)})
 		db.commit()
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-	return item.first()
+
+	updated = item.first()
+	resolver.forget_ingredient(updated.id)
+	spelling.on_ingredient_saved(updated.id, updated.name)
+	_publish(updated)
+	return updated
 
 
 def delete(db: Session, id):
@@ -93,9 +219,15 @@ def delete(db: Session, id):
 		item = db.query(Model).filter(Model.id == id)
 		if not item.first():
 			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+		db.query(IngredientAlias).filter(IngredientAlias.ingredient_id == id).delete(synchronize_session=False)
 		item.delete(synchronize_session=False)
+		jobs.enqueue(db, "reindex_ingredient", {"ingredient_id": int(id)})
 		db.commit()
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	resolver.forget_ingredient(id)
+	spelling.on_ingredient_deleted(id)
+	hub.publish("ingredient", {"op": "delete", "id": int(id)})
 	return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,49 @@
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.api.models.job import Job as Model, JobStatus
+from src.api.util import jobs
+
+
+def create(db: Session, request):
+	if request.name not in jobs.HANDLERS:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown job: {request.name}")
+
+	try:
+		new_item = jobs.enqueue(db, request.name, request.payload)
+		db.commit()
+		db.refresh(new_item)
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+	return new_item
+
+
+def read_all(db: Session, job_status: Optional[JobStatus] = None, skip: int = 0, limit: int = 100) -> List[type[Model]]:
+	"""
+	Get jobs newest first, optionally only those in one status.
+	"""
+	try:
+		query = db.query(Model)
+		if job_status is not None:
+			query = query.filter(Model.status == job_status)
+		result = query.order_by(Model.id.desc()).offset(skip).limit(limit).all()
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+	return result
+
+
+def read_one(db: Session, id):
+	try:
+		item = db.query(Model).filter(Model.id == id).first()
+		if not item:
+			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	return item
@@ -1,29 +1,55 @@
 from typing import List, Optional
 
 from fastapi import HTTPException, status, Response
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, joinedload
 
+from src.api.models.ingredient import Ingredient
 from src.api.models.pantry_ingredient import PantryIngredient as Model
 from src.api.models.user import User as UserModel
+from src.api.util import group_commit, quantities
+from src.api.util.live_updates import hub
+
+# Slack for float sums when comparing held against required amounts
+_EPSILON = 1e-9
+
+
+def _publish(item: Model):
+	"""Push the row to the owner's open event streams, in the shape of GET /pantryingredient/pantry."""
+	hub.publish("pantry", {"op": "upsert", "item": {
+		"id": item.id,
+		"user_id": item.user_id,
+		"ingredient_id": item.ingredient_id,
+		"quantity": item.quantity,
+		"unit": item.unit,
+		"ingredient_name": item.ingredient.name if item.ingredient else None,
+		"amount": item.amount,
+		"dimension": item.dimension,
+	}}, user_id=item.user_id)
 
 
 def create(db: Session, request):
-	new_item = Model(
-		user_id=request.user_id,
-		ingredient_id=request.ingredient_id,
-		quantity=request.quantity,
-		unit=request.unit
-	)
+	def write(session: Session) -> Model:
+		new_item = Model(
+			user_id=request.user_id,
+			ingredient_id=request.ingredient_id,
+			quantity=request.quantity,
+			unit=request.unit
+		)
+		session.add(new_item)
+		session.flush()
+		# Loaded now: with group commit the row is read after the writer's session is closed
+		session.refresh(new_item, ["ingredient"])
+		return new_item
 
 	try:
-		db.add(new_item)
-		db.commit()
-		db.refresh(new_item)
+		new_item = group_commit.write(db, write)
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+	_publish(new_item)
 	return new_item
 
 
@@ -53,6 +79,75 @@ def read_by_user(db: Session, username: str) -> List[type[Model]]:
 	return result
 
 
+def _holdings(db: Session, username: str):
+	"""Query of (ingredient_id, dimension, summed amount) over a user's parsed pantry rows."""
+	return (
+		db.query(Model.ingredient_id, Model.dimension, func.sum(Model.amount))
+		.join(UserModel, UserModel.id == Model.user_id)
+		.filter(UserModel.username == username, Model.dimension.isnot(None))
+		.group_by(Model.ingredient_id, Model.dimension)
+	)
+
+
+def totals(db: Session, username: str) -> List[dict]:
+	"""Everything in a user's pantry summed per ingredient and dimension, in base units."""
+	try:
+		rows = (
+			_holdings(db, username)
+			.add_columns(Ingredient.name)
+			.join(Ingredient, Ingredient.id == Model.ingredient_id)
+			.group_by(Ingredient.name)
+			.order_by(Ingredient.name)
+			.all()
+		)
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	return [
+		{"ingredient_id": ingredient_id, "ingredient_name": name, "dimension": dimension, "amount": amount,
+		 "unit": quantities.BASE_UNITS[dimension]}
+		for ingredient_id, dimension, amount, name in rows
+	]
+
+
+def check(db: Session, username: str, request) -> List[dict]:
+	"""
+	Whether a user's pantry holds at least the requested amount of each ingredient.
+	Requested quantities are converted to base units, so "2 cups" is covered by "1 l".
+	"""
+	required = []
+	for item in request.items:
+		parsed = quantities.parse(item.quantity, item.unit)
+		if parsed is None:
+			raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+			                    detail=f"Cannot parse quantity: {item.quantity} {item.unit}".strip())
+		required.append((item.ingredient_id, parsed))
+
+	try:
+		ingredient_ids = {ingredient_id for ingredient_id, _ in required}
+		held = {
+			(ingredient_id, dimension): amount
+			for ingredient_id, dimension, amount in _holdings(db, username).filter(Model.ingredient_id.in_(ingredient_ids))
+		}
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	results = []
+	for ingredient_id, parsed in required:
+		available = held.get((ingredient_id, parsed.dimension), 0.0)
+		results.append({
+			"ingredient_id": ingredient_id,
+			"dimension": parsed.dimension,
+			"required": parsed.amount,
+			"available": available,
+			"unit": quantities.BASE_UNITS[parsed.dimension],
+			"enough": available + _EPSILON >= parsed.amount,
+		})
+	return results
+
+
 def read_one(db: Session, id):
 	try:
 		item = db.query(Model).filter(Model.id == id).first()
@@ -66,27 +161,48 @@ def read_one(db: Session, id):
 
 
 def update(db: Session, id, request):
-	try:
-		item = db.query(Model).filter(Model.id == id)
-		if not item.first():
+	def write(session: Session):
+		item = session.query(Model).filter(Model.id == id)
+		existing = item.first()
+		if not existing:
 			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
 		update_data = request.model_dump(exclude_unset=True)
+		if "quantity" in update_data or "unit" in update_data:
+			# Bulk updates skip the ORM attribute events that normally keep these in sync
+			update_data.update(quantities.columns_for(
+				update_data.get("quantity", existing.quantity), update_data.get("unit", existing.unit)
+			))
+		previous_owner = existing.user_id
 		item.update(update_data, synchronize_session=False)
-		db.commit()
+		updated = item.options(joinedload(Model.ingredient)).populate_existing().first()
+		return updated, previous_owner
+
+	try:
+		updated, previous_owner = group_commit.write(db, write)
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-	return item.first()
+
+	if updated.user_id != previous_owner:
+		hub.publish("pantry", {"op": "delete", "id": updated.id}, user_id=previous_owner)
+	_publish(updated)
+	return updated
 
 
 def delete(db: Session, id):
-	try:
-		item = db.query(Model).filter(Model.id == id)
-		if not item.first():
+	def write(session: Session) -> int:
+		item = session.query(Model).filter(Model.id == id)
+		existing = item.first()
+		if not existing:
 			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
 		item.delete(synchronize_session=False)
-		db.commit()
+		return existing.user_id
+
+	try:
+		owner = group_commit.write(db, write)
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	hub.publish("pantry", {"op": "delete", "id": int(id)}, user_id=owner)
 	return Response(status_code=status.HTTP_204_NO_CONTENT)
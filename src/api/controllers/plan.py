@@ -0,0 +1,49 @@
+from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.api.controllers import shopping_list
+from src.api.models.recipe import Recipe
+from src.api.schemas.shopping_list import ShoppingListRequest
+from src.api.util import meal_plan, pantry_match
+
+MAX_MEALS = 21
+MAX_TIME_BUDGET_MS = 1000
+
+
+def optimize(db: Session, request, username: str) -> dict:
+	"""
+	Pick ``meals`` recipes that use as much of the user's pantry as possible while needing the
+	fewest extra ingredients, plus the shopping list for them.
+	"""
+	if not 1 <= request.meals <= MAX_MEALS:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"meals must be between 1 and {MAX_MEALS}")
+	if not 1 <= request.time_budget_ms <= MAX_TIME_BUDGET_MS:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+		                    detail=f"time_budget_ms must be between 1 and {MAX_TIME_BUDGET_MS}")
+	if request.purchase_weight < 0:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="purchase_weight must not be negative")
+
+	try:
+		index = meal_plan.get_index(db)
+		pantry = pantry_match.pantry_bitmap(db, username, index.recipe_bitmaps)
+		plan = meal_plan.optimize(index, pantry, request.meals, request.category_ids,
+		                          request.purchase_weight, request.time_budget_ms / 1000)
+		rows = db.query(Recipe.id, Recipe.title, Recipe.image_url).filter(Recipe.id.in_(plan.recipe_ids)).all()
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	recipes = {row.id: {"id": row.id, "title": row.title, "image_url": row.image_url} for row in rows}
+	if plan.recipe_ids:
+		to_buy = shopping_list.build(db, ShoppingListRequest(recipe_ids=plan.recipe_ids), username)
+	else:
+		to_buy = {"recipe_ids": [], "unknown_recipe_ids": [], "in_pantry": 0, "items": []}
+	return {
+		"recipes": [recipes[recipe_id] for recipe_id in plan.recipe_ids if recipe_id in recipes],
+		"pantry_used": plan.pantry_used,
+		"to_buy": plan.to_buy,
+		"score": plan.score,
+		"elapsed_ms": plan.elapsed_ms,
+		"shopping_list": to_buy,
+	}
@@ -1,12 +1,106 @@
-from typing import List
+import base64
+import heapq
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 from fastapi import HTTPException, status, Response
-from fuzzywuzzy import fuzz
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 
-from src.api.models.ingredient import Ingredient
 from src.api.models.recipe import Recipe as Model
+from src.api.models.recipe_similarity import RecipeSimilarity
+from src.api.schemas.recipe import RecipeReadPartial
+from src.api.util import catalogue_store, jobs, lazy, pantry_match, search_index, spelling
+from src.api.util.search_cache import search_cache, normalize_query
+
+fuzz = lazy.module("fuzzywuzzy.fuzz")
+
+# Computed per request rather than stored, so they cannot be selected through ``fields``
+PANTRY_FIELDS = ("pantry_have", "pantry_missing")
+RECIPE_FIELDS = [name for name in RecipeReadPartial.model_fields if name not in PANTRY_FIELDS]
+
+# Columns a list endpoint must load to do its own work, regardless of the requested fields
+CATEGORY_COLUMNS = ("category_id_list",)
+
+# Number of full-text candidates that get re-ranked by fuzzy score
+RERANK_TOP_K = 200
+
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 100
+
+# Scoring stops once a full page of results reaches this score (the maximum, so nothing later can outrank them)
+HIGH_SCORE_CUTOFF = 100
+
+# Rows fuzzy-scored between two updates of a streamed search
+STREAM_CHUNK_SIZE = 2000
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+	"""Validate a comma-separated ``fields`` selection and return the column names.
+
+	Returns None when no selection was given (all columns). The id is always included.
+	"""
+	if not fields:
+		return None
+
+	selected = []
+	for name in fields.split(','):
+		name = name.strip()
+		if name and name not in selected:
+			selected.append(name)
+
+	unknown = [name for name in selected if name not in RECIPE_FIELDS]
+	if unknown:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+		                    detail=f"Unknown field(s): {', '.join(unknown)}")
+
+	if "id" not in selected:
+		selected.insert(0, "id")
+	return selected
+
+
+def _load_columns(query, selected: Optional[List[str]], required=()):
+	"""Restrict the SELECT to the requested columns plus any the caller needs internally."""
+	if selected is None:
+		return query
+	columns = [getattr(Model, name) for name in dict.fromkeys([*selected, *required])]
+	return query.options(load_only(*columns))
+
+
+def _project(items, selected: Optional[List[str]]):
+	"""Reduce ORM rows to dicts holding only the selected fields."""
+	if selected is None:
+		return items
+	return [{name: getattr(item, name) for name in selected} for item in items]
+
+
+def check_threshold(threshold: int) -> int:
+	"""400 unless ``threshold`` is a fuzzy score, i.e. between 0 and 100."""
+	if not 0 <= threshold <= HIGH_SCORE_CUTOFF:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+		                    detail=f"threshold must be between 0 and {HIGH_SCORE_CUTOFF}")
+	return threshold
+
+
+def require_pantry_user(current_user):
+	"""401 unless someone is signed in; pantry matching needs their pantry."""
+	if current_user is None:
+		raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Sign in to match against your pantry",
+		                    headers={"WWW-Authenticate": "Bearer"})
+	return current_user
+
+
+def match_pantry(db: Session, items, current_user) -> List[dict]:
+	"""
+	Add pantry_have / pantry_missing counts for the signed-in user's pantry to list results.
+	"""
+	require_pantry_user(current_user)
+	rows = [item if isinstance(item, dict) else {name: getattr(item, name) for name in RECIPE_FIELDS} for item in items]
+	try:
+		return pantry_match.annotate(db, rows, current_user.username)
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
 
 def create(db: Session, request):
@@ -23,33 +117,37 @@ def create(db: Session, request):
 
 	try:
 		db.add(new_item)
+		jobs.enqueue(db, "rebuild_similar_recipes")
 		db.commit()
 		db.refresh(new_item)
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	spelling.on_recipe_saved(new_item.title)
 	return new_item
 
 
-def read_recent(db: Session, limit: int = 10) -> List[type[Model]]:
+def read_recent(db: Session, limit: int = 10, fields: Optional[List[str]] = None) -> List[type[Model]]:
 	"""
 	Get the most recent recipes ordered by creation date.
 	"""
 	try:
-		result = db.query(Model).order_by(Model.created_at.desc()).limit(limit).all()
+		query = _load_columns(db.query(Model), fields)
+		result = query.order_by(Model.created_at.desc()).limit(limit).all()
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-	return result
+	return _project(result, fields)
 
 
-def read_all(db: Session, skip: int = 0, limit: int = 100) -> List[type[Model]]:
+def read_all(db: Session, skip: int = 0, limit: int = 100, fields: Optional[List[str]] = None) -> List[type[Model]]:
 	try:
-		result = db.query(Model).offset(skip).limit(limit).all()
+		result = _load_columns(db.query(Model), fields).offset(skip).limit(limit).all()
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-	return result
+	return _project(result, fields)
 
 
 def read_one(db: Session, id):
@@ -64,6 +162,27 @@ def read_one(db: Session, id):
 	return item
 
 
+def read_similar(db: Session, id, limit: int = 10, fields: Optional[List[str]] = None) -> List[type[Model]]:
+	"""
+	Get recipes similar to the given one, most similar first.
+	Answered from the precomputed recipe_similarities table; nothing is computed per request.
+	"""
+	read_one(db, id)
+	try:
+		query = _load_columns(db.query(Model), fields)
+		result = (
+			query.join(RecipeSimilarity, RecipeSimilarity.similar_recipe_id == Model.id)
+			.filter(RecipeSimilarity.recipe_id == id)
+			.order_by(RecipeSimilarity.rank)
+			.limit(limit)
+			.all()
+		)
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+	return _project(result, fields)
+
+
 def update(db: Session, id, request):
 	try:
 		item = db.query(Model).filter(Model.id == id)
@@ -71,10 +190,14 @@ def update(db: Session, id, request):
 			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
 		update_data = request.model_dump(exclude_unset=True)
 		item.update(update_data, synchronize_session=False)
+		if "ingredient_id_list" in update_data:
+			jobs.enqueue(db, "rebuild_similar_recipes")
 		db.commit()
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	spelling.on_recipe_saved(update_data.get("title"))
 	return item.first()
 
 
@@ -84,6 +207,7 @@ def delete(db: Session, id):
 		if not item.first():
 			raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
 		item.delete(synchronize_session=False)
+		jobs.enqueue(db, "rebuild_similar_recipes")
 		db.commit()
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
@@ -91,65 +215,287 @@ def delete(db: Session, id):
 	return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-def search(db: Session, query: str, threshold: int = 60) -> List[type[Model]]:
+def _ingredient_score(query: str, store, ingredient_id: int, scores: Dict[int, int]) -> int:
+	"""Fuzzy score of the query against one ingredient name, computed once per query."""
+	score = scores.get(ingredient_id)
+	if score is None:
+		name = store.ingredient_name(ingredient_id)
+		score = scores[ingredient_id] = fuzz.partial_ratio(query, name) if name is not None else 0
+	return score
+
+
+def _fuzzy_score(query: str, store, row: int, ingredient_scores: Dict[int, int]) -> int:
+	"""Best fuzzy match score of the query against a recipe's title, description and ingredient names."""
+	title_score = fuzz.partial_ratio(query, store.titles[row])
+	description_score = fuzz.partial_ratio(query, store.descriptions[row])
+
+	ingredient_score = 0
+	for ingredient_id in store.recipe_ingredients[row]:
+		ingredient_score = max(ingredient_score, _ingredient_score(query, store, ingredient_id, ingredient_scores))
+
+	return max(title_score, description_score, ingredient_score)
+
+
+def _load_ranked(db: Session, ids: List[int], fields: Optional[List[str]]) -> List[type[Model]]:
+	"""Load recipes by id, keeping the order of ``ids``."""
+	if not ids:
+		return []
+	recipes = _load_columns(db.query(Model), fields).filter(Model.id.in_(ids)).all()
+	rank = {recipe_id: position for position, recipe_id in enumerate(ids)}
+	recipes.sort(key=lambda recipe: rank[recipe.id])
+	return recipes
+
+
+def encode_cursor(offset: int) -> str:
+	"""Opaque pagination cursor for a search result offset."""
+	return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+	"""Return the result offset stored in a cursor (0 when no cursor was given)."""
+	if not cursor:
+		return 0
+	try:
+		prefix, _, offset = base64.urlsafe_b64decode(cursor.encode()).decode().partition(":")
+		if prefix == "o" and offset.isdigit():
+			return int(offset)
+	except (ValueError, UnicodeDecodeError):
+		pass
+	raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def search(db: Session, query: str, threshold: int = 60, fields: Optional[List[str]] = None,
+           limit: int = DEFAULT_SEARCH_LIMIT, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
 	"""
-	Search recipes by title, description, or ingredients using fuzzy matching.
-	Returns recipes sorted by relevance score.
+	Search recipes by title, description, instructions or ingredients.
+
+	Returns one page of at most ``limit`` results and the cursor of the next page (None on the
+	last page). Pages are cached per normalized query, threshold, field selection and position
+	until the next catalogue write, so repeated popular searches skip scoring entirely.
 	"""
+	check_threshold(threshold)
+	limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+	offset = decode_cursor(cursor)
+
+	store = _get_store(db)
+	key = search_cache.key("recipes", store.version, query, threshold, tuple(fields or ()), offset, limit,
+	                       spelling.vocabulary.version)
+	page = search_cache.get(key)
+	if page is None:
+		# One extra result tells whether another page exists
+		ranked = _search(db, store, normalize_query(query), threshold, fields, offset + limit + 1)
+		page = _project(ranked[offset:], fields or RECIPE_FIELDS)
+		search_cache.put(key, page)
+
+	next_cursor = encode_cursor(offset + limit) if len(page) > limit else None
+	return page[:limit], next_cursor
+
+
+def search_stream(db: Session, query: str, threshold: int = 60, fields: Optional[List[str]] = None,
+                  limit: int = DEFAULT_SEARCH_LIMIT, current_user=None) -> Iterator[dict]:
+	"""
+	search() in phases, for showing results while scoring is still running.
+
+	Yields ``{"type": "results", "phase": ..., "items": [...]}`` batches: first recipes whose
+	title contains the query ("exact", the highest possible score), then, for every
+	STREAM_CHUNK_SIZE rows fuzzy-scored, the recipes that entered the top ``limit`` ("fuzzy"),
+	each with its ``score``. ``{"type": "progress"}`` follows each chunk and ``{"type": "done"}``
+	ends the stream with the final ranking as ``ids`` (earlier items may have been displaced)
+	and ``next_cursor`` for search(). A cached page is sent as one "cached" batch. Pass
+	``current_user`` to add pantry_have / pantry_missing to every item.
+	"""
+	limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+	projection = fields or RECIPE_FIELDS
+
+	def batch(phase: str, items: List[dict]) -> dict:
+		if current_user is not None:
+			items = match_pantry(db, items, current_user)
+		return {"type": "results", "phase": phase, "items": items}
+
+	store = _get_store(db)
+	key = search_cache.key("recipes", store.version, query, threshold, tuple(fields or ()), 0, limit,
+	                       spelling.vocabulary.version)
+	page = search_cache.get(key)
+	if page is not None:
+		yield batch("cached", page[:limit])
+		yield {"type": "done", "ids": [item["id"] for item in page[:limit]],
+		       "next_cursor": encode_cursor(limit) if len(page) > limit else None}
+		return
+
+	# One extra result tells whether another page exists, as in search()
+	k = limit + 1
+	query = normalize_query(query)
 	try:
-		# Get all recipes
-		all_recipes = db.query(Model).all()
+		rows, ranked = _candidate_rows(db, store, query, k)
+		found: Dict[int, dict] = {}
 
-		# Get all ingredients for ingredient-based search
-		all_ingredients = db.query(Ingredient).all()
-		ingredient_map = {str(ing.id): ing.name for ing in all_ingredients}
+		def load(positions: List[int], scores: Dict[int, int]) -> List[dict]:
+			ids = [store.recipe_ids[rows[position]] for position in positions]
+			items = _project(_load_ranked(db, ids, fields), projection)
+			for item, position in zip(items, positions):
+				item["score"] = scores.get(position)
+				found[item["id"]] = item
+			return items
 
-		results = []
+		# Min-heap of (score, -position) holding the current top k, as in _search()
+		heap = []
+		scores: Dict[int, int] = {}
+		if ranked and threshold <= 0:
+			heap = [(0, -position) for position in range(min(k, len(rows)))]
+			yield batch("ranked", load(list(range(min(limit, len(rows)))), scores))
+		elif threshold <= HIGH_SCORE_CUTOFF:
+			# Exact pass: a title containing the query gets the highest fuzzy score, so these
+			# rank first; taking them in candidate order matches what search() returns
+			exact = list(islice((position for position, row in enumerate(rows) if query in store.titles[row]), k))
+			for position in exact:
+				scores[position] = HIGH_SCORE_CUTOFF
+				heap.append((HIGH_SCORE_CUTOFF, -position))
+			heapq.heapify(heap)
+			if exact:
+				yield batch("exact", load(exact[:limit], scores))
+
+			exact_positions = set(exact)
+			emitted = set(exact)
+			# Counted when the scan reaches them, so earlier rows scoring the maximum through their
+			# description or ingredients still take precedence, as in _search()
+			high_scores = 0
+			ingredient_scores: Dict[int, int] = {}
+			for start in range(0, len(rows), STREAM_CHUNK_SIZE):
+				if high_scores >= k:
+					break
+				entered = []
+				scored = min(start + STREAM_CHUNK_SIZE, len(rows))
+				for position in range(start, scored):
+					if position in exact_positions:
+						score = HIGH_SCORE_CUTOFF
+					else:
+						score = _fuzzy_score(query, store, rows[position], ingredient_scores)
+					if score < threshold:
+						continue
+
+					if position not in exact_positions:
+						entry = (score, -position)
+						if len(heap) < k:
+							heapq.heappush(heap, entry)
+							entered.append(position)
+						elif entry > heap[0]:
+							heapq.heapreplace(heap, entry)
+							entered.append(position)
+						scores[position] = score
+
+					if score >= HIGH_SCORE_CUTOFF:
+						high_scores += 1
+						if high_scores >= k:
+							scored = position + 1
+							break
+
+				in_heap = {-negative for _, negative in heap}
+				new = sorted((position for position in entered if position in in_heap), key=lambda p: (-scores[p], p))
+				if new:
+					emitted.update(new)
+					yield batch("fuzzy", load(new, scores))
+				yield {"type": "progress", "scored": scored, "total": len(rows)}
+
+		final = [-negative for _, negative in sorted(heap, reverse=True)]
+		missing = [position for position in final if store.recipe_ids[rows[position]] not in found]
+		if missing:
+			load(missing, scores)
+		ranked_items = [found[store.recipe_ids[rows[position]]] for position in final]
+	except SQLAlchemyError as e:
+		yield {"type": "error", "detail": str(e.__dict__['orig'])}
+		return
+
+	# The finished ranking serves later search() calls for the same first page
+	search_cache.put(key, [{name: item[name] for name in projection} for item in ranked_items])
+	yield {"type": "done", "ids": [item["id"] for item in ranked_items[:limit]],
+	       "next_cursor": encode_cursor(limit) if len(ranked_items) > limit else None}
+
+
+def _candidate_rows(db: Session, store, query: str, k: int) -> Tuple[Sequence[int], bool]:
+	"""
+	Store rows to score for a query, and whether they are in full-text rank order.
+
+	Candidates come from the full-text index (RERANK_TOP_K, or ``k`` if larger), retried with
+	spelling corrections when it finds nothing; without a full-text backend every row is a candidate.
+	"""
+	candidate_limit = max(RERANK_TOP_K, k)
+	candidate_ids = search_index.match(db, query, candidate_limit)
+	if candidate_ids == []:
+		corrected = spelling.get_vocabulary(db).correct_recipe_query(search_index.tokenize(query))
+		candidate_ids = search_index.match_tokens(db, corrected, candidate_limit)
+		if not candidate_ids:
+			return [], True
+	if candidate_ids:
+		return [row for row in map(store.index_of, candidate_ids) if row is not None], True
+	return range(len(store)), False
 
-		for recipe in all_recipes:
-			# Calculate fuzzy match scores for different fields
-			title_score = fuzz.partial_ratio(query.lower(), recipe.title.lower())
-			description_score = fuzz.partial_ratio(query.lower(),
-			                                       recipe.description.lower() if recipe.description else "")
-
-			# Check ingredient matches
-			ingredient_ids = recipe.ingredient_id_list.split(',') if recipe.ingredient_id_list else []
-			ingredient_score = 0
-			for ing_id in ingredient_ids:
-				ing_id = ing_id.strip()
-				if ing_id in ingredient_map:
-					ing_name = ingredient_map[ing_id]
-					score = fuzz.partial_ratio(query.lower(), ing_name.lower())
-					ingredient_score = max(ingredient_score, score)
-
-			# Take the maximum score from all fields
-			max_score = max(title_score, description_score, ingredient_score)
+
+def _get_store(db: Session):
+	try:
+		return catalogue_store.get_store(db)
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
+def _search(db: Session, store, query: str, threshold: int, fields: Optional[List[str]], k: int) -> List[type[Model]]:
+	"""
+	Return the ``k`` best recipes for search(), best first, ranked against ``store``.
+
+	Candidates come from the database full-text index, best BM25 rank first, and the top
+	RERANK_TOP_K (or ``k`` if larger) are re-ranked by fuzzy score when threshold > 0. When
+	the index finds nothing, misspelled tokens are corrected through the vocabulary and the
+	index is queried again. Without a full-text backend every recipe is fuzzy-scored instead.
+
+	Scoring keeps only the best ``k`` in a heap and stops as soon as ``k`` results reach
+	HIGH_SCORE_CUTOFF, since no later candidate could then displace them.
+	"""
+	try:
+		# Scoring reads the compact catalogue store; only the final top k are loaded as ORM rows
+		rows, ranked = _candidate_rows(db, store, query, k)
+		if ranked and threshold <= 0:
+			return _load_ranked(db, [store.recipe_ids[row] for row in rows[:k]], fields)
+
+		query = query.lower()
+		ingredient_scores: Dict[int, int] = {}
+
+		# Min-heap of (score, -position): the root is the weakest of the current top k
+		heap = []
+		high_scores = 0
+		for position, row in enumerate(rows):
+			score = _fuzzy_score(query, store, row, ingredient_scores)
 
 			# Only include if above threshold
-			if max_score >= threshold:
-				results.append({
-					'recipe': recipe,
-					'score': max_score
-				})
+			if score < threshold:
+				continue
+
+			entry = (score, -position)
+			if len(heap) < k:
+				heapq.heappush(heap, entry)
+			elif entry > heap[0]:
+				heapq.heapreplace(heap, entry)
 
-		# Sort by score (highest first)
-		results.sort(key=lambda x: x['score'], reverse=True)
+			if score >= HIGH_SCORE_CUTOFF:
+				high_scores += 1
+				if high_scores >= k:
+					break
 
-		# Return just the recipes
-		return [r['recipe'] for r in results]
+		# Highest score first; ties keep the full-text rank (or table order)
+		ranked_ids = [store.recipe_ids[rows[-position]] for _, position in sorted(heap, reverse=True)]
+		return _load_ranked(db, ranked_ids, fields)
 
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
 
-def search_by_category(db: Session, category_id: int) -> List[type[Model]]:
+def search_by_category(db: Session, category_id: int, fields: Optional[List[str]] = None) -> List[type[Model]]:
 	"""
 	Search recipes by category ID.
 	Returns all recipes that have the specified category in their category_id_list.
 	"""
 	try:
-		all_recipes = db.query(Model).all()
+		all_recipes = _load_columns(db.query(Model), fields, CATEGORY_COLUMNS).all()
 		category_str = str(category_id)
 
 		# Filter recipes that have this category ID in their comma-separated list
@@ -160,7 +506,7 @@ def search_by_category(db: Session, category_id: int) -> List[type[Model]]:
 				if category_str in category_ids:
 					filtered_recipes.append(recipe)
 
-		return filtered_recipes
+		return _project(filtered_recipes, fields)
 	except SQLAlchemyError as e:
 		error = str(e.__dict__['orig'])
 		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -0,0 +1,133 @@
+"""Rotating refresh tokens, so sessions renew without another Argon2 password check.
+
+A token is ``<selector>.<verifier>``: the selector is stored as-is and indexed for the
+lookup, the verifier only as a SHA-256 digest compared with ``hmac.compare_digest``. Both
+halves are 256-bit random values, so a fast hash is enough; Argon2 is for low-entropy
+passwords. Every refresh spends the presented token and issues a new one in the same
+family. Presenting a spent token again means it was copied, so the whole family is revoked
+and the user has to log in again.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status, Response
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.api.models.refresh_token import RefreshToken as Model
+from src.api.models.user import User
+
+# An idle session (no refresh) expires after this long
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+
+def _now() -> datetime:
+	# Naive UTC, like the other DateTime columns
+	return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _digest(verifier: str) -> str:
+	return hashlib.sha256(verifier.encode()).hexdigest()
+
+
+def _invalid() -> HTTPException:
+	return HTTPException(
+		status_code=status.HTTP_401_UNAUTHORIZED,
+		detail="Invalid refresh token",
+		headers={"WWW-Authenticate": "Bearer"},
+	)
+
+
+def _add(db: Session, user_id: int, family: str) -> str:
+	selector, verifier = secrets.token_urlsafe(32), secrets.token_urlsafe(32)
+	db.add(Model(
+		user_id=user_id,
+		family=family,
+		selector=selector,
+		verifier_hash=_digest(verifier),
+		expires_at=_now() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+	))
+	return f"{selector}.{verifier}"
+
+
+def _lookup(db: Session, token: str) -> Optional[Model]:
+	"""The stored row for ``token``, or None if it is malformed, unknown or does not verify."""
+	selector, _, verifier = token.partition(".")
+	if not selector or not verifier:
+		return None
+	item = db.query(Model).filter(Model.selector == selector).first()
+	if item is None or not hmac.compare_digest(item.verifier_hash, _digest(verifier)):
+		return None
+	return item
+
+
+def _revoke_family(db: Session, family: str, now: datetime):
+	db.query(Model).filter(Model.family == family, Model.revoked_at.is_(None)) \
+		.update({"revoked_at": now}, synchronize_session=False)
+
+
+def issue(db: Session, user_id: int) -> str:
+	"""Start a new token family for a fresh login and return its first refresh token."""
+	try:
+		# The user's expired tokens are dead weight; drop them while we are here
+		db.query(Model).filter(Model.user_id == user_id, Model.expires_at < _now()) \
+			.delete(synchronize_session=False)
+		token = _add(db, user_id, secrets.token_urlsafe(16))
+		db.commit()
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+	return token
+
+
+def rotate(db: Session, token: str) -> Tuple[User, str]:
+	"""Spend ``token`` and return its user with the next token of the family.
+
+	Raises 401 if the token is unknown, expired or revoked, or if its user is gone or
+	inactive. A token that was already spent revokes its whole family before the 401.
+	"""
+	try:
+		item = _lookup(db, token)
+		if item is None or item.revoked_at is not None:
+			raise _invalid()
+		now = _now()
+		if item.expires_at <= now:
+			raise _invalid()
+
+		# Conditional update, so two concurrent refreshes with one token cannot both succeed
+		spent = db.query(Model).filter(Model.id == item.id, Model.used_at.is_(None)) \
+			.update({"used_at": now}, synchronize_session=False)
+		if not spent:
+			_revoke_family(db, item.family, now)
+			db.commit()
+			raise _invalid()
+
+		user = db.query(User).filter(User.id == item.user_id).first()
+		if user is None or not user.is_active:
+			_revoke_family(db, item.family, now)
+			db.commit()
+			raise _invalid()
+
+		new_token = _add(db, user.id, item.family)
+		db.commit()
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+	return user, new_token
+
+
+def revoke(db: Session, token: str):
+	"""Revoke the family of ``token`` (logout). Unknown tokens are ignored."""
+	try:
+		item = _lookup(db, token)
+		if item is not None:
+			_revoke_family(db, item.family, _now())
+			db.commit()
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+	return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,109 @@
+import csv
+import io
+from typing import Iterator, List, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.api.models.ingredient import Ingredient
+from src.api.models.recipe import Recipe
+from src.api.util import pantry_match
+
+# Recipes per list; keeps a single request's work bounded
+MAX_RECIPES = 100
+
+EXPORT_FORMATS = {"text": ("text/plain; charset=utf-8", "txt"), "csv": ("text/csv; charset=utf-8", "csv")}
+
+
+def build(db: Session, request, username: Optional[str] = None) -> dict:
+	"""
+	The union of the ingredients of the requested recipes, minus what the user's pantry holds.
+	Set operations run on the cached recipe ingredient bitmaps (one OR per recipe, one AND NOT
+	for the pantry); the database is only asked for the pantry and the names of what is missing.
+	"""
+	recipe_ids = list(dict.fromkeys(request.recipe_ids))
+	if not recipe_ids:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No recipes given")
+	if len(recipe_ids) > MAX_RECIPES:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {MAX_RECIPES} recipes per list")
+
+	try:
+		recipe_bitmaps = pantry_match.get_bitmaps(db)
+		bitmaps = recipe_bitmaps.bitmaps
+		known = [recipe_id for recipe_id in recipe_ids if recipe_id in bitmaps]
+		needed = 0
+		for recipe_id in known:
+			needed |= bitmaps[recipe_id]
+		pantry = pantry_match.pantry_bitmap(db, username, recipe_bitmaps) if username else 0
+		missing = needed & ~pantry
+
+		names = dict(
+			db.query(Ingredient.id, Ingredient.name).filter(Ingredient.id.in_(list(recipe_bitmaps.decode(missing)))).all()
+		) if missing else {}
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	items = [
+		{
+			"ingredient_id": ingredient_id,
+			"name": name,
+			"recipe_ids": [recipe_id for recipe_id in known if recipe_bitmaps.has(recipe_id, ingredient_id)],
+		}
+		for ingredient_id, name in names.items()
+	]
+	items.sort(key=lambda item: item["name"].lower())
+	return {
+		"recipe_ids": known,
+		"unknown_recipe_ids": [recipe_id for recipe_id in recipe_ids if recipe_id not in bitmaps],
+		"in_pantry": (needed & pantry).bit_count(),
+		"items": items,
+	}
+
+
+def _text_lines(shopping_list: dict, titles: dict) -> Iterator[str]:
+	yield "Shopping list\n"
+	for recipe_id in shopping_list["recipe_ids"]:
+		yield f"  for: {titles.get(recipe_id, recipe_id)}\n"
+	yield "\n"
+	for item in shopping_list["items"]:
+		yield f"[ ] {item['name']}\n"
+	if shopping_list["in_pantry"]:
+		yield f"\n{shopping_list['in_pantry']} more ingredient(s) already in your pantry\n"
+
+
+def _csv_lines(shopping_list: dict, titles: dict) -> Iterator[str]:
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	writer.writerow(["ingredient_id", "ingredient", "recipes"])
+	for item in shopping_list["items"]:
+		writer.writerow([item["ingredient_id"], item["name"], "; ".join(titles.get(i, str(i)) for i in item["recipe_ids"])])
+		yield buffer.getvalue()
+		buffer.seek(0)
+		buffer.truncate()
+	yield buffer.getvalue()
+
+
+def export(db: Session, request, username: Optional[str] = None, export_format: str = "text") -> StreamingResponse:
+	"""
+	The shopping list as a downloadable file (plain-text checklist or CSV), streamed line by line.
+	"""
+	if export_format not in EXPORT_FORMATS:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+		                    detail=f"Unknown format: {export_format}. Use one of {', '.join(EXPORT_FORMATS)}")
+	shopping_list = build(db, request, username)
+	try:
+		titles = dict(db.query(Recipe.id, Recipe.title).filter(Recipe.id.in_(shopping_list["recipe_ids"])).all())
+	except SQLAlchemyError as e:
+		error = str(e.__dict__['orig'])
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+	media_type, extension = EXPORT_FORMATS[export_format]
+	lines = _csv_lines(shopping_list, titles) if export_format == "csv" else _text_lines(shopping_list, titles)
+	return StreamingResponse(
+		(line.encode() for line in lines),
+		media_type=media_type,
+		headers={"Content-Disposition": f'attachment; filename="shopping-list.{extension}"'},
+	)
@@ -1,32 +1,179 @@
+import itertools
+import logging
+import math
 import os
-from typing import Generator
+import threading
+import time
+from typing import Callable, Generator, List, Optional
 
-from sqlalchemy import create_engine
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from sqlalchemy.pool import StaticPool
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./data.db")
 
-if DATABASE_URL.startswith("sqlite:///:memory:"):
-	engine = create_engine(
-		DATABASE_URL,
-		connect_args={"check_same_thread": False},
-		poolclass=StaticPool,
-	)
-else:
-	engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Comma-separated replica URLs for read-only traffic, e.g. "sqlite:///./replica1.db,sqlite:///./replica2.db"
+DATABASE_READ_URLS = os.environ.get("DATABASE_READ_URLS", "")
+
+# Seconds between health probes of a replica, and how long a failed one is skipped
+REPLICA_CHECK_INTERVAL = float(os.environ.get("DATABASE_REPLICA_CHECK_INTERVAL", "10"))
+
+# A client's reads go to the primary for this long after it wrote, so it sees its own changes despite replica lag
+READ_AFTER_WRITE_WINDOW = float(os.environ.get("DATABASE_READ_AFTER_WRITE_WINDOW", "2"))
+
+# Set on responses to requests that wrote; holds the time (epoch seconds) until which the client reads the primary.
+# Carried by the client, so it holds whichever worker serves the next read
+READ_AFTER_WRITE_COOKIE = "read_primary_until"
+
+
+def make_engine(url: str) -> Engine:
+	if not url.startswith("sqlite"):
+		return create_engine(url, pool_pre_ping=True)
+	if url.startswith("sqlite:///:memory:"):
+		return create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+	return create_engine(url, connect_args={"check_same_thread": False})
+
+
+engine = make_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessions for get_read_db; bound per request to a replica (or the primary)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class ReplicaRouter:
+	"""Round-robin choice among healthy read replicas, falling back to the primary.
+
+	A replica is probed with ``SELECT 1`` at most every ``check_interval`` seconds when it is
+	picked; a failed probe takes it out of rotation until its next check is due.
+	"""
+
+	def __init__(self, primary: Engine, replicas: List[Engine], check_interval: float = REPLICA_CHECK_INTERVAL,
+	             read_after_write_window: float = READ_AFTER_WRITE_WINDOW):
+		self.primary = primary
+		self.replicas = replicas
+		self.check_interval = check_interval
+		self.read_after_write_window = read_after_write_window
+		self._checked_at = [float("-inf")] * len(replicas)
+		self._healthy = [True] * len(replicas)
+		self._cycle = itertools.cycle(range(len(replicas))) if replicas else None
+		self._lock = threading.Lock()
+
+	def _probe(self, index: int) -> bool:
+		try:
+			with self.replicas[index].connect() as connection:
+				connection.execute(text("SELECT 1"))
+			return True
+		except SQLAlchemyError:
+			logger.warning("Read replica %s is unavailable", self.replicas[index].url)
+			return False
+
+	def _is_healthy(self, index: int) -> bool:
+		now = time.monotonic()
+		with self._lock:
+			due = now - self._checked_at[index] >= self.check_interval
+			if due:
+				# Claim the probe so concurrent requests keep using the last known state
+				self._checked_at[index] = now
+		if due:
+			healthy = self._probe(index)
+			with self._lock:
+				self._healthy[index] = healthy
+		return self._healthy[index]
+
+	def choose(self, pin_primary: bool = False) -> Engine:
+		"""Engine to serve the next read from; ``pin_primary`` for a client that has just written."""
+		if not self.replicas or pin_primary:
+			return self.primary
+		for _ in range(len(self.replicas)):
+			with self._lock:
+				index = next(self._cycle)
+			if self._is_healthy(index):
+				return self.replicas[index]
+		return self.primary
+
+	def status(self) -> List[dict]:
+		with self._lock:
+			return [
+				{"url": engine.url.render_as_string(hide_password=True), "healthy": healthy}
+				for engine, healthy in zip(self.replicas, self._healthy)
+			]
+
+
+read_router = ReplicaRouter(engine, [make_engine(url.strip()) for url in DATABASE_READ_URLS.split(",") if url.strip()])
+
+
+def configure_read_replicas(urls: List[str], read_after_write_window: Optional[float] = None):
+	"""Replace the replica set (tests, admin tooling); an empty list sends all reads to the primary."""
+	global read_router
+	window = READ_AFTER_WRITE_WINDOW if read_after_write_window is None else read_after_write_window
+	read_router = ReplicaRouter(engine, [make_engine(url) for url in urls], read_after_write_window=window)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_write(session, flush_context):
+	session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_bulk_write(orm_execute_state):
+	if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+		orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_write(session):
+	session.info.pop("wrote", None)
+
+
+def wrote_recently(request: Request) -> bool:
+	"""Whether the client wrote within the read-after-write window (per its cookie)."""
+	try:
+		return float(request.cookies.get(READ_AFTER_WRITE_COOKIE, "")) > time.time()
+	except ValueError:
+		return False
+
+
+def _pin_reads_on_commit(response: Response) -> Callable[[Session], None]:
+	def after_commit(session: Session):
+		window = read_router.read_after_write_window
+		if session.info.pop("wrote", False) and read_router.replicas and window > 0:
+			response.set_cookie(READ_AFTER_WRITE_COOKIE, f"{time.time() + window:.3f}",
+			                    max_age=math.ceil(window), httponly=True, samesite="lax")
+
+	return after_commit
+
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+def get_db(response: Response) -> Generator[Session, None, None]:
 	"""Provide a database session generator for FastAPI dependencies.
 
-	Yields a Session and ensures it is closed after use.
+	Yields a Session and ensures it is closed after use. Committing a write sets the
+	read-after-write cookie on the response (see get_read_db).
 	"""
 	db = SessionLocal()
+	event.listen(db, "after_commit", _pin_reads_on_commit(response))
+	try:
+		yield db
+	finally:
+		db.close()
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+	"""Like get_db, for read-only routes: the session is bound to a healthy read replica.
+
+	Falls back to the primary when no replicas are configured or reachable, and for a client
+	whose request wrote within the read-after-write window. Routes that write (or read what
+	they just wrote in the same request) must use get_db.
+	"""
+	db = ReadSessionLocal(bind=read_router.choose(wrote_recently(request)))
 	try:
 		yield db
 	finally:
@@ -1,26 +1,57 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.api.dependencies.database import Base, engine
+from src.api.dependencies.database import Base, engine, SessionLocal
 from src.api.routers import index
 from src.api.seed import seed_if_needed
+from src.api.util import catalogue, category_snapshot, group_commit, jobs, meal_plan, shared_catalogue, spelling
+from src.api.util.compression import CompressionMiddleware
+
 
-# Ensure DB tables are created (SQLAlchemy models bound to Base)
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	# Schema and demo data are set up at startup rather than on import, so importing the
+	# app (tests, tooling, the import-time budget check) stays cheap
+	Base.metadata.create_all(bind=engine)
+	seed_if_needed()
+	# Notices catalogue writes made by other workers (see util/catalogue.py)
+	catalogue.watcher.start()
+	category_snapshot.load()
+	meal_plan.index.warm()
+	spelling.vocabulary.warm()
 
-# This provides sample data for demo purposes
-seed_if_needed()
+	# Derived tables (similar recipes, search index refreshes) are rebuilt off the request path
+	jobs.runner.start()
+	db = SessionLocal()
+	try:
+		jobs.enqueue(db, "rebuild_similar_recipes")
+		if shared_catalogue.SNAPSHOT_PATH:
+			jobs.enqueue(db, "build_catalogue_snapshot")
+		db.commit()
+	finally:
+		db.close()
+	yield
+	jobs.runner.shutdown()
+	group_commit.committer.shutdown()
+	catalogue.watcher.shutdown()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
+# Negotiated brotli/gzip compression for larger responses (recipe lists, search results)
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
 	CORSMiddleware,
 	allow_origins=origins,
 	allow_credentials=True,
 	allow_methods=["*"],
 	allow_headers=["*"],
+	expose_headers=["X-Next-Cursor"],
 )
 
 index.load_routes(app)
@@ -1,6 +1,12 @@
+from src.api.models.catalogue_version import CatalogueVersion
 from src.api.models.ingredient import Ingredient
+from src.api.models.ingredient_alias import IngredientAlias
+from src.api.models.job import Job, JobStatus
 from src.api.models.pantry_ingredient import PantryIngredient
 from src.api.models.recipe import Recipe
+from src.api.models.recipe_similarity import RecipeSimilarity
+from src.api.models.refresh_token import RefreshToken
 from src.api.models.user import User, Role
 
-__all__ = ["User", "Role", "Ingredient", "PantryIngredient", "Recipe"]
+__all__ = ["User", "Role", "CatalogueVersion", "Ingredient", "IngredientAlias", "Job", "JobStatus", "PantryIngredient", "Recipe", "RecipeSimilarity",
+           "RefreshToken"]
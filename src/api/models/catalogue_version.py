@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DDL, Integer, event
+
+from src.api.dependencies.database import Base
+
+
+class CatalogueVersion(Base):
+	"""Single-row counter incremented by every transaction that writes recipes, ingredients or categories.
+
+	Shared by all workers through the database, so each can tell that another one changed the catalogue
+	(see util/catalogue.py).
+	"""
+	__tablename__ = "catalogue_version"
+
+	id = Column(Integer, primary_key=True)
+	version = Column(Integer, nullable=False, default=0)
+
+	def __repr__(self) -> str:
+		"""Readable representation useful in logs/debugging"""
+		return f"<CatalogueVersion version={self.version}>"
+
+
+event.listen(CatalogueVersion.__table__, "after_create", DDL("INSERT INTO catalogue_version (id, version) VALUES (1, 0)"))
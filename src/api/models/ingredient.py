@@ -10,9 +10,13 @@ class Ingredient(Base):
 
 	id = Column(Integer, primary_key=True, index=True, autoincrement=True)
 	name = Column(String, unique=True, index=True, nullable=False)
+	# Casefolded, trimmed, singular form of name used for lookups and de-duplication
+	normalized_name = Column(String, index=True, nullable=True)
 	created_at = Column(DateTime, default=func.now())
 
 	pantry_ingredients = relationship("src.api.models.pantry_ingredient.PantryIngredient", back_populates="ingredient")
+	aliases = relationship("src.api.models.ingredient_alias.IngredientAlias", back_populates="ingredient",
+	                       cascade="all, delete-orphan", passive_deletes=True)
 
 	def __repr__(self) -> str:
 		"""Readable representation useful in logs/debugging"""
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy.orm import relationship
+
+from src.api.dependencies.database import Base
+
+
+class IngredientAlias(Base):
+	"""SQLAlchemy model mapping an alternative ingredient name (e.g. "scallion") to its canonical ingredient."""
+	__tablename__ = "ingredient_aliases"
+
+	id = Column(Integer, primary_key=True, index=True)
+	normalized_name = Column(String, unique=True, index=True, nullable=False)
+	ingredient_id = Column(Integer, ForeignKey("ingredients.id", ondelete="CASCADE"), index=True, nullable=False)
+	created_at = Column(DateTime, default=func.now())
+
+	ingredient = relationship("src.api.models.ingredient.Ingredient", back_populates="aliases")
+
+	def __repr__(self) -> str:
+		"""Readable representation useful in logs/debugging"""
+		return f"<IngredientAlias normalized_name={self.normalized_name} ingredient_id={self.ingredient_id}>"
@@ -0,0 +1,39 @@
+import enum
+
+from sqlalchemy import Column, Integer, String, DateTime, func, Enum
+
+from src.api.dependencies.database import Base
+
+
+class JobStatus(enum.Enum):
+	"""Lifecycle states of a background job."""
+	Queued = "queued"
+	Running = "running"
+	Succeeded = "succeeded"
+	Failed = "failed"
+
+
+class Job(Base):
+	"""SQLAlchemy Job model: a unit of background work (index rebuilds, denormalization)."""
+	__tablename__ = "jobs"
+
+	id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+	name = Column(String, index=True, nullable=False)
+	payload = Column(String, nullable=True)  # JSON-encoded handler arguments
+	status = Column(Enum(JobStatus), default=JobStatus.Queued, index=True, nullable=False)
+	attempts = Column(Integer, default=0, nullable=False)
+	max_attempts = Column(Integer, default=3, nullable=False)
+	last_error = Column(String, nullable=True)
+	# Runner currently executing the job and until when its claim holds; a live runner keeps
+	# extending the lease, and once it lapses any runner may re-queue the job (see util/jobs.py)
+	owner = Column(String, nullable=True)
+	lease_expires_at = Column(DateTime, index=True, nullable=True)
+	# A queued job is not claimed before this time (retry backoff); None means right away
+	run_after = Column(DateTime, index=True, nullable=True)
+	created_at = Column(DateTime, default=func.now())
+	started_at = Column(DateTime, nullable=True)
+	finished_at = Column(DateTime, nullable=True)
+
+	def __repr__(self) -> str:
+		"""Readable representation useful in logs/debugging"""
+		return f"<Job id={self.id} name={self.name} status={self.status} attempts={self.attempts}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, func
+from sqlalchemy import Column, Integer, Float, ForeignKey, String, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from src.api.dependencies.database import Base
@@ -8,12 +8,20 @@ class PantryIngredient(Base):
 	"""SQLAlchemy Pantry model representing an ingredient in a user's pantry."""
 
 	__tablename__ = "pantry_ingredients"
+	__table_args__ = (
+		# Covers "how much of ingredient X does user U hold" sums without touching the table
+		Index("ix_pantry_ingredients_holdings", "user_id", "ingredient_id", "dimension", "amount"),
+	)
 
 	id = Column(Integer, primary_key=True, index=True)
 	user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 	ingredient_id = Column(Integer, ForeignKey("ingredients.id"), nullable=False)
 	quantity = Column(String, nullable=False)
 	unit = Column(String, nullable=False)
+	# quantity + unit parsed into the base unit of their dimension (see util/quantities.py);
+	# NULL when the text could not be parsed
+	amount = Column(Float, nullable=True)
+	dimension = Column(String, nullable=True)
 	created_at = Column(DateTime, default=func.now())
 	updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
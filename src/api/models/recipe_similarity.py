@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, func
+
+from src.api.dependencies.database import Base
+
+
+class RecipeSimilarity(Base):
+	"""SQLAlchemy model holding precomputed "similar recipes" neighbours, rebuilt in batch."""
+	__tablename__ = "recipe_similarities"
+
+	id = Column(Integer, primary_key=True, index=True)
+	recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), index=True, nullable=False)
+	similar_recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
+	score = Column(Float, nullable=False)
+	rank = Column(Integer, nullable=False)  # 0 = most similar
+	created_at = Column(DateTime, default=func.now())
+
+	def __repr__(self) -> str:
+		"""Readable representation useful in logs/debugging"""
+		return f"<RecipeSimilarity recipe_id={self.recipe_id} similar_recipe_id={self.similar_recipe_id} score={self.score}>"
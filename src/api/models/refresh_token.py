@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+
+from src.api.dependencies.database import Base
+
+
+class RefreshToken(Base):
+	"""SQLAlchemy RefreshToken model: one issued refresh token, stored hashed (see controllers/refresh_token.py).
+
+	Tokens rotate on every use; all tokens descended from one login share a ``family``
+	so that replaying a spent token can revoke the whole chain.
+	"""
+	__tablename__ = "refresh_tokens"
+
+	id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+	user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+	family = Column(String, index=True, nullable=False)
+	# Public half of the token, used for the lookup; the secret half is only kept as a SHA-256 digest
+	selector = Column(String, unique=True, index=True, nullable=False)
+	verifier_hash = Column(String, nullable=False)
+	expires_at = Column(DateTime, nullable=False)
+	used_at = Column(DateTime, nullable=True)  # set when rotated into a new token
+	revoked_at = Column(DateTime, nullable=True)  # set on logout or reuse detection
+	created_at = Column(DateTime, default=func.now())
+
+	def __repr__(self) -> str:
+		"""Readable representation useful in logs/debugging"""
+		return f"<RefreshToken id={self.id} user_id={self.user_id} family={self.family}>"
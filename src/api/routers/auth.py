@@ -5,20 +5,35 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from starlette import status
 
-from src.api.controllers import user as user_controller
+from src.api.controllers import refresh_token as refresh_token_controller, user as user_controller
 from src.api.dependencies.database import get_db
-from src.api.schemas.user import User, UserCreate, UserRead
+from src.api.schemas.user import RefreshRequest, User, UserCreate, UserRead
 from src.api.util.auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_active_user
+from src.api.util.rate_limit import login_rate_limit, register_rate_limit, refresh_rate_limit, auth_concurrency
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-@router.post("/login", response_model=dict)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def _token_response(username: str, refresh_token: str) -> dict:
+	access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+	access_token = create_access_token(
+		data={"sub": username}, expires_delta=access_token_expires
+	)
+	return {
+		"access_token": access_token,
+		"token_type": "bearer",
+		"expires_in": int(access_token_expires.total_seconds()),
+		"refresh_token": refresh_token,
+	}
+
+
+@router.post("/login", response_model=dict, dependencies=[Depends(login_rate_limit), Depends(auth_concurrency)])
+def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
 	"""Authenticate user credentials and return a JWT access token.
 
 	Expects form-data with 'username' (can be username or email) and 'password'.
-	Returns {"access_token": ..., "token_type": "bearer"}.
+	Returns {"access_token": ..., "token_type": "bearer", "expires_in": ..., "refresh_token": ...};
+	the refresh token renews the session at /auth/refresh without the password.
 	"""
 	user = user_controller.authenticate_user(db, form_data.username, form_data.password)
 	if not user:
@@ -28,15 +43,27 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 			headers={"WWW-Authenticate": "Bearer"},
 		)
 
-	access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-	access_token = create_access_token(
-		data={"sub": user.username}, expires_delta=access_token_expires
-	)
-	return {"access_token": access_token, "token_type": "bearer"}
+	return _token_response(user.username, refresh_token_controller.issue(db, user.id))
+
+
+@router.post("/refresh", response_model=dict, dependencies=[Depends(refresh_rate_limit)])
+def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db)):
+	"""Exchange a refresh token for a new access token and a new refresh token.
+
+	The presented token is spent; reusing it afterwards revokes the session (401).
+	"""
+	user, refresh_token = refresh_token_controller.rotate(db, request.refresh_token)
+	return _token_response(user.username, refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(refresh_rate_limit)])
+def logout(request: RefreshRequest, db: Session = Depends(get_db)):
+	"""Revoke a refresh token and every token rotated from the same login."""
+	return refresh_token_controller.revoke(db, request.refresh_token)
 
 
-@router.post("/register", response_model=User)
-async def register_user(request: UserCreate, db: Session = Depends(get_db)):
+@router.post("/register", response_model=User, dependencies=[Depends(register_rate_limit), Depends(auth_concurrency)])
+def register_user(request: UserCreate, db: Session = Depends(get_db)):
 	"""Register a new user if the username and email are not already taken.
 
 	Returns the newly created user's public data.
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.api.dependencies.database import get_read_db
+from src.api.util import catalogue_store
+from src.api.util.images import pipeline
+from src.api.util.auth import get_current_active_admin_user
+from src.api.util.search_cache import search_cache
+
+router = APIRouter(prefix="/cache", tags=["Cache"], dependencies=[Depends(get_current_active_admin_user)])
+
+
+@router.get("/search", response_model=dict)
+def search_cache_stats():
+	"""Hit/miss counters and memory usage of the search result cache."""
+	return search_cache.stats()
+
+
+@router.get("/catalogue", response_model=dict)
+def catalogue_store_stats(db: Session = Depends(get_read_db)):
+	"""Size of the compact catalogue store used by search and pantry matching."""
+	return catalogue_store.get_store(db).stats()
+
+
+@router.get("/images", response_model=dict)
+def image_cache_stats():
+	"""Entries and disk usage of the resized image cache."""
+	return pipeline.cache.stats()
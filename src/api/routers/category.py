@@ -14,14 +14,15 @@ def create(request: CategoryCreate, db: Session = Depends(get_db)):
 	return controller.create(db, request)
 
 
+# Reads are served from an in-memory snapshot that category writes swap atomically
 @router.get("/", response_model=list[CategoryRead])
-def read_all(db: Session = Depends(get_db)):
-	return controller.read_all(db)
+def read_all():
+	return controller.read_all()
 
 
 @router.get("/{category_id}", response_model=CategoryRead)
-def read_one(category_id: int, db: Session = Depends(get_db)):
-	return controller.read_one(db, category_id)
+def read_one(category_id: int):
+	return controller.read_one(category_id)
 
 
 @router.put("/{category_id}", response_model=CategoryRead, dependencies=[Depends(get_current_active_admin_user)])
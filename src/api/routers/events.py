@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from src.api.dependencies.database import SessionLocal
+from src.api.models.user import User as UserModel
+from src.api.util.auth import get_current_user, oauth2_scheme
+from src.api.util.live_updates import HEARTBEAT_INTERVAL, hub
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+async def _current_user_id(token: str) -> int:
+	# A short-lived session rather than get_db: a request-scoped one would stay checked out
+	# for as long as the stream is open
+	db = SessionLocal()
+	try:
+		current_user = await get_current_user(token, db)
+		if not current_user.is_active:
+			raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
+		return db.query(UserModel.id).filter(UserModel.username == current_user.username).scalar()
+	finally:
+		db.close()
+
+
+@router.get("/")
+async def stream(token: str = Depends(oauth2_scheme)):
+	"""
+	Server-sent events for the signed-in user: ``pantry`` and ``ingredient`` changes as
+	``{"op": "upsert", "item": {...}}`` or ``{"op": "delete", "id": ...}``, and ``resync``
+	when the client fell behind and should re-fetch its lists.
+	"""
+	user_id = await _current_user_id(token)
+	subscription = hub.subscribe(user_id)
+
+	async def frames():
+		try:
+			yield b"retry: 5000\n\n"
+			while True:
+				yield await subscription.get(HEARTBEAT_INTERVAL)
+		finally:
+			hub.unsubscribe(subscription)
+
+	return StreamingResponse(frames(), media_type="text/event-stream",
+	                         headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,33 @@
+"""/graphql: read API over recipes, ingredients, categories and the caller's pantry.
+
+strawberry and the schema (schemas/graphql.py) are imported by the first request rather than
+at startup, like the other dependencies only some routes use (see util/lazy.py).
+"""
+from typing import Callable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+PATH = "/graphql"
+METHODS = ["POST", "GET"]
+
+
+class LazyApp:
+	"""ASGI app built by ``factory`` on its first request."""
+
+	def __init__(self, factory: Callable[[], ASGIApp]):
+		self.factory = factory
+		self._app: Optional[ASGIApp] = None
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send):
+		app = self._app
+		if app is None:
+			app = self._app = self.factory()
+		await app(scope, receive, send)
+
+
+def _build() -> ASGIApp:
+	from src.api.schemas.graphql import build_app
+	return build_app()
+
+
+app = LazyApp(_build)
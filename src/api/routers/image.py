@@ -0,0 +1,15 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.orm import Session
+
+from src.api.controllers import image as controller
+from src.api.dependencies.database import get_read_db
+
+router = APIRouter(prefix="/images", tags=["Images"])
+
+
+@router.get("/{recipe_id}/{size}")
+def read(recipe_id: int, size: str, v: Optional[str] = None, accept: str = Header(default=""),
+         db: Session = Depends(get_read_db)):
+	return controller.read(db, recipe_id, size, accept, versioned=v is not None)
@@ -5,6 +5,13 @@ from . import (
 	pantry_ingredient,
 	recipe,
 	category,
+	cache,
+	job,
+	events,
+	image,
+	shopping_list,
+	plan,
+	graphql,
 )
 
 
@@ -15,3 +22,11 @@ def load_routes(app):
 	app.include_router(pantry_ingredient.router)
 	app.include_router(recipe.router)
 	app.include_router(category.router)
+	app.include_router(cache.router)
+	app.include_router(job.router)
+	app.include_router(events.router)
+	app.include_router(image.router)
+	app.include_router(shopping_list.router)
+	app.include_router(plan.router)
+	# A plain route rather than an APIRouter so strawberry is only imported on first use
+	app.add_route(graphql.PATH, graphql.app, methods=graphql.METHODS)
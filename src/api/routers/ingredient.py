@@ -2,9 +2,12 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from src.api.controllers import ingredient as controller
-from src.api.dependencies.database import get_db
-from src.api.schemas.ingredient import IngredientCreate, IngredientUpdate, IngredientRead
-from src.api.util.auth import get_current_active_user
+from src.api.dependencies.database import get_db, get_read_db
+from src.api.schemas.ingredient import (
+	IngredientCreate, IngredientBulkCreate, IngredientAliasCreate, IngredientUpdate, IngredientRead
+)
+from src.api.util.auth import get_current_active_user, get_current_active_admin_user
+from src.api.util.rate_limit import search_rate_limit, search_concurrency
 
 router = APIRouter(prefix="/ingredient", tags=["Ingredients"])
 
@@ -14,21 +17,38 @@ def create(request: IngredientCreate, db: Session = Depends(get_db)):
 	return controller.create(db, request)
 
 
+@router.post("/bulk", response_model=list[IngredientRead], dependencies=[Depends(get_current_active_user)])
+def create_many(request: IngredientBulkCreate, db: Session = Depends(get_db)):
+	return controller.create_many(db, request)
+
+
 @router.get("/", response_model=list[IngredientRead])
-def read_all(db: Session = Depends(get_db)):
+def read_all(db: Session = Depends(get_read_db)):
 	return controller.read_all(db)
 
 
-@router.get("/search/", response_model=list[IngredientRead])
-def search(query: str, threshold: int = 60, db: Session = Depends(get_db)):
+@router.get("/search/", response_model=list[IngredientRead],
+            dependencies=[Depends(search_rate_limit), Depends(search_concurrency)])
+def search(query: str, threshold: int = 60, db: Session = Depends(get_read_db)):
 	return controller.search(db, query, threshold)
 
 
+@router.get("/resolve/", response_model=IngredientRead)
+def resolve(name: str, db: Session = Depends(get_read_db)):
+	return controller.resolve(db, name)
+
+
 @router.get("/{ingredient_id}", response_model=IngredientRead)
-def read_one(ingredient_id: int, db: Session = Depends(get_db)):
+def read_one(ingredient_id: int, db: Session = Depends(get_read_db)):
 	return controller.read_one(db, ingredient_id)
 
 
+@router.post("/{ingredient_id}/aliases", response_model=IngredientRead,
+             dependencies=[Depends(get_current_active_admin_user)])
+def create_alias(ingredient_id: int, request: IngredientAliasCreate, db: Session = Depends(get_db)):
+	return controller.create_alias(db, ingredient_id, request)
+
+
 @router.put("/{ingredient_id}", response_model=IngredientRead, dependencies=[Depends(get_current_active_user)])
 def update(ingredient_id: int, request: IngredientUpdate, db: Session = Depends(get_db)):
 	return controller.update(db, ingredient_id, request)
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.api.controllers import job as controller
+from src.api.dependencies.database import get_db
+from src.api.models.job import JobStatus
+from src.api.schemas.job import JobCreate, JobRead
+from src.api.util.auth import get_current_active_admin_user
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"], dependencies=[Depends(get_current_active_admin_user)])
+
+
+@router.post("/", response_model=JobRead)
+def create(request: JobCreate, db: Session = Depends(get_db)):
+	return controller.create(db, request)
+
+
+@router.get("/", response_model=list[JobRead])
+def read_all(status: Optional[JobStatus] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+	return controller.read_all(db, status, skip, limit)
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def read_one(job_id: int, db: Session = Depends(get_db)):
+	return controller.read_one(db, job_id)
@@ -5,7 +5,10 @@ from sqlalchemy.orm import Session
 
 from src.api.controllers import pantry_ingredient as controller
 from src.api.dependencies.database import get_db
-from src.api.schemas.pantry_ingredient import PantryIngredientCreate, PantryIngredientUpdate, PantryIngredientRead
+from src.api.schemas.pantry_ingredient import (
+	PantryIngredientCreate, PantryIngredientUpdate, PantryIngredientRead, PantryTotal, PantryCheckRequest,
+	PantryCheckResult
+)
 from src.api.schemas.user import User as UserSchema
 from src.api.util.auth import get_current_active_user
 
@@ -38,12 +41,25 @@ def read_my_pantry(current_user: UserSchema = Depends(get_current_active_user),
 			ingredient_id=item.ingredient_id,
 			quantity=item.quantity,
 			unit=item.unit,
-			ingredient_name=item.ingredient.name if item.ingredient else None
+			ingredient_name=item.ingredient.name if item.ingredient else None,
+			amount=item.amount,
+			dimension=item.dimension
 		))
 
 	return result
 
 
+@router.get("/totals", response_model=list[PantryTotal])
+def read_my_totals(current_user: UserSchema = Depends(get_current_active_user), db: Session = Depends(get_db)):
+	return controller.totals(db, current_user.username)
+
+
+@router.post("/check", response_model=list[PantryCheckResult])
+def check(request: PantryCheckRequest, current_user: UserSchema = Depends(get_current_active_user),
+          db: Session = Depends(get_db)):
+	return controller.check(db, current_user.username, request)
+
+
 @router.get("/{pantry_ingredient_id}", response_model=PantryIngredientRead)
 def read_one(pantry_ingredient_id: int, db: Session = Depends(get_db)):
 	return controller.read_one(db, pantry_ingredient_id)
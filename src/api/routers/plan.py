@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.api.controllers import plan as controller
+from src.api.dependencies.database import get_read_db
+from src.api.schemas.plan import PlanRequest, PlanResult
+from src.api.schemas.user import User as UserSchema
+from src.api.util.auth import get_current_active_user
+
+router = APIRouter(prefix="/plans", tags=["Meal Plans"])
+
+
+@router.post("/optimize", response_model=PlanResult)
+def optimize(request: PlanRequest, current_user: UserSchema = Depends(get_current_active_user),
+             db: Session = Depends(get_read_db)):
+	return controller.optimize(db, request, current_user.username)
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from src.api.controllers import recipe as controller
-from src.api.dependencies.database import get_db
-from src.api.schemas.recipe import RecipeCreate, RecipeUpdate, RecipeRead
-from src.api.util.auth import get_current_active_user, get_current_active_admin_user
+from src.api.dependencies.database import get_db, get_read_db
+from src.api.schemas.recipe import RecipeCreate, RecipeUpdate, RecipeRead, RecipeReadPartial
+from src.api.schemas.user import User as UserSchema
+from src.api.util.auth import get_current_active_user, get_current_active_admin_user, get_pantry_user
+from src.api.util.rate_limit import search_rate_limit, search_concurrency
 
 router = APIRouter(prefix="/recipes", tags=["Recipes"])
 
@@ -14,31 +20,72 @@ def create(request: RecipeCreate, db: Session = Depends(get_db)):
 	return controller.create(db, request)
 
 
-@router.get("/", response_model=list[RecipeRead])
-def read_all(db: Session = Depends(get_db)):
-	return controller.read_all(db)
-
-
-@router.get("/recent/", response_model=list[RecipeRead])
-def read_recent(limit: int = 10, db: Session = Depends(get_db)):
-	return controller.read_recent(db, limit)
-
-
-@router.get("/search/", response_model=list[RecipeRead])
-def search(query: str, threshold: int = 60, db: Session = Depends(get_db)):
-	return controller.search(db, query, threshold)
-
-
-@router.get("/category/{category_id}", response_model=list[RecipeRead])
-def search_by_category(category_id: int, db: Session = Depends(get_db)):
-	return controller.search_by_category(db, category_id)
+# List endpoints accept ``fields=title,image_url,...`` to return only those columns (id is always included)
+# and ``pantry_match=true`` to add the signed-in user's pantry_have / pantry_missing counts to each recipe
+@router.get("/", response_model=list[RecipeReadPartial], response_model_exclude_unset=True)
+def read_all(fields: Optional[str] = None, pantry_match: bool = False, db: Session = Depends(get_read_db),
+             current_user: Optional[UserSchema] = Depends(get_pantry_user)):
+	results = controller.read_all(db, fields=controller.parse_fields(fields))
+	return controller.match_pantry(db, results, current_user) if pantry_match else results
+
+
+@router.get("/recent/", response_model=list[RecipeReadPartial], response_model_exclude_unset=True)
+def read_recent(limit: int = 10, fields: Optional[str] = None, pantry_match: bool = False, db: Session = Depends(get_read_db),
+                current_user: Optional[UserSchema] = Depends(get_pantry_user)):
+	results = controller.read_recent(db, limit, fields=controller.parse_fields(fields))
+	return controller.match_pantry(db, results, current_user) if pantry_match else results
+
+
+# Paginated: pass the X-Next-Cursor response header back as ``cursor`` to get the next page
+@router.get("/search/", response_model=list[RecipeReadPartial], response_model_exclude_unset=True,
+            dependencies=[Depends(search_rate_limit), Depends(search_concurrency)])
+def search(response: Response, query: str, threshold: int = 60, fields: Optional[str] = None,
+           limit: int = controller.DEFAULT_SEARCH_LIMIT, cursor: Optional[str] = None, pantry_match: bool = False,
+           db: Session = Depends(get_read_db), current_user: Optional[UserSchema] = Depends(get_pantry_user)):
+	results, next_cursor = controller.search(db, query, threshold, fields=controller.parse_fields(fields),
+	                                         limit=limit, cursor=cursor)
+	if next_cursor:
+		response.headers["X-Next-Cursor"] = next_cursor
+	return controller.match_pantry(db, results, current_user) if pantry_match else results
+
+
+# Newline-delimited JSON events (see controller.search_stream): title matches arrive at once,
+# fuzzy matches as scoring proceeds, and a final ``done`` line carries the ranking
+@router.get("/search/stream", dependencies=[Depends(search_rate_limit), Depends(search_concurrency)])
+def search_stream(query: str, threshold: int = 60, fields: Optional[str] = None,
+                  limit: int = controller.DEFAULT_SEARCH_LIMIT, pantry_match: bool = False,
+                  db: Session = Depends(get_read_db),
+                  current_user: Optional[UserSchema] = Depends(get_pantry_user)):
+	# Validated here: once the stream has started, errors can only be reported as events
+	controller.check_threshold(threshold)
+	selected = controller.parse_fields(fields)
+	user = controller.require_pantry_user(current_user) if pantry_match else None
+	events = controller.search_stream(db, query, threshold, fields=selected, limit=limit, current_user=user)
+	return StreamingResponse((json.dumps(event) + "\n" for event in events), media_type="application/x-ndjson",
+	                         headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/category/{category_id}", response_model=list[RecipeReadPartial], response_model_exclude_unset=True)
+def search_by_category(category_id: int, fields: Optional[str] = None, pantry_match: bool = False,
+                       db: Session = Depends(get_read_db),
+                       current_user: Optional[UserSchema] = Depends(get_pantry_user)):
+	results = controller.search_by_category(db, category_id, fields=controller.parse_fields(fields))
+	return controller.match_pantry(db, results, current_user) if pantry_match else results
 
 
 @router.get("/{recipe_id}", response_model=RecipeRead)
-def read_one(recipe_id: int, db: Session = Depends(get_db)):
+def read_one(recipe_id: int, db: Session = Depends(get_read_db)):
 	return controller.read_one(db, recipe_id)
 
 
+@router.get("/{recipe_id}/similar", response_model=list[RecipeReadPartial], response_model_exclude_unset=True)
+def read_similar(recipe_id: int, limit: int = 10, fields: Optional[str] = None, pantry_match: bool = False,
+                 db: Session = Depends(get_read_db),
+                 current_user: Optional[UserSchema] = Depends(get_pantry_user)):
+	results = controller.read_similar(db, recipe_id, limit, fields=controller.parse_fields(fields))
+	return controller.match_pantry(db, results, current_user) if pantry_match else results
+
+
 @router.put("/{recipe_id}", response_model=RecipeRead, dependencies=[Depends(get_current_active_user)])
 def update(recipe_id: int, request: RecipeUpdate, db: Session = Depends(get_db)):
 	return controller.update(db, recipe_id, request)
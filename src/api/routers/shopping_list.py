@@ -0,0 +1,25 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.api.controllers import shopping_list as controller
+from src.api.dependencies.database import get_read_db
+from src.api.schemas.shopping_list import ShoppingList, ShoppingListRequest
+from src.api.schemas.user import User as UserSchema
+from src.api.util.auth import get_optional_current_user
+
+router = APIRouter(prefix="/shopping-list", tags=["Shopping List"])
+
+
+# Signed-in users get their pantry subtracted; anonymous callers get every ingredient
+@router.post("/", response_model=ShoppingList)
+def create(request: ShoppingListRequest, db: Session = Depends(get_read_db),
+           current_user: Optional[UserSchema] = Depends(get_optional_current_user)):
+	return controller.build(db, request, current_user.username if current_user else None)
+
+
+@router.post("/export")
+def export(request: ShoppingListRequest, format: str = "text", db: Session = Depends(get_read_db),
+           current_user: Optional[UserSchema] = Depends(get_optional_current_user)):
+	return controller.export(db, request, current_user.username if current_user else None, format)
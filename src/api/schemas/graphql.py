@@ -0,0 +1,266 @@
+"""GraphQL schema over recipes, ingredients, categories and the caller's pantry.
+
+Relations resolve through per-request ``DataLoader``s: every ``Recipe.ingredients`` field
+in a response is collected into one ``ingredients_by_id`` call, i.e. one ``IN`` query, and
+repeated ids are served from the loader's cache. Categories come from the category snapshot.
+Depth and estimated complexity are capped (``MAX_DEPTH``, ``MAX_COMPLEXITY``) before
+execution. Imported on the first /graphql request only (see routers/graphql.py).
+"""
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+import strawberry
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from strawberry.asgi import GraphQL
+from strawberry.dataloader import DataLoader
+from strawberry.extensions import AddValidationRules, QueryDepthLimiter
+from strawberry.types import Info
+
+from src.api.controllers import graphql as controller
+from src.api.dependencies import database
+from src.api.util.graphql_limits import complexity_limit
+from src.api.util.id_list import parse_id_list
+from src.api.util.rate_limit import token_subject
+
+T = TypeVar("T")
+
+MAX_DEPTH = 6
+MAX_COMPLEXITY = 5000
+# Largest page a list field returns
+MAX_LIMIT = 100
+DEFAULT_LIMIT = 20
+
+
+async def _read(bind: Engine, fetch: Callable[..., T], *args) -> T:
+	"""Run a controller read on a session bound to ``bind`` (the request's read engine) in the thread pool."""
+
+	def run():
+		db = database.ReadSessionLocal(bind=bind)
+		try:
+			return fetch(db, *args)
+		finally:
+			db.close()
+
+	return await run_in_threadpool(run)
+
+
+def _page(limit: int, offset: int):
+	if not 0 < limit <= MAX_LIMIT:
+		raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+	if offset < 0:
+		raise ValueError("offset must not be negative")
+
+
+@strawberry.type
+class Ingredient:
+	id: int
+	name: str
+
+	@classmethod
+	def from_model(cls, model) -> "Ingredient":
+		return cls(id=model.id, name=model.name)
+
+
+@strawberry.type
+class Category:
+	id: int
+	name: str
+	description: Optional[str]
+
+	@classmethod
+	def from_model(cls, model) -> "Category":
+		return cls(id=model.id, name=model.name, description=model.description)
+
+	@strawberry.field
+	async def recipes(self, info: Info, limit: int = DEFAULT_LIMIT, offset: int = 0) -> List["Recipe"]:
+		_page(limit, offset)
+		recipe_ids = await info.context.category_recipes.load(self.id)
+		loaded = await info.context.recipes.load_many(recipe_ids[offset:offset + limit])
+		return [recipe for recipe in loaded if recipe is not None]
+
+
+@strawberry.type
+class Recipe:
+	id: int
+	title: str
+	description: Optional[str]
+	instructions: str
+	servings: int
+	image_url: str
+	video_embed_url: Optional[str]
+	ingredient_ids: strawberry.Private[List[int]]
+	category_ids: strawberry.Private[List[int]]
+
+	@classmethod
+	def from_model(cls, model) -> "Recipe":
+		return cls(
+			id=model.id,
+			title=model.title,
+			description=model.description,
+			instructions=model.instructions,
+			servings=model.servings,
+			image_url=model.image_url,
+			video_embed_url=model.video_embed_url,
+			ingredient_ids=parse_id_list(model.ingredient_id_list),
+			category_ids=parse_id_list(model.category_id_list),
+		)
+
+	@strawberry.field
+	async def ingredients(self, info: Info) -> List[Ingredient]:
+		loaded = await info.context.ingredients.load_many(self.ingredient_ids)
+		return [ingredient for ingredient in loaded if ingredient is not None]
+
+	@strawberry.field
+	async def categories(self, info: Info) -> List[Category]:
+		loaded = await info.context.categories.load_many(self.category_ids)
+		return [category for category in loaded if category is not None]
+
+
+@strawberry.type
+class PantryItem:
+	id: int
+	ingredient_id: int
+	quantity: str
+	unit: str
+	amount: Optional[float]
+	dimension: Optional[str]
+
+	@classmethod
+	def from_model(cls, model) -> "PantryItem":
+		return cls(
+			id=model.id,
+			ingredient_id=model.ingredient_id,
+			quantity=model.quantity,
+			unit=model.unit,
+			amount=model.amount,
+			dimension=model.dimension,
+		)
+
+	@strawberry.field
+	async def ingredient(self, info: Info) -> Optional[Ingredient]:
+		return await info.context.ingredients.load(self.ingredient_id)
+
+
+@strawberry.type
+class User:
+	username: str
+	email: str
+	user_id: strawberry.Private[int]
+
+	@strawberry.field
+	async def pantry(self, info: Info) -> List[PantryItem]:
+		return await info.context.pantries.load(self.user_id)
+
+
+def _loader(bind: Engine, fetch: Callable[..., Sequence], convert: Optional[Callable] = None) -> DataLoader:
+	async def load(keys: List) -> List:
+		rows = await _read(bind, fetch, keys)
+		if convert is None:
+			return list(rows)
+		return [convert(row) if row is not None else None for row in rows]
+
+	return DataLoader(load_fn=load)
+
+
+@dataclass
+class Context:
+	request: Request
+	response: object
+	# Username from a valid bearer token; the user row is checked by ``Query.me``
+	username: Optional[str]
+	# Replica (or primary) serving this request's reads, chosen once like get_read_db does
+	read_bind: Engine
+	recipes: DataLoader
+	ingredients: DataLoader
+	categories: DataLoader
+	category_recipes: DataLoader
+	users: DataLoader
+	pantries: DataLoader
+
+
+def _pantry_items(db, user_ids):
+	return [[PantryItem.from_model(item) for item in items] for items in controller.pantries_by_user(db, user_ids)]
+
+
+@strawberry.type
+class Query:
+	@strawberry.field
+	async def recipe(self, info: Info, id: int) -> Optional[Recipe]:
+		return await info.context.recipes.load(id)
+
+	@strawberry.field
+	async def recipes(self, info: Info, ids: Optional[List[int]] = None, limit: int = DEFAULT_LIMIT,
+	                  offset: int = 0) -> List[Recipe]:
+		"""Recipes by id (in the given order), or a page of all recipes."""
+		_page(limit, offset)
+		if ids is not None:
+			loaded = await info.context.recipes.load_many(ids[offset:offset + limit])
+			return [recipe for recipe in loaded if recipe is not None]
+		recipes = [Recipe.from_model(row) for row in await _read(info.context.read_bind, controller.list_recipes, limit, offset)]
+		for recipe in recipes:
+			info.context.recipes.prime(recipe.id, recipe)
+		return recipes
+
+	@strawberry.field
+	async def ingredients(self, info: Info, ids: Optional[List[int]] = None, limit: int = DEFAULT_LIMIT,
+	                      offset: int = 0) -> List[Ingredient]:
+		"""Ingredients by id (in the given order), or a page of all ingredients."""
+		_page(limit, offset)
+		if ids is not None:
+			loaded = await info.context.ingredients.load_many(ids[offset:offset + limit])
+			return [ingredient for ingredient in loaded if ingredient is not None]
+		ingredients = [Ingredient.from_model(row) for row in await _read(info.context.read_bind, controller.list_ingredients, limit, offset)]
+		for ingredient in ingredients:
+			info.context.ingredients.prime(ingredient.id, ingredient)
+		return ingredients
+
+	@strawberry.field
+	async def categories(self) -> List[Category]:
+		# The snapshot reloads (a query) after a catalogue change, so not on the event loop
+		return [Category.from_model(entry) for entry in await run_in_threadpool(controller.list_categories)]
+
+	@strawberry.field
+	async def me(self, info: Info) -> Optional[User]:
+		"""The authenticated user, or null without a valid bearer token."""
+		if info.context.username is None:
+			return None
+		user = await info.context.users.load(info.context.username)
+		if user is None or not user.is_active:
+			return None
+		return User(username=user.username, email=user.email, user_id=user.id)
+
+
+schema = strawberry.Schema(
+	query=Query,
+	extensions=[
+		lambda: QueryDepthLimiter(max_depth=MAX_DEPTH),
+		lambda: AddValidationRules([complexity_limit(MAX_COMPLEXITY, MAX_LIMIT)]),
+	],
+)
+
+
+class GraphQLApp(GraphQL):
+	async def get_context(self, request: Request, response) -> Context:
+		async def load_categories(keys: List[int]) -> List[Optional[Category]]:
+			entries = await run_in_threadpool(controller.categories_by_id, keys)
+			return [Category.from_model(entry) if entry is not None else None for entry in entries]
+
+		bind = database.read_router.choose(database.wrote_recently(request))
+		return Context(
+			request=request,
+			response=response,
+			username=token_subject(request),
+			read_bind=bind,
+			recipes=_loader(bind, controller.recipes_by_id, Recipe.from_model),
+			ingredients=_loader(bind, controller.ingredients_by_id, Ingredient.from_model),
+			categories=DataLoader(load_fn=load_categories),
+			category_recipes=_loader(bind, controller.recipe_ids_by_category),
+			users=_loader(bind, controller.users_by_username),
+			pantries=_loader(bind, _pantry_items),
+		)
+
+
+def build_app() -> GraphQLApp:
+	return GraphQLApp(schema, allow_queries_via_get=False)
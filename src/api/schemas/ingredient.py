@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -11,6 +11,15 @@ class IngredientCreate(IngredientBase):
 	pass
 
 
+class IngredientBulkCreate(BaseModel):
+	"""Names to resolve to canonical ingredients, creating any that do not exist yet."""
+	names: List[str]
+
+
+class IngredientAliasCreate(BaseModel):
+	name: str
+
+
 class IngredientUpdate(BaseModel):
 	name: Optional[str] = None
 
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional, Any, Dict
+
+from pydantic import BaseModel
+
+from src.api.models.job import JobStatus
+
+
+class JobCreate(BaseModel):
+	"""Payload used to enqueue a background job by handler name."""
+	name: str
+	payload: Optional[Dict[str, Any]] = None
+
+
+class JobRead(BaseModel):
+	"""Public representation of a background job and its progress."""
+	id: int
+	name: str
+	payload: Optional[str] = None
+	status: JobStatus
+	attempts: int
+	max_attempts: int
+	last_error: Optional[str] = None
+	owner: Optional[str] = None
+	lease_expires_at: Optional[datetime] = None
+	run_after: Optional[datetime] = None
+	created_at: Optional[datetime] = None
+	started_at: Optional[datetime] = None
+	finished_at: Optional[datetime] = None
+
+	model_config = {
+		"from_attributes": True
+	}
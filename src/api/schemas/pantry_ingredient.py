@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -24,7 +24,38 @@ class PantryIngredientUpdate(BaseModel):
 class PantryIngredientRead(PantryIngredientBase):
 	id: int
 	ingredient_name: Optional[str] = None
+	# quantity + unit in the base unit of their dimension (g, ml or piece); None if unparseable
+	amount: Optional[float] = None
+	dimension: Optional[str] = None
 
 	model_config = {
 		"from_attributes": True
 	}
+
+
+class PantryTotal(BaseModel):
+	"""Everything a user holds of one ingredient in one dimension, in its base unit."""
+	ingredient_id: int
+	ingredient_name: Optional[str] = None
+	dimension: str
+	amount: float
+	unit: str
+
+
+class PantryRequirement(BaseModel):
+	ingredient_id: int
+	quantity: str
+	unit: str = ""
+
+
+class PantryCheckRequest(BaseModel):
+	items: List[PantryRequirement]
+
+
+class PantryCheckResult(BaseModel):
+	ingredient_id: int
+	dimension: str
+	required: float
+	available: float
+	unit: str
+	enough: bool
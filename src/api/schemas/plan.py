@@ -0,0 +1,30 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from src.api.schemas.shopping_list import ShoppingList
+
+
+class PlanRequest(BaseModel):
+	meals: int = 5
+	# Only recipes in at least one of these categories
+	category_ids: Optional[List[int]] = None
+	# How much one ingredient to buy counts against one pantry ingredient used
+	purchase_weight: float = 1.0
+	time_budget_ms: int = 80
+
+
+class PlanRecipe(BaseModel):
+	id: int
+	title: str
+	image_url: Optional[str] = None
+
+
+class PlanResult(BaseModel):
+	recipes: List[PlanRecipe]
+	# Distinct pantry ingredients the plan uses / distinct ingredients it needs to buy
+	pantry_used: int
+	to_buy: int
+	score: float
+	elapsed_ms: float
+	shopping_list: ShoppingList
@@ -35,3 +35,23 @@ class RecipeRead(RecipeBase):
 	model_config = {
 		"from_attributes": True
 	}
+
+
+class RecipeReadPartial(BaseModel):
+	"""Recipe returned by list endpoints; only the columns requested via ``fields`` are set."""
+	id: int
+	title: Optional[str] = None
+	description: Optional[str] = None
+	instructions: Optional[str] = None
+	ingredient_id_list: Optional[str] = None
+	category_id_list: Optional[str] = None
+	servings: Optional[int] = None
+	video_embed_url: Optional[str] = None
+	image_url: Optional[str] = None
+	# Set only with ``pantry_match=true``: recipe ingredients the user has / lacks
+	pantry_have: Optional[int] = None
+	pantry_missing: Optional[int] = None
+
+	model_config = {
+		"from_attributes": True
+	}
@@ -0,0 +1,22 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class ShoppingListRequest(BaseModel):
+	recipe_ids: List[int]
+
+
+class ShoppingListItem(BaseModel):
+	ingredient_id: int
+	name: str
+	# Requested recipes that use this ingredient
+	recipe_ids: List[int]
+
+
+class ShoppingList(BaseModel):
+	recipe_ids: List[int]
+	unknown_recipe_ids: List[int]
+	# Ingredients the requested recipes need that are already in the pantry
+	in_pantry: int
+	items: List[ShoppingListItem]
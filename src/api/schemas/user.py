@@ -68,3 +68,8 @@ class UserRead(BaseModel):
 	model_config = {
 		"from_attributes": True
 	}
+
+
+class RefreshRequest(BaseModel):
+	"""Refresh token presented to /auth/refresh or /auth/logout."""
+	refresh_token: str
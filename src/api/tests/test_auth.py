@@ -55,3 +55,118 @@ def test_protected_route(client, test_seed_data, authenticate_demo_user):
 	assert response.status_code == 200
 	data = response.json()
 	assert "Hello" in data["message"]
+
+
+def test_login_rate_limited(client, test_seed_data):
+	from src.api.util import rate_limit
+
+	login_data = {"username": "nosuchuser", "password": "wrongpassword"}
+	try:
+		statuses = [client.post("/auth/login", data=login_data).status_code for _ in range(15)]
+		assert 401 in statuses
+		assert statuses[-1] == 429
+
+		response = client.post("/auth/login", data=login_data)
+		assert response.status_code == 429
+		assert int(response.headers["retry-after"]) > 0
+	finally:
+		rate_limit.backend.reset()
+
+
+def test_refresh_token_rotation(client, test_seed_data, monkeypatch):
+	from src.api.util import auth
+
+	response = client.post("/auth/login", data={"username": "test", "password": "testpassword"})
+	assert response.status_code == 200
+	first = response.json()["refresh_token"]
+
+	hasher_calls = []
+	original_hasher = auth.password_hasher
+	monkeypatch.setattr(auth, "password_hasher", lambda: hasher_calls.append(1) or original_hasher())
+	response = client.post("/auth/refresh", json={"refresh_token": first})
+	assert response.status_code == 200
+	data = response.json()
+	assert data["token_type"] == "bearer"
+	assert data["expires_in"] == auth.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+	second = data["refresh_token"]
+	assert second != first
+	assert not hasher_calls  # no Argon2 on refresh
+
+	response = client.get("/auth/demo", headers={"Authorization": f"Bearer {data['access_token']}"})
+	assert response.status_code == 200
+
+	# The rotated token keeps working; a tampered one does not
+	selector, _, verifier = second.partition(".")
+	response = client.post("/auth/refresh", json={"refresh_token": f"{selector}.{verifier[::-1]}"})
+	assert response.status_code == 401
+	response = client.post("/auth/refresh", json={"refresh_token": second})
+	assert response.status_code == 200
+	assert response.json()["refresh_token"] not in (first, second)
+
+
+def test_refresh_token_reuse_revokes_family(client, test_seed_data):
+	response = client.post("/auth/login", data={"username": "test", "password": "testpassword"})
+	first = response.json()["refresh_token"]
+	second = client.post("/auth/refresh", json={"refresh_token": first}).json()["refresh_token"]
+
+	# Replaying a spent token revokes the token it was rotated into as well
+	response = client.post("/auth/refresh", json={"refresh_token": first})
+	assert response.status_code == 401
+	response = client.post("/auth/refresh", json={"refresh_token": second})
+	assert response.status_code == 401
+
+	# Other logins are unaffected; logout ends them
+	other = client.post("/auth/login", data={"username": "test", "password": "testpassword"}).json()["refresh_token"]
+	response = client.post("/auth/logout", json={"refresh_token": other})
+	assert response.status_code == 204
+	response = client.post("/auth/refresh", json={"refresh_token": other})
+	assert response.status_code == 401
+
+	response = client.post("/auth/refresh", json={"refresh_token": "garbage"})
+	assert response.status_code == 401
+
+
+def test_login_rate_limited_per_account(client, test_seed_data, monkeypatch):
+	"""Test that guessing one account's password from many addresses is still throttled"""
+	from itertools import count
+
+	from src.api.util import rate_limit
+
+	addresses = count()
+	monkeypatch.setattr(rate_limit, "client_ip", lambda request: f"203.0.113.{next(addresses)}")
+	rate_limit.backend.reset()  # earlier logins in this module spent some of the account's budget
+	try:
+		login_data = {"username": "Test", "password": "wrongpassword"}
+		statuses = [client.post("/auth/login", data=login_data).status_code for _ in range(12)]
+		assert statuses[:10] == [401] * 10
+		assert statuses[-1] == 429
+
+		# The same account by another spelling shares the bucket; other accounts do not
+		assert client.post("/auth/login", data={"username": " test ", "password": "x"}).status_code == 429
+		assert client.post("/auth/login", data={"username": "testadmin", "password": "x"}).status_code == 401
+
+		signup = {"username": "limited", "email": "limited@mail.com", "password": "short"}
+		statuses = [client.post("/auth/register", json=signup).status_code for _ in range(6)]
+		assert statuses[-1] == 429
+
+		# Refresh buckets are per token (by selector), so one token cannot be replayed without bound
+		token = {"refresh_token": "stolen.verifier"}
+		statuses = [client.post("/auth/refresh", json=token).status_code for _ in range(11)]
+		assert statuses[:10] == [401] * 10
+		assert statuses[-1] == 429
+		assert client.post("/auth/logout", json={"refresh_token": "stolen.other"}).status_code == 429
+		assert client.post("/auth/refresh", json={"refresh_token": "other.verifier"}).status_code == 401
+	finally:
+		rate_limit.backend.reset()
+
+
+def test_blocking_auth_routes_run_off_the_event_loop():
+	"""Test that routes hashing passwords or querying the database are sync handlers, which FastAPI runs in the threadpool"""
+	import inspect
+
+	from src.api.routers import auth
+
+	assert not inspect.iscoroutinefunction(auth.login_for_access_token)
+	assert not inspect.iscoroutinefunction(auth.register_user)
+	assert not inspect.iscoroutinefunction(auth.refresh_access_token)
+	assert not inspect.iscoroutinefunction(auth.logout)
@@ -122,3 +122,45 @@ def test_create_duplicate_category(client, test_seed_data, authenticate_demo_adm
 
 	response = client.post("/categories/", json=duplicate_category, headers=authenticate_demo_admin_user)
 	assert response.status_code == 400  # Bad request
+
+
+def test_category_reads_use_snapshot(client, test_seed_data, authenticate_demo_admin_user, monkeypatch):
+	"""Test that category reads are served from the in-memory snapshot, which writes swap"""
+	from src.api.util import category_snapshot
+
+	response = client.put("/categories/2", json={"name": "Lunchtime"}, headers=authenticate_demo_admin_user)
+	assert response.status_code == 200
+	snapshot = category_snapshot.current()
+
+	def no_session():
+		raise AssertionError("category reads must not open a database session")
+
+	monkeypatch.setattr(category_snapshot, "SessionLocal", no_session)
+	response = client.get("/categories/2")
+	assert response.status_code == 200
+	assert response.json()["name"] == "Lunchtime"
+	assert len(client.get("/categories/").json()) == len(snapshot.items)
+	assert category_snapshot.current() is snapshot
+
+
+def test_category_snapshot_follows_catalogue_version(client, test_seed_data):
+	"""Test that a category written by another worker shows up once the shared catalogue version is polled"""
+	from sqlalchemy import insert, update
+
+	from src.api.dependencies.database import engine
+	from src.api.models import CatalogueVersion
+	from src.api.models.category import Category
+	from src.api.util import catalogue
+
+	count = len(client.get("/categories/").json())
+
+	# What another worker's session commits, bypassing this process's session events
+	with engine.begin() as connection:
+		connection.execute(insert(Category).values(name="Street Food", description="Written elsewhere"))
+		connection.execute(update(CatalogueVersion).values(version=CatalogueVersion.version + 1))
+	assert len(client.get("/categories/").json()) == count
+
+	# ... until this worker polls the shared version
+	assert catalogue.poll()
+	names = [category["name"] for category in client.get("/categories/").json()]
+	assert len(names) == count + 1 and "Street Food" in names
@@ -0,0 +1,132 @@
+from sqlalchemy import event
+
+from src.api.dependencies.database import SessionLocal, engine
+from src.api.models import Recipe
+from src.api.util import category_snapshot
+
+RECIPES_QUERY = """
+query Recipes($ids: [Int!]) {
+	recipes(ids: $ids, limit: 50) {
+		id
+		title
+		ingredients { id name }
+		categories { id name }
+	}
+}
+"""
+
+
+def _graphql(client, query, headers=None, variables=None):
+	return client.post("/graphql", json={"query": query, "variables": variables}, headers=headers)
+
+
+def test_graphql_batches_relations(client, test_seed_data):
+	"""Test that ingredients for a page of recipes are loaded with one IN query"""
+	db = SessionLocal()
+	try:
+		recipes = [Recipe(
+			title=f"GraphQL recipe {n}", instructions="Cook.", servings=2, image_url="https://example.com/x.jpg",
+			ingredient_id_list=f"{1 + n % 5},{2 + n % 7}", category_id_list="1",
+		) for n in range(50)]
+		db.add_all(recipes)
+		db.commit()
+		ids = [recipe.id for recipe in recipes]
+	finally:
+		db.close()
+
+	category_snapshot.current()
+	statements = []
+
+	def record(conn, cursor, statement, parameters, context, executemany):
+		statements.append(statement)
+
+	event.listen(engine, "before_cursor_execute", record)
+	try:
+		response = _graphql(client, RECIPES_QUERY, variables={"ids": ids})
+	finally:
+		event.remove(engine, "before_cursor_execute", record)
+
+	assert response.status_code == 200
+	body = response.json()
+	assert "errors" not in body
+	recipes = body["data"]["recipes"]
+	assert [recipe["id"] for recipe in recipes] == ids
+	assert all(recipe["ingredients"] for recipe in recipes)
+	assert all(recipe["categories"][0]["id"] == 1 for recipe in recipes)
+
+	# One IN query per type; categories come from the in-memory snapshot
+	for table in ("recipes", "ingredients"):
+		queries = [statement for statement in statements if f"FROM {table}" in statement]
+		assert len(queries) == 1
+		assert " IN " in queries[0]
+	assert not [statement for statement in statements if "FROM categories" in statement]
+
+
+def test_graphql_me_and_pantry(client, test_seed_data, authenticate_demo_user):
+	"""Test that the caller's pantry is only visible with a valid token"""
+	query = "{ me { username pantry { quantity unit ingredient { name } } } }"
+
+	response = _graphql(client, query)
+	assert response.status_code == 200
+	assert response.json()["data"]["me"] is None
+
+	response = _graphql(client, query, headers=authenticate_demo_user)
+	assert response.status_code == 200
+	me = response.json()["data"]["me"]
+	assert me["username"] == "test"
+	assert all(item["ingredient"]["name"] for item in me["pantry"])
+
+
+def test_graphql_limits(client, test_seed_data):
+	"""Test that overly deep or expensive queries are rejected before execution"""
+	nested = "{ categories { recipes(limit: 5) { categories { recipes(limit: 5) { id } } } } }"
+	body = _graphql(client, nested).json()
+	assert "errors" not in body
+	assert body["data"]["categories"]
+
+	too_deep = "{ categories { recipes { categories { recipes { categories { recipes { categories { id } } } } } } } }"
+	body = _graphql(client, too_deep).json()
+	assert body["data"] is None
+	assert any("exceeds maximum operation depth" in error["message"] for error in body["errors"])
+
+	expensive = "{ " + " ".join(
+		f"r{n}: recipes(limit: 100) {{ id title ingredients {{ id name }} categories {{ id name }} }}" for n in range(3)
+	) + " }"
+	body = _graphql(client, expensive).json()
+	assert body["data"] is None
+	assert "complexity" in body["errors"][0]["message"]
+
+	# A variable limit is costed at the largest page
+	variable = "query Page($limit: Int!) { a: recipes(limit: $limit) { ingredients { id name } categories { id } } " \
+	           "b: recipes(limit: $limit) { ingredients { id name } categories { id } } }"
+	body = _graphql(client, variable, variables={"limit": 1}).json()
+	assert "complexity" in body["errors"][0]["message"]
+
+	body = _graphql(client, "{ recipes(limit: 500) { id } }").json()
+	assert "limit must be between" in body["errors"][0]["message"]
+
+
+def test_graphql_category_reads_run_off_the_event_loop(client, test_seed_data, monkeypatch):
+	"""Test that category resolvers, which may reload the snapshot, run in the thread pool"""
+	import asyncio
+
+	from src.api.controllers import graphql as controller
+
+	on_loop = []
+
+	def watched(fetch):
+		def run(*args):
+			try:
+				asyncio.get_running_loop()
+				on_loop.append(fetch.__name__)
+			except RuntimeError:
+				pass
+			return fetch(*args)
+		return run
+
+	monkeypatch.setattr(controller, "categories_by_id", watched(controller.categories_by_id))
+	monkeypatch.setattr(controller, "list_categories", watched(controller.list_categories))
+	response = _graphql(client, "{ categories { id } recipes(limit: 5) { categories { id } } }")
+	assert response.status_code == 200 and "errors" not in response.json()
+	assert response.json()["data"]["categories"]
+	assert on_loop == []
@@ -0,0 +1,37 @@
+import os
+
+from src.api.util import import_profile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def test_parse_importtime_output():
+	output = (
+		"import time: self [us] | cumulative | imported package\n"
+		"import time:       120 |        120 |   _io\n"
+		"import time:      1500 |       4000 |     json.decoder\n"
+		"import time:       800 |       4800 | json\n"
+		"unrelated warning line\n"
+	)
+	timings = import_profile.parse(output)
+	assert [timing.module for timing in timings] == ["_io", "json.decoder", "json"]
+	assert timings[1] == import_profile.ImportTiming("json.decoder", 1500, 4000, 2)
+	assert import_profile.total_ms(timings, "json") == 4.8
+
+	table = import_profile.format_table(timings, limit=2, sort="self")
+	lines = table.splitlines()
+	assert len(lines) == 4
+	assert lines[2].startswith("json.decoder")
+
+
+def test_cold_import_within_budget():
+	timings = import_profile.profile(cwd=ROOT)
+	total = import_profile.total_ms(timings)
+	assert total <= import_profile.IMPORT_TIME_BUDGET_MS, (
+		f"Importing {import_profile.APP_MODULE} took {total:.0f} ms "
+		f"(budget {import_profile.IMPORT_TIME_BUDGET_MS:.0f} ms):\n"
+		+ import_profile.format_table(timings, limit=15)
+	)
+
+	imported = {timing.module.split(".")[0] for timing in timings}
+	assert not imported & set(import_profile.LAZY_MODULES)
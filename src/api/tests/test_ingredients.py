@@ -43,3 +43,113 @@ def test_delete_ingredient(client, test_seed_data, authenticate_demo_user):
 
 	response = client.get(f"/ingredient/1")
 	assert response.status_code == 404
+
+
+def test_search_ingredients_misspelled(client, test_seed_data):
+	response = client.get("/ingredient/search/", params={"query": "potatos", "threshold": 60})
+	assert response.status_code == 200
+	data = response.json()
+	assert any(ingredient["name"] == "Potatoes" for ingredient in data)
+
+	response = client.get("/ingredient/search/", params={"query": "chicharon"})
+	assert response.status_code == 200
+	assert any(ingredient["name"] == "Chicharron" for ingredient in response.json())
+
+
+def test_create_ingredient_resolves_near_duplicates(client, test_seed_data, authenticate_demo_user, authenticate_demo_admin_user):
+	butter = client.get("/ingredient/resolve/", params={"name": "Butter"}).json()
+
+	for variant in ("butter ", "BUTTERS"):
+		response = client.post("/ingredient", json={"name": variant}, headers=authenticate_demo_user)
+		assert response.status_code == 200
+		assert response.json()["id"] == butter["id"]
+
+	response = client.post("/ingredient/bulk", json={"names": ["potato", "Saffron", "saffron", "Leeks"]},
+	                       headers=authenticate_demo_user)
+	assert response.status_code == 200
+	names = [ingredient["name"] for ingredient in response.json()]
+	assert names == ["Potatoes", "Saffron", "Leek"]
+
+	response = client.post(f"/ingredient/{butter['id']}/aliases", json={"name": "Beurre"}, headers=authenticate_demo_admin_user)
+	assert response.status_code == 200
+	assert client.get("/ingredient/resolve/", params={"name": "beurre"}).json()["id"] == butter["id"]
+
+	response = client.post("/ingredient/8/aliases", json={"name": "beurre"}, headers=authenticate_demo_admin_user)
+	assert response.status_code == 409
+	assert client.get("/ingredient/resolve/", params={"name": "margarine"}).status_code == 404
+
+
+def test_create_ingredient_after_delete_in_another_worker(client, test_seed_data, authenticate_demo_user):
+	"""Test that a cached name -> id entry left behind by another worker's delete or rename is dropped"""
+	from src.api.dependencies.database import SessionLocal
+	from src.api.models import Ingredient
+
+	response = client.post("/ingredient", json={"name": "Sumac"}, headers=authenticate_demo_user)
+	sumac_id = response.json()["id"]
+	response = client.post("/ingredient", json={"name": "Za'atar"}, headers=authenticate_demo_user)
+	zaatar_id = response.json()["id"]
+
+	# Direct writes, so this worker's resolver still maps the names to the old rows
+	db = SessionLocal()
+	try:
+		db.query(Ingredient).filter(Ingredient.id == sumac_id).delete()
+		db.get(Ingredient, zaatar_id).name = "Dukkah"
+		db.commit()
+	finally:
+		db.close()
+
+	response = client.post("/ingredient", json={"name": "sumac"}, headers=authenticate_demo_user)
+	assert response.status_code == 200
+	assert response.json()["id"] != sumac_id
+	assert client.get("/ingredient/resolve/", params={"name": "Sumac"}).json()["id"] == response.json()["id"]
+
+	assert client.get("/ingredient/resolve/", params={"name": "za'atar"}).status_code == 404
+	response = client.post("/ingredient/bulk", json={"names": ["Za'atar", "Dukkah"]}, headers=authenticate_demo_user)
+	assert [item["name"] for item in response.json()] == ["Za'atar", "Dukkah"]
+	assert response.json()[1]["id"] == zaatar_id
+
+
+def test_vocabulary_follows_writes_from_another_worker(client, test_seed_data):
+	"""Test that the spelling vocabulary is rebuilt after another process changed the catalogue"""
+	import time
+
+	from sqlalchemy import insert, select, update
+
+	from src.api.dependencies.database import SessionLocal, engine
+	from src.api.models import CatalogueVersion, Ingredient
+	from src.api.util import catalogue, spelling
+
+	assert client.get("/ingredient/search/", params={"query": "gochujang"}).json() == []
+	before = spelling.vocabulary.peek()
+	catalogue.poll()
+	version = catalogue.current_version()
+
+	# What another worker's session commits: the row and the shared version, none of this process's session events
+	with engine.begin() as connection:
+		ingredient_id = connection.execute(insert(Ingredient).values(name="Gochujang")).inserted_primary_key[0]
+		connection.execute(update(CatalogueVersion).values(version=CatalogueVersion.version + 1))
+	assert catalogue.current_version() == version
+
+	assert catalogue.poll()
+	assert catalogue.current_version() > version
+	client.get("/ingredient/search/", params={"query": "gochujang"})
+	deadline = time.monotonic() + 5
+	while spelling.vocabulary.peek() is before and time.monotonic() < deadline:
+		time.sleep(0.01)
+
+	response = client.get("/ingredient/search/", params={"query": "gochujang"})
+	assert [item["id"] for item in response.json()] == [ingredient_id]
+	assert not catalogue.poll()
+
+	# This process's own writes move the shared version too, without poll() reporting them again
+	with engine.connect() as connection:
+		shared = connection.execute(select(CatalogueVersion.version)).scalar()
+	db = SessionLocal()
+	try:
+		db.add(Ingredient(name="Doenjang"))
+		db.commit()
+	finally:
+		db.close()
+	with engine.connect() as connection:
+		assert connection.execute(select(CatalogueVersion.version)).scalar() == shared + 1
+	assert not catalogue.poll()
@@ -0,0 +1,116 @@
+import threading
+from datetime import timedelta
+
+from src.api.dependencies.database import SessionLocal
+from src.api.models import Job, JobStatus
+from src.api.util import jobs
+
+
+def _job(job_id):
+	db = SessionLocal()
+	try:
+		return db.get(Job, job_id)
+	finally:
+		db.close()
+
+
+def test_running_jobs_are_only_reclaimed_after_their_lease(test_seed_data):
+	"""Test that a runner starting up leaves jobs of live runners alone and re-queues lapsed ones"""
+	started, release = threading.Event(), threading.Event()
+	runs = []
+
+	@jobs.handler("test_slow_job")
+	def slow_job(db, payload):
+		runs.append(payload["n"])
+		started.set()
+		release.wait(5)
+
+	first, second = jobs.JobRunner(lease_seconds=60), jobs.JobRunner(lease_seconds=60)
+	db = SessionLocal()
+	try:
+		job_id = jobs.enqueue(db, "test_slow_job", {"n": 1}).id
+		db.commit()
+	finally:
+		db.close()
+
+	worker = threading.Thread(target=first.run, args=(job_id,))
+	worker.start()
+	try:
+		assert started.wait(5)
+		job = _job(job_id)
+		assert job.status == JobStatus.Running
+		assert job.owner == first.owner
+
+		# Another worker booting mid-run must not re-queue a job whose lease is live
+		assert second.reclaim_expired() == []
+		assert second.run(job_id) is False
+		assert first.renew_leases() == 1
+
+		# The first runner stops renewing (it died or hung): its lease lapses and the job is re-queued
+		db = SessionLocal()
+		try:
+			db.query(Job).filter(Job.id == job_id).update({"lease_expires_at": jobs._now() - timedelta(seconds=1)})
+			db.commit()
+		finally:
+			db.close()
+		assert second.reclaim_expired() == [job_id]
+		assert _job(job_id).status == JobStatus.Queued
+		assert first.renew_leases() == 0
+	finally:
+		release.set()
+		worker.join()
+
+	# The late finish of the first runner does not mark the re-queued job succeeded
+	assert _job(job_id).status == JobStatus.Queued
+	started.clear()
+	assert second.run(job_id) is True
+	job = _job(job_id)
+	assert job.status == JobStatus.Succeeded
+	assert job.owner is None and job.lease_expires_at is None
+	assert runs == [1, 1]
+	jobs.HANDLERS.pop("test_slow_job")
+
+
+def test_failed_jobs_wait_out_their_backoff(test_seed_data, monkeypatch):
+	"""Test that a retried job is not claimed before its backoff and the heartbeat only resubmits reclaimed jobs"""
+	attempts = []
+
+	@jobs.handler("test_flaky_job")
+	def flaky_job(db, payload):
+		attempts.append(len(attempts) + 1)
+		if len(attempts) == 1:
+			raise RuntimeError("transient")
+
+	runner = jobs.JobRunner()
+	submitted = []
+	monkeypatch.setattr(runner, "submit", lambda job_id, delay=0.0: submitted.append((job_id, delay)))
+	db = SessionLocal()
+	try:
+		job_id = jobs.enqueue(db, "test_flaky_job").id
+		db.commit()
+	finally:
+		db.close()
+
+	assert runner.run(job_id) is True
+	job = _job(job_id)
+	assert job.status == JobStatus.Queued
+	assert job.run_after > jobs._now()
+	assert submitted == [(job_id, jobs.RETRY_BACKOFF)]
+
+	# Still backing off: neither a claim nor a heartbeat starts it early
+	assert runner.run(job_id) is False
+	submitted.clear()
+	runner.heartbeat()
+	assert submitted == []
+
+	db = SessionLocal()
+	try:
+		db.query(Job).filter(Job.id == job_id).update({"run_after": jobs._now() - timedelta(seconds=1)})
+		db.commit()
+	finally:
+		db.close()
+	assert runner.run(job_id) is True
+	job = _job(job_id)
+	assert job.status == JobStatus.Succeeded and job.run_after is None
+	assert attempts == [1, 2]
+	jobs.HANDLERS.pop("test_flaky_job")
@@ -21,3 +21,243 @@ def test_delete_pantry_ingredient(client, test_seed_data, authenticate_demo_user
 
 	response = client.get("/pantryingredient/1", headers=authenticate_demo_user)
 	assert response.status_code == 404
+
+
+def test_pantry_changes_are_pushed_to_subscribers(client, test_seed_data, authenticate_demo_user):
+	"""Test that pantry writes reach the owner's event stream as compact deltas"""
+	import asyncio
+	import json
+
+	from src.api.dependencies.database import SessionLocal
+	from src.api.models import User
+	from src.api.util.live_updates import HEARTBEAT, hub
+
+	db = SessionLocal()
+	try:
+		user_id = db.query(User.id).filter(User.username == "test").scalar()
+	finally:
+		db.close()
+	item = {"user_id": user_id, "ingredient_id": 2, "quantity": "1", "unit": "cup"}
+	item = client.post("/pantryingredient/", json=item, headers=authenticate_demo_user).json()
+
+	async def scenario():
+		own = hub.subscribe(user_id)
+		other = hub.subscribe(user_id + 1000)
+		try:
+			response = await asyncio.to_thread(
+				client.put, f"/pantryingredient/{item['id']}", json={"quantity": "7"}, headers=authenticate_demo_user
+			)
+			assert response.status_code == 200
+			frame = (await own.get(1.0)).decode()
+			assert await other.get(0.05) == HEARTBEAT
+		finally:
+			hub.unsubscribe(own)
+			hub.unsubscribe(other)
+		return frame
+
+	frame = asyncio.run(scenario())
+	assert frame.startswith("event: pantry\n")
+	event = json.loads(frame.split("data: ", 1)[1])
+	assert event["op"] == "upsert"
+	assert event["item"]["id"] == item["id"]
+	assert event["item"]["quantity"] == "7"
+	assert hub.connection_count() == 0
+
+
+def test_slow_subscriber_is_told_to_resync(client):
+	"""Test that a subscriber whose queue overflows gets a single resync event"""
+	import asyncio
+
+	from src.api.util import live_updates
+
+	async def scenario():
+		subscription = live_updates.hub.subscribe(-1)
+		try:
+			for n in range(live_updates.QUEUE_SIZE + 5):
+				subscription.put(live_updates.encode("pantry", {"op": "delete", "id": n}))
+			return await subscription.get(0.1), await subscription.get(0.05)
+		finally:
+			live_updates.hub.unsubscribe(subscription)
+
+	first, second = asyncio.run(scenario())
+	assert first == live_updates.RESYNC
+	assert second == live_updates.HEARTBEAT
+
+
+def test_event_stream_requires_authentication(client):
+	response = client.get("/events/")
+	assert response.status_code == 401
+
+
+def test_parse_quantities():
+	"""Test that free-text quantities parse to amounts in the base unit of their dimension"""
+	from src.api.util import quantities
+
+	assert quantities.parse("Two", "kgs") == ("mass", 2000.0)
+	assert quantities.parse("1 1/2", "cups") == ("volume", 1.5 * 236.5882365)
+	assert quantities.parse("200g") == ("mass", 200.0)
+	assert quantities.parse("one and a half", "tbsp").amount == 1.5 * 14.78676478125
+	assert quantities.parse("a dozen", "") == ("count", 12.0)
+	assert quantities.parse("2-3", "cloves") == ("count", 2.0)
+	# A comma before three digits separates thousands; otherwise it is a decimal comma
+	assert quantities.parse("1,000", "g") == ("mass", 1000.0)
+	assert quantities.parse("1,5", "kg") == ("mass", 1500.0)
+	assert quantities.parse("1,000-2,000", "ml") == ("volume", 1000.0)
+	assert quantities.parse("some", "salt") is None
+	assert quantities.convert(1, "cup", "tbsp") == 16.0
+
+
+def test_pantry_totals_and_check(client, test_seed_data, authenticate_demo_user):
+	"""Test that pantry amounts are summed across units and compared against requirements"""
+	from sqlalchemy import text
+
+	from src.api.dependencies.database import SessionLocal, engine
+	from src.api.models import User
+	from src.api.util import quantities
+
+	db = SessionLocal()
+	try:
+		user_id = db.query(User.id).filter(User.username == "test").scalar()
+	finally:
+		db.close()
+
+	for quantity, unit in (("1", "l"), ("2", "cups")):
+		item = {"user_id": user_id, "ingredient_id": 3, "quantity": quantity, "unit": unit}
+		response = client.post("/pantryingredient/", json=item, headers=authenticate_demo_user)
+		assert response.status_code == 200
+		assert response.json()["dimension"] == "volume"
+
+	response = client.get("/pantryingredient/totals", headers=authenticate_demo_user)
+	assert response.status_code == 200
+	total = next(row for row in response.json() if row["ingredient_id"] == 3)
+	assert total["unit"] == "ml"
+	assert abs(total["amount"] - (1000 + 2 * 236.5882365)) < 1e-6
+
+	request = {"items": [
+		{"ingredient_id": 3, "quantity": "6", "unit": "cups"},
+		{"ingredient_id": 3, "quantity": "7", "unit": "cups"},
+		{"ingredient_id": 3, "quantity": "1", "unit": "kg"},
+	]}
+	response = client.post("/pantryingredient/check", json=request, headers=authenticate_demo_user)
+	assert response.status_code == 200
+	assert [result["enough"] for result in response.json()] == [True, False, False]
+
+	response = client.post("/pantryingredient/check", json={"items": [{"ingredient_id": 3, "quantity": "lots"}]},
+	                       headers=authenticate_demo_user)
+	assert response.status_code == 400
+
+	# Rows written before the structured columns existed are filled in by the backfill
+	with engine.begin() as connection:
+		connection.execute(text("UPDATE pantry_ingredients SET amount = NULL, dimension = NULL"))
+		quantities._backfill_amounts(connection)
+		assert connection.execute(text("SELECT COUNT(*) FROM pantry_ingredients WHERE dimension IS NULL")).scalar() == 0
+
+	# Once the columns exist, startup does not re-parse rows whose quantity never parsed
+	from sqlalchemy import event
+
+	statements = []
+
+	def record(conn, cursor, statement, parameters, context, executemany):
+		statements.append(statement)
+
+	event.listen(engine, "before_cursor_execute", record)
+	try:
+		with engine.begin() as connection:
+			quantities._add_amount_columns(None, connection)
+	finally:
+		event.remove(engine, "before_cursor_execute", record)
+	assert not [statement for statement in statements if "dimension IS NULL" in statement]
+
+
+def test_group_commit_batches_concurrent_writes(client, test_seed_data, authenticate_demo_user, monkeypatch):
+	"""Test that concurrent pantry writes share commits and each gets its own result or error"""
+	from concurrent.futures import ThreadPoolExecutor
+
+	from src.api.dependencies.database import SessionLocal
+	from src.api.models import User
+	from src.api.models.pantry_ingredient import PantryIngredient
+	from src.api.util import group_commit
+
+	committer = group_commit.GroupCommitter(enabled=True, max_batch=8, max_delay=0.05)
+	monkeypatch.setattr(group_commit, "committer", committer)
+
+	db = SessionLocal()
+	try:
+		user_id = db.query(User.id).filter(User.username == "test").scalar()
+	finally:
+		db.close()
+
+	def create(index):
+		item = {"user_id": user_id, "ingredient_id": 1 + index % 3, "quantity": str(index + 1), "unit": "g"}
+		return client.post("/pantryingredient/", json=item, headers=authenticate_demo_user)
+
+	def update_missing(_):
+		return client.put("/pantryingredient/999999", json={"quantity": "1"}, headers=authenticate_demo_user)
+
+	with ThreadPoolExecutor(max_workers=8) as executor:
+		created = list(executor.map(create, range(16)))
+		missing = list(executor.map(update_missing, range(2)))
+	committer.shutdown()
+
+	assert all(response.status_code == 200 for response in created)
+	assert sorted(response.json()["amount"] for response in created) == [float(n) for n in range(1, 17)]
+	assert [response.status_code for response in missing] == [404, 404]
+
+	stats = committer.stats()
+	assert stats["operations"] == 18
+	assert stats["batches"] < stats["operations"]
+
+	ids = [response.json()["id"] for response in created]
+	db = SessionLocal()
+	try:
+		assert db.query(PantryIngredient).filter(PantryIngredient.id.in_(ids)).count() == 16
+	finally:
+		db.close()
+
+
+def test_group_commit_failure_is_isolated():
+	"""Test that a failing operation rolls back alone while the rest of its batch commits"""
+	import threading
+
+	from src.api.dependencies.database import Base, SessionLocal, engine
+	from src.api.models import Ingredient
+	from src.api.util import group_commit
+
+	Base.metadata.create_all(bind=engine)
+	committer = group_commit.GroupCommitter(enabled=True, max_batch=3, max_delay=0.5)
+	results = {}
+
+	def add(name):
+		def operation(session):
+			session.add(Ingredient(name=name))
+			if name == "group-commit-bad":
+				raise ValueError(name)
+			return name
+		return operation
+
+	def submit(name):
+		try:
+			results[name] = committer.submit(add(name))
+		except ValueError as e:
+			results[name] = e
+
+	threads = [threading.Thread(target=submit, args=(name,)) for name in ("group-commit-a", "group-commit-bad", "group-commit-b")]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	committer.shutdown()
+
+	assert results["group-commit-a"] == "group-commit-a"
+	assert results["group-commit-b"] == "group-commit-b"
+	assert isinstance(results["group-commit-bad"], ValueError)
+	assert committer.stats()["batches"] == 1
+
+	db = SessionLocal()
+	try:
+		names = {name for (name,) in db.query(Ingredient.name).filter(Ingredient.name.like("group-commit-%"))}
+		db.query(Ingredient).filter(Ingredient.name.like("group-commit-%")).delete(synchronize_session=False)
+		db.commit()
+	finally:
+		db.close()
+	assert names == {"group-commit-a", "group-commit-b"}
@@ -0,0 +1,90 @@
+def test_optimizer_prefers_recipes_covered_by_the_pantry():
+	"""Test that greedy + local search picks the plan using the pantry best, within constraints"""
+	from src.api.util import meal_plan
+
+	index = meal_plan.PlanIndex([
+		(1, [1, 2, 3], [1]),      # fully in the pantry
+		(2, [1, 2, 9], [2]),      # one purchase
+		(3, [7, 8, 9, 10], [1]),  # nothing from the pantry
+		(4, [3, 4], [2]),         # fully in the pantry
+		(5, [4, 11], [1]),
+	], version=1)
+	pantry = index.recipe_bitmaps.encode([1, 2, 3, 4])
+
+	plan = meal_plan.optimize(index, pantry, meals=2)
+	assert sorted(plan.recipe_ids) == [1, 4]
+	assert (plan.pantry_used, plan.to_buy) == (4, 0)
+
+	plan = meal_plan.optimize(index, pantry, meals=2, category_ids=[1])
+	assert sorted(plan.recipe_ids) == [1, 5]
+	assert (plan.pantry_used, plan.to_buy) == (4, 1)
+
+	# An empty pantry falls back to the recipes needing the fewest purchases
+	plan = meal_plan.optimize(index, 0, meals=1)
+	assert plan.recipe_ids == [4]
+
+
+def test_optimize_plan_endpoint(client, test_seed_data, authenticate_demo_user):
+	"""Test that the endpoint returns distinct recipes with their shopping list"""
+	response = client.post("/plans/optimize", json={"meals": 3}, headers=authenticate_demo_user)
+	assert response.status_code == 200
+	data = response.json()
+	ids = [recipe["id"] for recipe in data["recipes"]]
+	assert len(ids) == 3 and len(set(ids)) == 3
+	assert data["shopping_list"]["recipe_ids"] == ids
+	assert len(data["shopping_list"]["items"]) == data["to_buy"]
+	assert data["elapsed_ms"] < 1000
+
+	response = client.post("/plans/optimize", json={"meals": 2, "category_ids": [5]}, headers=authenticate_demo_user)
+	assert response.status_code == 200
+	for recipe in response.json()["recipes"]:
+		categories = client.get(f"/recipes/{recipe['id']}").json()["category_id_list"].split(",")
+		assert "5" in [c.strip() for c in categories]
+
+	response = client.post("/plans/optimize", json={"meals": 0}, headers=authenticate_demo_user)
+	assert response.status_code == 400
+	response = client.post("/plans/optimize", json={"meals": 3})
+	assert response.status_code == 401
+
+
+def test_plan_index_is_rebuilt_off_the_request_path(test_seed_data):
+	"""Test that after a catalogue write the previous index is served while the new one is built"""
+	import threading
+	import time
+
+	from src.api.dependencies.database import SessionLocal
+	from src.api.models import Recipe
+	from src.api.util import meal_plan
+
+	db = SessionLocal()
+	try:
+		before = meal_plan.get_index(db)
+		recipe = db.query(Recipe).first()
+		recipe.title = recipe.title + " (revised)"
+		db.commit()
+
+		build = meal_plan.index._build
+		started, release = threading.Event(), threading.Event()
+
+		def slow_build(session):
+			started.set()
+			release.wait(5)
+			return build(session)
+
+		meal_plan.index._build = slow_build
+		try:
+			# The write does not make the request wait for the rebuild
+			assert meal_plan.get_index(db) is before
+			assert started.wait(5)
+			assert meal_plan.get_index(db) is before
+		finally:
+			release.set()
+			meal_plan.index._build = build
+
+		deadline = time.monotonic() + 5
+		while meal_plan.index.peek() is before and time.monotonic() < deadline:
+			time.sleep(0.01)
+		after = meal_plan.get_index(db)
+		assert after is not before and after.version > before.version
+	finally:
+		db.close()
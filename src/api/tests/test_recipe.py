@@ -123,3 +123,582 @@ def test_delete_recipe(client, test_seed_data, authenticate_demo_user, authentic
 
 	response = client.get("/recipes/1")
 	assert response.status_code == 404
+
+
+def test_list_recipes_with_fields(client, test_seed_data):
+	"""Test that list endpoints only return the requested columns"""
+	response = client.get("/recipes/", params={"fields": "title,image_url"})
+	assert response.status_code == 200
+	data = response.json()
+	assert len(data) > 0
+	for recipe in data:
+		assert set(recipe) == {"id", "title", "image_url"}
+
+	response = client.get("/recipes/search/", params={"query": "Lamb", "threshold": 70, "fields": "title"})
+	assert response.status_code == 200
+	data = response.json()
+	assert len(data) > 0
+	assert all(set(recipe) == {"id", "title"} for recipe in data)
+
+	response = client.get("/recipes/category/3", params={"fields": "title"})
+	assert response.status_code == 200
+	assert all(set(recipe) == {"id", "title"} for recipe in response.json())
+
+
+def test_list_recipes_with_unknown_field(client, test_seed_data):
+	"""Test that unknown field names are rejected"""
+	response = client.get("/recipes/recent/", params={"fields": "title,hashed_password"})
+	assert response.status_code == 400
+
+
+def test_recipe_list_is_compressed(client, test_seed_data):
+	"""Test that large responses are compressed according to Accept-Encoding"""
+	response = client.get("/recipes/", headers={"Accept-Encoding": "gzip"})
+	assert response.status_code == 200
+	assert response.headers["content-encoding"] == "gzip"
+	assert "Accept-Encoding" in response.headers["vary"]
+	assert isinstance(response.json(), list)
+
+	response = client.get("/recipes/", headers={"Accept-Encoding": "identity"})
+	assert "content-encoding" not in response.headers
+
+	# Small bodies are not worth compressing
+	response = client.get("/categories/1", headers={"Accept-Encoding": "gzip"})
+	assert "content-encoding" not in response.headers
+
+
+def test_search_recipes_full_text(client, test_seed_data):
+	"""Test that the full-text index covers instructions and keeps typo tolerance"""
+	response = client.get("/recipes/search/", params={"query": "oven", "threshold": 0})
+	assert response.status_code == 200
+	titles = [recipe["title"] for recipe in response.json()]
+	assert "Simple Roast Lamb Chops" in titles
+
+	response = client.get("/recipes/search/", params={"query": "Lmab", "threshold": 60})
+	assert response.status_code == 200
+	titles = [recipe["title"] for recipe in response.json()]
+	assert "Simple Roast Lamb Chops" in titles
+
+
+def test_search_results_are_cached(client, test_seed_data, authenticate_demo_user, authenticate_demo_admin_user):
+	"""Test that repeated searches hit the cache and catalogue writes invalidate it"""
+	params = {"query": "  Cheesy   POTATO ", "threshold": 70}
+	first = client.get("/recipes/search/", params=params).json()
+	stats = client.get("/cache/search", headers=authenticate_demo_admin_user).json()
+
+	second = client.get("/recipes/search/", params={"query": "cheesy potato", "threshold": 70}).json()
+	assert second == first
+	after_hit = client.get("/cache/search", headers=authenticate_demo_admin_user).json()
+	assert after_hit["hits"] == stats["hits"] + 1
+
+	response = client.put(f"/recipes/{first[0]['id']}", json={"title": "Cheesy Potato Gratin"}, headers=authenticate_demo_user)
+	assert response.status_code == 200
+	third = client.get("/recipes/search/", params=params).json()
+	assert third[0]["title"] == "Cheesy Potato Gratin"
+
+	response = client.get("/cache/search", headers=authenticate_demo_user)
+	assert response.status_code == 403
+
+
+def test_search_recipes_pagination(client, test_seed_data):
+	"""Test that search results are limited and can be paged with a cursor"""
+	params = {"query": "a", "threshold": 0, "fields": "title"}
+	response = client.get("/recipes/search/", params={**params, "limit": 2})
+	assert response.status_code == 200
+	first_page = response.json()
+	assert len(first_page) == 2
+	cursor = response.headers["x-next-cursor"]
+
+	response = client.get("/recipes/search/", params={**params, "limit": 2, "cursor": cursor})
+	assert response.status_code == 200
+	second_page = response.json()
+	assert second_page
+	assert not {r["id"] for r in first_page} & {r["id"] for r in second_page}
+
+	everything = client.get("/recipes/search/", params={**params, "limit": 100})
+	assert "x-next-cursor" not in everything.headers
+	assert [r["id"] for r in everything.json()[:4]] == [r["id"] for r in first_page + second_page][:4]
+
+	response = client.get("/recipes/search/", params={**params, "cursor": "not-a-cursor"})
+	assert response.status_code == 400
+
+
+def test_get_similar_recipes(client, test_seed_data):
+	"""Test that similar recipes are served from the precomputed table"""
+	from src.api.dependencies.database import SessionLocal
+	from src.api.util import recommendations
+
+	db = SessionLocal()
+	try:
+		assert recommendations.rebuild(db) > 0
+	finally:
+		db.close()
+
+	# Flamiche (leek, butter, cheese) shares butter and cheese with the cheesy potato bake
+	response = client.get("/recipes/2/similar")
+	assert response.status_code == 200
+	data = response.json()
+	assert 0 < len(data) <= 10
+	assert data[0]["id"] == 6
+	assert all(recipe["id"] != 2 for recipe in data)
+
+	response = client.get("/recipes/9999/similar")
+	assert response.status_code == 404
+
+
+def test_recipe_writes_enqueue_background_jobs(client, test_seed_data, authenticate_demo_user, authenticate_demo_admin_user):
+	"""Test that recipe writes queue the similar-recipes rebuild instead of running it inline"""
+	from src.api.util import jobs
+
+	recipe = {
+		"title": "Leek and Cheese Tart",
+		"description": "Flamiche's quicker cousin",
+		"instructions": "Bake.",
+		"ingredient_id_list": "1,2",
+		"servings": 4,
+		"image_url": "https://example.com/tart.jpg"
+	}
+	assert client.post("/recipes/", json=recipe, headers=authenticate_demo_user).status_code == 200
+	recipe["title"] = "Leek and Cheese Galette"
+	assert client.post("/recipes/", json=recipe, headers=authenticate_demo_user).status_code == 200
+
+	# Both writes share a single queued rebuild
+	response = client.get("/jobs/", params={"status": "queued"}, headers=authenticate_demo_admin_user)
+	assert response.status_code == 200
+	queued = [job for job in response.json() if job["name"] == "rebuild_similar_recipes"]
+	assert len(queued) == 1
+
+	assert jobs.runner.run_pending() >= 1
+	job = client.get(f"/jobs/{queued[0]['id']}", headers=authenticate_demo_admin_user).json()
+	assert job["status"] == "succeeded"
+	assert job["attempts"] == 1
+
+	response = client.post("/jobs/", json={"name": "no_such_job"}, headers=authenticate_demo_admin_user)
+	assert response.status_code == 400
+	assert client.get("/jobs/", headers=authenticate_demo_user).status_code == 403
+
+
+def test_list_recipes_with_pantry_match(client, test_seed_data, authenticate_demo_user):
+	"""Test that pantry_match adds have/missing counts computed from the user's pantry"""
+	pantry = client.get("/pantryingredient/pantry", headers=authenticate_demo_user).json()
+	pantry_ids = {item["ingredient_id"] for item in pantry}
+
+	response = client.get("/recipes/", params={"pantry_match": "true"}, headers=authenticate_demo_user)
+	assert response.status_code == 200
+	for recipe in response.json():
+		ingredient_ids = {int(i) for i in recipe["ingredient_id_list"].split(",") if i.strip().isdigit()}
+		assert recipe["pantry_have"] == len(ingredient_ids & pantry_ids)
+		assert recipe["pantry_missing"] == len(ingredient_ids - pantry_ids)
+
+	response = client.get("/recipes/search/", params={"query": "cheese", "fields": "title", "pantry_match": "true"},
+	                      headers=authenticate_demo_user)
+	assert response.status_code == 200
+	assert all(set(recipe) == {"id", "title", "pantry_have", "pantry_missing"} for recipe in response.json())
+
+	# Without the flag the counts are left out and the signed-in user is not even looked up
+	from sqlalchemy import event
+	from src.api.dependencies.database import engine
+
+	statements = []
+
+	def record(conn, cursor, statement, parameters, context, executemany):
+		statements.append(statement)
+
+	event.listen(engine, "before_cursor_execute", record)
+	try:
+		response = client.get("/recipes/", params={"fields": "title"}, headers=authenticate_demo_user)
+	finally:
+		event.remove(engine, "before_cursor_execute", record)
+	assert "pantry_have" not in response.json()[0]
+	assert not [statement for statement in statements if "FROM users" in statement]
+
+	# Matching needs a signed-in user
+	assert client.get("/recipes/", params={"pantry_match": "true"}).status_code == 401
+	assert client.get("/recipes/", params={"fields": "pantry_have"}).status_code == 400
+
+
+def test_pantry_bitmaps_use_dense_ingredient_ordinals():
+	"""Test that bitmap size follows the number of ingredients, not the largest ingredient id"""
+	from src.api.util import pantry_match
+
+	bitmaps = pantry_match.RecipeBitmaps([
+		(1, [10**9, 5, 5]),
+		(2, [5, 7]),
+		(3, [42]),  # not in the ingredient table
+	], version=1, ingredient_ids=[5, 7, 10**9])
+	assert max(bitmap.bit_length() for bitmap in bitmaps.bitmaps.values()) <= 4
+	assert bitmaps.sizes == {1: 2, 2: 2, 3: 1}
+
+	pantry = bitmaps.encode([5, 10**9, 99])
+	assert bitmaps.coverage(pantry) == {1: (2, 0), 2: (1, 1), 3: (0, 1)}
+	assert sorted(bitmaps.decode(bitmaps.bitmaps[2] & ~pantry)) == [7]
+	assert bitmaps.has(1, 10**9) and not bitmaps.has(2, 10**9) and not bitmaps.has(1, 99)
+
+
+def test_reads_are_routed_to_replicas(client, test_seed_data, tmp_path):
+	"""Test that read-only routes use a healthy replica and fall back to the primary"""
+	import sqlite3
+
+	from fastapi.testclient import TestClient
+
+	from src.api.dependencies import database
+	from src.api.models import Recipe
+
+	# A SQLite file copy stands in for a replica; a marker row shows which database answered
+	replica_path = tmp_path / "replica.db"
+	primary = sqlite3.connect(database.engine.url.database)
+	replica = sqlite3.connect(replica_path)
+	primary.backup(replica)
+	primary.close()
+	replica.execute("UPDATE recipes SET title = 'Served by replica' WHERE id = 3")
+	replica.commit()
+	replica.close()
+
+	try:
+		database.configure_read_replicas([f"sqlite:///{replica_path}"], read_after_write_window=0)
+		titles = [recipe["title"] for recipe in client.get("/recipes/", params={"fields": "title"}).json()]
+		assert "Served by replica" in titles
+
+		# A client that wrote reads the primary for the read-after-write window; others keep the replica
+		database.read_router.read_after_write_window = 60
+		writer = TestClient(client.app)
+		response = writer.post("/auth/register", json={"username": "replica-writer", "email": "rw@mail.com",
+		                                               "password": "replicapassword"})
+		assert response.status_code == 200
+		assert database.READ_AFTER_WRITE_COOKIE in response.cookies
+		assert writer.get("/recipes/3").json()["title"] != "Served by replica"
+		assert client.get("/recipes/3").json()["title"] == "Served by replica"
+
+		# Writes outside a request (jobs, scripts) pin nobody
+		db = database.SessionLocal()
+		db.get(Recipe, 4).servings += 1
+		db.commit()
+		db.close()
+		assert client.get("/recipes/3").json()["title"] == "Served by replica"
+
+		database.configure_read_replicas(["sqlite:////nonexistent-dir/replica.db"], read_after_write_window=0)
+		assert client.get("/recipes/3").json()["title"] != "Served by replica"
+		assert database.read_router.status()[0]["healthy"] is False
+	finally:
+		database.configure_read_replicas([])
+
+
+def test_catalogue_store_is_compact(client, test_seed_data, authenticate_demo_admin_user):
+	"""Test that the compact catalogue store holds every recipe in a few hundred bytes each"""
+	from src.api.dependencies.database import SessionLocal
+	from src.api.models import Recipe
+	from src.api.util import catalogue_store
+
+	response = client.get("/cache/catalogue", headers=authenticate_demo_admin_user)
+	assert response.status_code == 200
+	stats = response.json()
+	assert stats["recipes"] > 0
+	assert stats["bytes_per_recipe"] < 1024
+
+	db = SessionLocal()
+	try:
+		store = catalogue_store.get_store(db)
+		recipe = db.query(Recipe).filter(Recipe.id == store.recipe_ids[0]).one()
+	finally:
+		db.close()
+	row = store.index_of(recipe.id)
+	assert store.titles[row] == recipe.title.lower()
+	assert list(store.recipe_ingredients[row]) == [int(i) for i in recipe.ingredient_id_list.split(",")]
+	assert store.index_of(999999) is None
+
+
+def test_shared_catalogue_snapshot(client, test_seed_data, tmp_path):
+	"""Test that a memory-mapped snapshot matches the in-process store and is swapped atomically"""
+	from src.api.dependencies.database import SessionLocal
+	from src.api.util import catalogue_store, shared_catalogue
+
+	path = str(tmp_path / "catalogue.bin")
+	db = SessionLocal()
+	try:
+		local = catalogue_store.get_store(db)
+		shared_catalogue.write(local, path, stamp=1)
+	finally:
+		db.close()
+
+	shared = shared_catalogue.SharedStore(path)
+	mapped = shared.current()
+	assert mapped.version == 1
+	assert list(mapped.recipe_ids) == list(local.recipe_ids)
+	assert list(mapped.titles) == list(local.titles)
+	assert [list(ids) for ids in mapped.recipe_ingredients] == [list(ids) for ids in local.recipe_ingredients]
+	assert mapped.ingredient_name(local.ingredient_ids[0]) == local.ingredient_names[0]
+	assert mapped.nbytes() == local.nbytes()
+
+	# Replacing the file publishes a new store; the old mapping stays readable
+	smaller = catalogue_store.CatalogueStore.from_rows(2, [(1, "Soup", None, "1")], [(1, "Salt")])
+	shared_catalogue.write(smaller, path, stamp=2)
+	assert shared.current().version == 2
+	assert list(shared.current().titles) == ["soup"]
+	assert list(mapped.titles) == list(local.titles)
+
+
+def test_search_cache_follows_shared_snapshot(client, test_seed_data, tmp_path, monkeypatch):
+	"""Test that search results are cached per snapshot, not per local write counter"""
+	from src.api.dependencies.database import SessionLocal
+	from src.api.models import Recipe
+	from src.api.util import catalogue_store, search_index, shared_catalogue
+	from src.api.util.search_cache import search_cache
+
+	path = str(tmp_path / "catalogue.bin")
+	db = SessionLocal()
+	try:
+		shared_catalogue.write(catalogue_store.get_store(db), path, stamp=1)
+	finally:
+		db.close()
+	monkeypatch.setattr(shared_catalogue, "shared_store", shared_catalogue.SharedStore(path))
+	monkeypatch.setattr(search_index, "BACKEND", None)
+	params = {"query": "zanzibar", "threshold": 90, "fields": "title"}
+	assert client.get("/recipes/search/", params=params).json() == []
+
+	db = SessionLocal()
+	try:
+		db.add(Recipe(title="Zanzibar Stew", instructions="Simmer.", servings=4, image_url="https://example.com/z.jpg",
+		                  ingredient_id_list="1", category_id_list="1"))
+		db.commit()
+
+		# The write bumps the local version, but the snapshot being searched is unchanged
+		stats = search_cache.stats()
+		assert client.get("/recipes/search/", params=params).json() == []
+		assert search_cache.stats()["hits"] == stats["hits"] + 1
+
+		# A new snapshot is a new cache generation
+		shared_catalogue.write(catalogue_store.CatalogueStore.from_db(db, 0), path, stamp=2)
+	finally:
+		db.close()
+	assert [recipe["title"] for recipe in client.get("/recipes/search/", params=params).json()] == ["Zanzibar Stew"]
+
+
+def test_search_cache_follows_other_workers_writes(client, test_seed_data):
+	"""Test that without a shared snapshot, cached searches are dropped once another worker's write is polled"""
+	from sqlalchemy import insert, update
+
+	from src.api.dependencies.database import SessionLocal, engine
+	from src.api.models import CatalogueVersion, Recipe
+	from src.api.util import catalogue, spelling
+	from src.api.util.search_cache import search_cache
+
+	catalogue.poll()
+	db = SessionLocal()
+	try:
+		spelling.vocabulary.refresh(db)  # part of the cache key; settled so only the catalogue changes below
+	finally:
+		db.close()
+	params = {"query": "timbuktu", "threshold": 90, "fields": "title"}
+	assert client.get("/recipes/search/", params=params).json() == []
+
+	# What another worker's session commits, bypassing this process's session events
+	with engine.begin() as connection:
+		connection.execute(insert(Recipe).values(
+			title="Timbuktu Rice", instructions="Steam.", servings=2, image_url="https://example.com/t.jpg",
+			ingredient_id_list="1", category_id_list="1"))
+		connection.execute(update(CatalogueVersion).values(version=CatalogueVersion.version + 1))
+	stats = search_cache.stats()
+	assert client.get("/recipes/search/", params=params).json() == []
+	assert search_cache.stats()["hits"] == stats["hits"] + 1
+
+	assert catalogue.poll()
+	assert [recipe["title"] for recipe in client.get("/recipes/search/", params=params).json()] == ["Timbuktu Rice"]
+
+
+def test_image_cache_evicts_least_recently_used(tmp_path):
+	"""Test that the image disk cache stays under its size bound, evicting the oldest files"""
+	from src.api.util.images import DiskCache, ImagePipeline
+
+	cache = DiskCache(str(tmp_path), max_bytes=250)
+	cache.put("a", b"x" * 100)
+	cache.put("b", b"x" * 100)
+	assert cache.get("a") is not None  # "b" is now the least recently used
+	cache.put("c", b"x" * 100)
+	assert cache.get("b") is None
+	assert cache.get("a") is not None and cache.get("c") is not None
+	assert cache.stats()["size_bytes"] == 200
+
+	# A restarted worker rebuilds the index from the directory
+	assert DiskCache(str(tmp_path), max_bytes=250).stats()["entries"] == 2
+
+	fetched = []
+	pipeline = ImagePipeline(DiskCache(str(tmp_path / "pipeline"), 10_000), fetcher=lambda url: fetched.append(url) or b"img")
+	assert pipeline.source("https://example.com/a.jpg") == b"img"
+	assert pipeline.source("https://example.com/a.jpg") == b"img"
+	assert fetched == ["https://example.com/a.jpg"]
+
+	# Locks are a fixed set shared by hash: even one render lock and one source lock never deadlock
+	import os
+	from io import BytesIO
+
+	import pytest
+	Image = pytest.importorskip("PIL.Image")
+	source = BytesIO()
+	Image.new("RGB", (400, 300), "orange").save(source, "JPEG")
+	pipeline = ImagePipeline(DiskCache(str(tmp_path / "striped"), 1_000_000), fetcher=lambda url: source.getvalue(),
+	                         lock_stripes=1)
+	for n in range(20):
+		assert os.path.exists(pipeline.render(f"https://example.com/{n}.jpg", "thumb", "webp"))
+	assert len(pipeline._render_locks) == len(pipeline._source_locks) == 1
+
+
+def test_recipe_image_endpoint(client, test_seed_data, tmp_path):
+	"""Test that recipe images are resized and cached, or redirect to the source without Pillow"""
+	from src.api.util import images
+
+	response = client.get("/images/2/huge")
+	assert response.status_code == 400
+	response = client.get("/images/999999/card")
+	assert response.status_code == 404
+
+	if not images.pipeline.available:
+		response = client.get("/images/2/card", follow_redirects=False)
+		assert response.status_code == 307
+		assert response.headers["location"] == client.get("/recipes/2").json()["image_url"]
+		return
+
+	from io import BytesIO
+	from PIL import Image
+
+	source = BytesIO()
+	Image.new("RGB", (1200, 800), "orange").save(source, "JPEG")
+	original = images.pipeline
+	images.pipeline = images.ImagePipeline(images.DiskCache(str(tmp_path), 10 ** 7), fetcher=lambda url: source.getvalue())
+	try:
+		response = client.get("/images/2/card", params={"v": "1"}, headers={"Accept": "image/webp,*/*"})
+		assert response.status_code == 200
+		assert response.headers["content-type"] == "image/webp"
+		assert "immutable" in response.headers["cache-control"]
+		assert Image.open(BytesIO(response.content)).width == images.SIZES["card"]
+
+		response = client.get("/images/2/placeholder", headers={"Accept": "image/jpeg"})
+		assert response.headers["content-type"] == "image/jpeg"
+		assert len(response.content) < 2000
+	finally:
+		images.pipeline = original
+
+
+def test_image_fetch_refuses_internal_addresses(client, test_seed_data, tmp_path, monkeypatch):
+	"""Test that image sources on internal hosts are refused, directly, by redirect or by rebinding"""
+	import threading
+	from http.server import BaseHTTPRequestHandler, HTTPServer
+
+	import pytest
+
+	from src.api.util import images
+
+	for url in ("http://169.254.169.254/latest/meta-data/", "http://127.0.0.1/", "http://[::1]/", "http://10.1.2.3/",
+	            "http://[::ffff:192.168.0.1]/", "file:///etc/passwd"):
+		with pytest.raises(images.ImageSourceError):
+			images.fetch_source(url)
+
+	class Handler(BaseHTTPRequestHandler):
+		def do_GET(self):
+			self.send_response(302)
+			self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+			self.end_headers()
+
+		def log_message(self, *args):
+			pass
+
+	server = HTTPServer(("127.0.0.1", 0), Handler)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	url = f"http://public.example:{server.server_port}/image.jpg"
+	real_addresses = images._addresses
+	# public.example "resolves" publicly but connects to loopback, as with DNS rebinding
+	monkeypatch.setattr(images, "_addresses", lambda host, port: {"93.184.216.34"} if host == "public.example" else real_addresses(host, port))
+	monkeypatch.setattr(images.socket, "getaddrinfo", _loopback_getaddrinfo(images.socket.getaddrinfo))
+	try:
+		with pytest.raises(images.ImageSourceError, match="non-public address 127.0.0.1"):
+			images.fetch_source(url)
+
+		# Without the connect-time check, the redirect hop is still refused before it is followed
+		monkeypatch.setattr(images, "_check_peer", lambda response: None)
+		with pytest.raises(images.ImageSourceError, match="169.254.169.254 is not a public address"):
+			images.fetch_source(url)
+	finally:
+		server.shutdown()
+		server.server_close()
+
+	# Clients get a generic 502, never the reason
+	original = images.pipeline
+
+	def fetcher(url):
+		raise images.ImageSourceError("connected to non-public address 10.0.0.5")
+
+	images.pipeline = images.ImagePipeline(images.DiskCache(str(tmp_path), 10 ** 6), fetcher=fetcher)
+	try:
+		if images.pipeline.available:
+			response = client.get("/images/2/card")
+			assert response.status_code == 502
+			assert response.json()["detail"] == "Could not load the recipe image"
+	finally:
+		images.pipeline = original
+
+
+def _loopback_getaddrinfo(getaddrinfo):
+	def resolve(host, *args, **kwargs):
+		return getaddrinfo("127.0.0.1" if host == "public.example" else host, *args, **kwargs)
+	return resolve
+
+
+def _stream_events(client, params, headers=None):
+	import json
+
+	response = client.get("/recipes/search/stream", params=params, headers=headers)
+	assert response.status_code == 200
+	assert response.headers["content-type"].startswith("application/x-ndjson")
+	return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_search_stream_matches_search(client, test_seed_data, monkeypatch):
+	"""Test that streamed search sends title matches first and ends with the same ranking as search()"""
+	from src.api.controllers import recipe as recipe_controller
+	from src.api.util import search_index
+	from src.api.util.search_cache import search_cache
+
+	# Score the whole catalogue in small chunks, as without a full-text backend
+	monkeypatch.setattr(search_index, "BACKEND", None)
+	monkeypatch.setattr(recipe_controller, "STREAM_CHUNK_SIZE", 2)
+	params = {"query": "lamb", "threshold": 40, "fields": "title", "limit": 3}
+
+	search_cache.clear()
+	expected = client.get("/recipes/search/", params=params).json()
+	search_cache.clear()
+	events = _stream_events(client, params)
+
+	assert events[0]["type"] == "results" and events[0]["phase"] == "exact"
+	assert all("lamb" in item["title"].lower() and item["score"] == 100 for item in events[0]["items"])
+	assert [event["type"] for event in events].count("progress") > 1
+	assert events[-1]["type"] == "done"
+	assert events[-1]["ids"] == [recipe["id"] for recipe in expected]
+
+	found = {item["id"] for event in events if event["type"] == "results" for item in event["items"]}
+	assert set(events[-1]["ids"]) <= found
+
+	# The finished stream fills the cache for search() and later streams
+	stats = search_cache.stats()
+	assert client.get("/recipes/search/", params=params).json() == expected
+	assert search_cache.stats()["hits"] == stats["hits"] + 1
+	events = _stream_events(client, params)
+	assert [event["type"] for event in events] == ["results", "done"]
+	assert events[0]["phase"] == "cached"
+
+
+def test_search_stream_validation(client, test_seed_data, authenticate_demo_user):
+	"""Test that bad fields, thresholds and unauthenticated pantry matching fail before streaming"""
+	response = client.get("/recipes/search/stream", params={"query": "lamb", "fields": "nope"})
+	assert response.status_code == 400
+
+	# A score never exceeds 100, so such a threshold matches nothing rather than every title match
+	for endpoint in ("/recipes/search/", "/recipes/search/stream"):
+		for threshold in (101, -1):
+			response = client.get(endpoint, params={"query": "lamb", "threshold": threshold})
+			assert response.status_code == 400
+
+	response = client.get("/recipes/search/stream", params={"query": "lamb", "pantry_match": True})
+	assert response.status_code == 401
+
+	events = _stream_events(client, {"query": "lamb", "pantry_match": True, "fields": "title"}, authenticate_demo_user)
+	items = [item for event in events if event["type"] == "results" for item in event["items"]]
+	assert items and all("pantry_have" in item for item in items)
@@ -0,0 +1,44 @@
+def _ingredient_ids(client, recipe_id):
+	recipe = client.get(f"/recipes/{recipe_id}").json()
+	return {int(i) for i in recipe["ingredient_id_list"].split(",")}
+
+
+def test_shopping_list_is_union_minus_pantry(client, test_seed_data, authenticate_demo_user):
+	"""Test that the list covers every requested recipe once, without what the pantry holds"""
+	needed = _ingredient_ids(client, 2) | _ingredient_ids(client, 3)
+	pantry = {item["ingredient_id"] for item in client.get("/pantryingredient/pantry", headers=authenticate_demo_user).json()}
+
+	response = client.post("/shopping-list/", json={"recipe_ids": [2, 3, 2, 999999]}, headers=authenticate_demo_user)
+	assert response.status_code == 200
+	data = response.json()
+	assert data["recipe_ids"] == [2, 3]
+	assert data["unknown_recipe_ids"] == [999999]
+	assert {item["ingredient_id"] for item in data["items"]} == needed - pantry
+	assert data["in_pantry"] == len(needed & pantry)
+	for item in data["items"]:
+		assert item["recipe_ids"] == [r for r in (2, 3) if item["ingredient_id"] in _ingredient_ids(client, r)]
+
+	# Anonymous callers have no pantry to subtract
+	response = client.post("/shopping-list/", json={"recipe_ids": [2, 3]})
+	assert {item["ingredient_id"] for item in response.json()["items"]} == needed
+
+
+def test_shopping_list_export(client, test_seed_data, authenticate_demo_user):
+	"""Test that the list downloads as a streamed checklist or CSV"""
+	data = client.post("/shopping-list/", json={"recipe_ids": [2]}, headers=authenticate_demo_user).json()
+
+	response = client.post("/shopping-list/export", json={"recipe_ids": [2]}, headers=authenticate_demo_user)
+	assert response.status_code == 200
+	assert response.headers["content-type"].startswith("text/plain")
+	assert "attachment" in response.headers["content-disposition"]
+	assert client.get("/recipes/2").json()["title"] in response.text
+	assert all(f"[ ] {item['name']}" in response.text for item in data["items"])
+
+	response = client.post("/shopping-list/export", params={"format": "csv"}, json={"recipe_ids": [2]})
+	assert response.status_code == 200
+	assert response.text.splitlines()[0] == "ingredient_id,ingredient,recipes"
+
+	response = client.post("/shopping-list/export", params={"format": "pdf"}, json={"recipe_ids": [2]})
+	assert response.status_code == 400
+	response = client.post("/shopping-list/", json={"recipe_ids": []})
+	assert response.status_code == 400
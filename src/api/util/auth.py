@@ -2,17 +2,19 @@ import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
 
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from src.api.controllers import user as user_controller
-from src.api.dependencies.database import get_db
+from src.api.dependencies.database import get_db, get_read_db
 from src.api.models.user import User as UserModel, Role
 from src.api.schemas.user import User as UserSchema
+from src.api.util import lazy
+
+# Only the login, signup and token-checking paths need these; see util/lazy.py
+argon2 = lazy.module("argon2")
+jwt = lazy.module("jose.jwt")
 
 # Use a sensible default for development; production should set AUTH_SECRET_KEY.
 SECRET_KEY = os.getenv("AUTH_SECRET_KEY", "dev-secret")
@@ -20,14 +22,22 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
+_password_hasher = None
+
 
-# Argon2 password hasher with secure defaults
-ph = PasswordHasher()
+def password_hasher():
+	"""Argon2 password hasher with secure defaults, created on first use."""
+	global _password_hasher
+	if _password_hasher is None:
+		_password_hasher = argon2.PasswordHasher()
+	return _password_hasher
 
 
 def hash_password(password: str) -> str:
 	"""Hash a password using Argon2."""
-	return ph.hash(password)
+	return password_hasher().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -36,9 +46,9 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 	Returns True if the password matches, False otherwise.
 	"""
 	try:
-		ph.verify(hashed_password, plain_password)
+		password_hasher().verify(hashed_password, plain_password)
 		return True
-	except VerifyMismatchError:
+	except argon2.exceptions.VerifyMismatchError:
 		return False
 
 
@@ -74,12 +84,7 @@ def create_access_token(data: Dict[str, str], expires_delta: Optional[timedelta]
 	return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserSchema:
-	"""Decode JWT token and return the corresponding active user schema.
-
-	Raises HTTP 401 if the token is invalid or the user does not exist.
-	"""
-
+def _user_from_token(token: str, db: Session) -> UserSchema:
 	credentials_exception = HTTPException(
 		status_code=status.HTTP_401_UNAUTHORIZED,
 		detail="Could not validate credentials",
@@ -91,7 +96,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
 		username: Optional[str] = payload.get("sub")
 		if not username:
 			raise credentials_exception
-	except JWTError:
+	except jwt.JWTError:
 		raise credentials_exception
 
 	db_user = user_controller.read_user_by_username(db, username=username)
@@ -100,6 +105,37 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
 	return convert_db_user_to_user(db_user)
 
 
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserSchema:
+	"""Decode JWT token and return the corresponding active user schema.
+
+	Raises HTTP 401 if the token is invalid or the user does not exist.
+	"""
+	return _user_from_token(token, db)
+
+
+def get_optional_current_user(token: Optional[str] = Depends(optional_oauth2_scheme),
+                              db: Session = Depends(get_read_db)) -> Optional[UserSchema]:
+	"""Like get_current_active_user for public routes: None instead of 401 when not signed in.
+
+	Reads the user through the route's read session (get_read_db), not the primary.
+	"""
+	if not token:
+		return None
+	try:
+		current_user = _user_from_token(token, db)
+	except HTTPException:
+		return None
+	return current_user if current_user.is_active else None
+
+
+def get_pantry_user(pantry_match: bool = False, token: Optional[str] = Depends(optional_oauth2_scheme),
+                    db: Session = Depends(get_read_db)) -> Optional[UserSchema]:
+	"""get_optional_current_user for routes with a ``pantry_match`` flag: the user is only looked up when it is set."""
+	if not pantry_match:
+		return None
+	return get_optional_current_user(token, db)
+
+
 async def get_current_active_user(current_user: UserSchema = Depends(get_current_user)) -> UserSchema:
 	"""Ensure the current user is active; otherwise raise HTTP 400."""
 	if not current_user.is_active:
@@ -0,0 +1,169 @@
+"""Catalogue version: tells everything derived from recipes, ingredients and categories when to refresh.
+
+``current_version()`` is a per-process counter, so comparing against it costs nothing. It advances
+after every committed catalogue write made through ``SessionLocal`` in this process, and -- via
+``poll()``, run every ``POLL_INTERVAL`` seconds by ``watcher`` -- when another worker's write moved
+the shared ``catalogue_version`` row, which every catalogue-writing transaction increments.
+"""
+import logging
+import os
+import threading
+from typing import Callable, List, Optional
+
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.api.dependencies.database import SessionLocal, engine
+from src.api.models.catalogue_version import CatalogueVersion
+from src.api.models.category import Category
+from src.api.models.ingredient import Ingredient
+from src.api.models.recipe import Recipe
+
+logger = logging.getLogger(__name__)
+
+# Writes to these models change what searches and catalogue views return
+CATALOGUE_MODELS = (Recipe, Ingredient, Category)
+
+# Seconds between checks of the shared version row; bounds how long other workers' writes go unseen
+POLL_INTERVAL = float(os.environ.get("CATALOGUE_POLL_INTERVAL", "1"))
+
+_version = 0
+_lock = threading.Lock()
+_listeners: List[Callable[[int], None]] = []
+# Value of the shared row as of this process's last local commit or poll
+_shared_version: Optional[int] = None
+
+
+def current_version() -> int:
+	"""Return the catalogue version; it increases after every committed catalogue write."""
+	return _version
+
+
+def _advance() -> int:
+	global _version
+	with _lock:
+		_version += 1
+		return _version
+
+
+def bump() -> int:
+	"""Advance the catalogue version, invalidating everything derived from the old one."""
+	version = _advance()
+	for listener in _listeners:
+		listener(version)
+	return version
+
+
+def on_change(listener: Callable[[int], None]):
+	"""Call ``listener(version)`` after every local bump (e.g. to rebuild state shared across workers).
+
+	Changes noticed by ``poll()`` are not reported: the worker that wrote already did.
+	"""
+	_listeners.append(listener)
+
+
+def poll() -> bool:
+	"""Advance the version if another process changed the catalogue since; returns whether it did."""
+	global _shared_version
+	try:
+		with engine.connect() as connection:
+			shared = connection.execute(select(CatalogueVersion.version)).scalar()
+	except SQLAlchemyError:
+		logger.warning("Could not read the shared catalogue version", exc_info=True)
+		return False
+	with _lock:
+		changed = shared != _shared_version
+		_shared_version = shared
+	if changed:
+		_advance()
+	return changed
+
+
+class VersionWatcher:
+	"""Background thread calling poll() every ``interval`` seconds."""
+
+	def __init__(self, interval: float = POLL_INTERVAL):
+		self.interval = interval
+		self._thread: Optional[threading.Thread] = None
+		self._stopped = threading.Event()
+
+	def start(self):
+		if self._thread is None:
+			self._stopped.clear()
+			poll()
+			self._thread = threading.Thread(target=self._run, name="catalogue-version", daemon=True)
+			self._thread.start()
+
+	def _run(self):
+		while not self._stopped.wait(self.interval):
+			poll()
+
+	def shutdown(self):
+		self._stopped.set()
+		thread, self._thread = self._thread, None
+		if thread is not None:
+			thread.join()
+
+
+watcher = VersionWatcher()
+
+
+def _is_catalogue_object(obj) -> bool:
+	return isinstance(obj, CATALOGUE_MODELS)
+
+
+def _increment_shared(session):
+	"""Increment the shared row in the writing transaction (once), so it commits with the write."""
+	if session.info.get("catalogue_shared_version") is not None:
+		return
+	connection = session.connection()
+	table = CatalogueVersion.__table__
+	connection.execute(update(table).values(version=table.c.version + 1))
+	session.info["catalogue_shared_version"] = connection.execute(select(table.c.version)).scalar()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_flush(session, flush_context):
+	if any(_is_catalogue_object(obj) for obj in (*session.new, *session.dirty, *session.deleted)):
+		session.info["catalogue_changed"] = True
+		_increment_shared(session)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_bulk_write(orm_execute_state):
+	# query.update()/query.delete() bypass the flush, so catch them here
+	if orm_execute_state.is_update or orm_execute_state.is_delete:
+		mapper = orm_execute_state.bind_mapper
+		if mapper is not None and issubclass(mapper.class_, CATALOGUE_MODELS):
+			orm_execute_state.session.info["catalogue_changed"] = True
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _increment_for_bulk_write(session):
+	if session.info.get("catalogue_changed"):
+		_increment_shared(session)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_on_commit(session):
+	global _shared_version
+	# Bump only once the data is visible to other sessions
+	shared = session.info.pop("catalogue_shared_version", None)
+	if session.info.pop("catalogue_changed", False):
+		if shared is not None:
+			with _lock:
+				# Our own increment; poll() need not report it again
+				_shared_version = shared
+		bump()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_on_rollback(session):
+	session.info.pop("catalogue_changed", None)
+	session.info.pop("catalogue_shared_version", None)
+
+
+@event.listens_for(CatalogueVersion.__table__, "after_create")
+def _forget_shared_version(target, connection, **kw):
+	global _shared_version
+	_shared_version = None
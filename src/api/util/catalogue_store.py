@@ -0,0 +1,232 @@
+"""Compact, columnar in-memory copy of the search- and match-relevant catalogue fields.
+
+ORM instances cost kilobytes each (instance state, ``__dict__``, identity map), so the
+whole-catalogue scans in search and pantry matching read this store instead:
+
+- integer fields live in ``array`` columns (8 bytes per value);
+- strings live in a ``StringColumn``: one UTF-8 blob plus an offsets array, i.e. the
+  encoded length + 8 bytes per row instead of a ~50-byte ``str`` object each;
+- each recipe's ingredient ids form a slice of one flat array (CSR layout).
+
+``CatalogueStore.stats()`` reports the measured footprint; at typical title/description
+lengths a recipe costs a few hundred bytes, so a million recipes fit in a few hundred MB.
+The store is rebuilt on first use after each catalogue version bump, unless workers share a
+memory-mapped copy (see ``shared_catalogue``).
+"""
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.api.models.ingredient import Ingredient
+from src.api.models.recipe import Recipe
+from src.api.util import catalogue
+from src.api.util.id_list import parse_id_list
+
+# Rows fetched per round trip while building; keeps peak memory flat for large catalogues
+BUILD_BATCH_SIZE = 10_000
+
+
+def _nbytes(column) -> int:
+	if isinstance(column, memoryview):
+		return column.nbytes
+	return len(column) * column.itemsize if isinstance(column, array) else len(column)
+
+
+class StringColumn:
+	"""Immutable sequence of strings stored as one UTF-8 buffer and an offsets array."""
+	__slots__ = ("offsets", "data")
+
+	def __init__(self, offsets: Sequence[int], data):
+		self.offsets = offsets
+		self.data = data
+
+	@classmethod
+	def build(cls, values: Iterable[str]) -> "StringColumn":
+		column = cls(array("q", [0]), bytearray())
+		for value in values:
+			column.append(value)
+		return column
+
+	def append(self, value: str):
+		"""Add a string while building (only valid before the column is published)."""
+		self.data += value.encode()
+		self.offsets.append(len(self.data))
+
+	def __len__(self) -> int:
+		return len(self.offsets) - 1
+
+	def __getitem__(self, index: int) -> str:
+		return bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode()
+
+	def __iter__(self) -> Iterator[str]:
+		return (self[index] for index in range(len(self)))
+
+	def nbytes(self) -> int:
+		return _nbytes(self.offsets) + _nbytes(self.data)
+
+
+class IdListColumn:
+	"""Immutable sequence of integer lists stored as one flat array plus offsets (CSR)."""
+	__slots__ = ("offsets", "values")
+
+	def __init__(self, offsets: Sequence[int], values: Sequence[int]):
+		self.offsets = offsets
+		self.values = values
+
+	@classmethod
+	def build(cls, lists: Iterable[Iterable[int]]) -> "IdListColumn":
+		column = cls(array("q", [0]), array("q"))
+		for ids in lists:
+			column.append(ids)
+		return column
+
+	def append(self, ids: Iterable[int]):
+		"""Add a list while building (only valid before the column is published)."""
+		self.values.extend(ids)
+		self.offsets.append(len(self.values))
+
+	def __len__(self) -> int:
+		return len(self.offsets) - 1
+
+	def __getitem__(self, index: int) -> Sequence[int]:
+		return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+	def __iter__(self) -> Iterator[Sequence[int]]:
+		return (self[index] for index in range(len(self)))
+
+	def nbytes(self) -> int:
+		return _nbytes(self.offsets) + _nbytes(self.values)
+
+
+class CatalogueStore:
+	"""Recipes and ingredients as parallel columns, ordered by id.
+
+	Recipe row ``i`` is ``recipe_ids[i]``, ``titles[i]``, ``descriptions[i]`` (both
+	lowercased for matching) and ``recipe_ingredients[i]``; ingredient row ``j`` is
+	``ingredient_ids[j]`` and ``ingredient_names[j]`` (lowercased). ``j`` is also the ingredient's
+	dense ordinal, its bit in the pantry-match bitmaps.
+	"""
+	__slots__ = ("version", "recipe_ids", "titles", "descriptions", "recipe_ingredients",
+	             "ingredient_ids", "ingredient_names")
+
+	def __init__(self, version: int, recipe_ids: Sequence[int], titles: StringColumn, descriptions: StringColumn,
+	             recipe_ingredients: IdListColumn, ingredient_ids: Sequence[int], ingredient_names: StringColumn):
+		self.version = version
+		self.recipe_ids = recipe_ids
+		self.titles = titles
+		self.descriptions = descriptions
+		self.recipe_ingredients = recipe_ingredients
+		self.ingredient_ids = ingredient_ids
+		self.ingredient_names = ingredient_names
+
+	@classmethod
+	def from_rows(cls, version: int, recipes: Iterable[Tuple[int, str, Optional[str], Optional[str]]],
+	              ingredients: Iterable[Tuple[int, str]]) -> "CatalogueStore":
+		"""Build from (id, title, description, ingredient_id_list) and (id, name) rows sorted by id."""
+		recipe_ids = array("q")
+		titles = StringColumn(array("q", [0]), bytearray())
+		descriptions = StringColumn(array("q", [0]), bytearray())
+		recipe_ingredients = IdListColumn(array("q", [0]), array("q"))
+		# Columns are filled row by row so no per-row Python objects outlive the loop
+		for recipe_id, title, description, id_list in recipes:
+			recipe_ids.append(recipe_id)
+			titles.append((title or "").lower())
+			descriptions.append((description or "").lower())
+			recipe_ingredients.append(parse_id_list(id_list))
+
+		ingredient_ids = array("q")
+		ingredient_names = StringColumn(array("q", [0]), bytearray())
+		for ingredient_id, name in ingredients:
+			ingredient_ids.append(ingredient_id)
+			ingredient_names.append(name.lower())
+
+		return cls(version, recipe_ids, titles, descriptions, recipe_ingredients, ingredient_ids, ingredient_names)
+
+	@classmethod
+	def from_db(cls, db: Session, version: int) -> "CatalogueStore":
+		# Column tuples rather than entities: no ORM instances are created while building
+		recipes = (
+			db.query(Recipe.id, Recipe.title, Recipe.description, Recipe.ingredient_id_list)
+			.order_by(Recipe.id)
+			.yield_per(BUILD_BATCH_SIZE)
+		)
+		ingredients = db.query(Ingredient.id, Ingredient.name).order_by(Ingredient.id).yield_per(BUILD_BATCH_SIZE)
+		return cls.from_rows(version, recipes, ingredients)
+
+	def __len__(self) -> int:
+		return len(self.recipe_ids)
+
+	@staticmethod
+	def _find(ids: Sequence[int], value: int) -> Optional[int]:
+		index = bisect_left(ids, value)
+		return index if index < len(ids) and ids[index] == value else None
+
+	def index_of(self, recipe_id: int) -> Optional[int]:
+		"""Row of a recipe id, or None if it is not in the store."""
+		return self._find(self.recipe_ids, recipe_id)
+
+	def ingredient_name(self, ingredient_id: int) -> Optional[str]:
+		index = self._find(self.ingredient_ids, ingredient_id)
+		return None if index is None else self.ingredient_names[index]
+
+	def nbytes(self) -> int:
+		return (
+			_nbytes(self.recipe_ids) + self.titles.nbytes() + self.descriptions.nbytes()
+			+ self.recipe_ingredients.nbytes() + _nbytes(self.ingredient_ids) + self.ingredient_names.nbytes()
+		)
+
+	def stats(self) -> Dict[str, int]:
+		recipe_bytes = (
+			_nbytes(self.recipe_ids) + self.titles.nbytes() + self.descriptions.nbytes() + self.recipe_ingredients.nbytes()
+		)
+		return {
+			"version": self.version,
+			"recipes": len(self),
+			"ingredients": len(self.ingredient_ids),
+			"size_bytes": self.nbytes(),
+			"bytes_per_recipe": recipe_bytes // len(self) if len(self) else 0,
+		}
+
+
+_store: Optional[CatalogueStore] = None
+_lock = threading.Lock()
+
+
+def current_version() -> int:
+	"""Version of the store get_store() returns, without building one.
+
+	The snapshot stamp when a shared snapshot is mapped, else this process's catalogue version.
+	"""
+	from src.api.util.shared_catalogue import shared_store
+	if shared_store is not None:
+		store = shared_store.current()
+		if store is not None:
+			return store.version
+	return catalogue.current_version()
+
+
+def get_store(db: Session) -> CatalogueStore:
+	"""Return the store for the current catalogue version, rebuilding it if a write happened since.
+
+	With a shared snapshot configured, the memory-mapped store is returned instead (once the
+	first snapshot has been written).
+	"""
+	from src.api.util.shared_catalogue import shared_store
+	if shared_store is not None:
+		store = shared_store.current()
+		if store is not None:
+			return store
+
+	global _store
+	version = catalogue.current_version()
+	store = _store
+	if store is not None and store.version == version:
+		return store
+
+	with _lock:
+		if _store is None or _store.version != version:
+			_store = CatalogueStore.from_db(db, version)
+		return _store
@@ -0,0 +1,98 @@
+"""Immutable in-memory snapshot of the categories table.
+
+Categories are a handful of rows that almost never change, so the public read endpoints
+serve them from a snapshot instead of opening a session per request. Writes build a new
+snapshot and swap the module reference in one assignment; readers holding the old one
+keep a consistent view. Each snapshot records the catalogue store version it was read at,
+and is reloaded once that version moves on. Writes made by other workers move it too: through
+the shared snapshot when one is configured, else once catalogue.poll() sees the shared version
+row change (within ``catalogue.POLL_INTERVAL`` seconds).
+"""
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.api.dependencies.database import Base, SessionLocal
+from src.api.models.category import Category
+from src.api.util import catalogue_store
+
+
+@dataclass(frozen=True)
+class CategoryEntry:
+	id: int
+	name: str
+	description: Optional[str]
+
+
+class CategorySnapshot:
+	__slots__ = ("items", "by_id", "version")
+
+	def __init__(self, entries: Iterable[CategoryEntry], version: Optional[int] = None):
+		self.version = version
+		self.items: Tuple[CategoryEntry, ...] = tuple(entries)
+		self.by_id = MappingProxyType({entry.id: entry for entry in self.items})
+
+
+_snapshot: Optional[CategorySnapshot] = None
+_lock = threading.Lock()
+
+
+def load(db: Optional[Session] = None) -> CategorySnapshot:
+	"""Read the categories table into a new snapshot and publish it."""
+	global _snapshot
+	# Read before the rows, so a write landing in between leaves the snapshot marked stale
+	version = catalogue_store.current_version()
+	session = db or SessionLocal()
+	try:
+		rows = session.query(Category.id, Category.name, Category.description).order_by(Category.id).all()
+	finally:
+		if db is None:
+			session.close()
+
+	snapshot = CategorySnapshot((CategoryEntry(*row) for row in rows), version)
+	_snapshot = snapshot
+	return snapshot
+
+
+def current() -> CategorySnapshot:
+	"""The published snapshot, (re)loaded if startup did not load it or the catalogue has changed since."""
+	snapshot = _snapshot
+	if snapshot is not None and snapshot.version == catalogue_store.current_version():
+		return snapshot
+	with _lock:
+		snapshot = _snapshot
+		if snapshot is not None and snapshot.version == catalogue_store.current_version():
+			return snapshot
+		return load()
+
+
+def invalidate():
+	global _snapshot
+	_snapshot = None
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_flush(session, flush_context):
+	if any(isinstance(obj, Category) for obj in (*session.new, *session.dirty, *session.deleted)):
+		session.info["categories_changed"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_on_commit(session):
+	# Writes outside controllers/category.py (seeding, scripts) drop the snapshot to be reloaded lazily
+	if session.info.pop("categories_changed", False):
+		invalidate()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_on_rollback(session):
+	session.info.pop("categories_changed", None)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _invalidate_on_create(target, connection, **kw):
+	invalidate()
@@ -0,0 +1,118 @@
+import gzip
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+	import brotli
+except ImportError:  # brotli is optional; gzip is always available
+	brotli = None
+
+# Responses smaller than this are sent as-is; compressing them costs more than it saves
+MINIMUM_SIZE = 500
+
+# Already-compressed or streamed payloads are never re-compressed
+EXCLUDED_CONTENT_TYPES = ("image/", "video/", "audio/", "text/event-stream", "application/gzip", "application/zip")
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+	"""Parse an Accept-Encoding header into a {coding: q-value} map."""
+	codings = {}
+	for part in header.split(','):
+		coding, _, params = part.strip().partition(';')
+		coding = coding.strip().lower()
+		if not coding:
+			continue
+		q = 1.0
+		params = params.strip()
+		if params.startswith("q="):
+			try:
+				q = float(params[2:])
+			except ValueError:
+				q = 0.0
+		codings[coding] = q
+	return codings
+
+
+def select_encoding(header: str) -> Optional[str]:
+	"""Pick the best supported coding for the client, preferring brotli on ties."""
+	codings = parse_accept_encoding(header)
+	supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+	best, best_q = None, 0.0
+	for coding in supported:
+		q = codings.get(coding, codings.get("*", 0.0))
+		if q > best_q:
+			best, best_q = coding, q
+	return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+	"""Compress a body with the given coding ("br" or "gzip")."""
+	if encoding == "br":
+		# Quality 5 is the usual sweet spot for on-the-fly compression
+		return brotli.compress(body, quality=5)
+	return gzip.compress(body, compresslevel=6)
+
+
+class CompressionMiddleware:
+	"""ASGI middleware negotiating brotli/gzip compression for buffered responses.
+
+	Only single-chunk bodies above ``minimum_size`` are compressed. Streaming responses
+	(more than one body chunk) are passed through untouched so they keep flushing promptly.
+	"""
+
+	def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE) -> None:
+		self.app = app
+		self.minimum_size = minimum_size
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+
+		encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+		if encoding is None:
+			await self.app(scope, receive, send)
+			return
+
+		start_message: Optional[Message] = None
+		passthrough = False
+
+		async def send_wrapper(message: Message) -> None:
+			nonlocal start_message, passthrough
+
+			if passthrough:
+				await send(message)
+				return
+
+			if message["type"] == "http.response.start":
+				start_message = message
+				return
+
+			if message["type"] != "http.response.body" or start_message is None:
+				await send(message)
+				return
+
+			headers = MutableHeaders(scope=start_message)
+			body = message.get("body", b"")
+			content_type = headers.get("content-type", "")
+
+			if (message.get("more_body", False)
+					or "content-encoding" in headers
+					or len(body) < self.minimum_size
+					or content_type.startswith(EXCLUDED_CONTENT_TYPES)):
+				passthrough = True
+				await send(start_message)
+				await send(message)
+				return
+
+			body = compress(body, encoding)
+			headers["content-encoding"] = encoding
+			headers["content-length"] = str(len(body))
+			headers.add_vary_header("Accept-Encoding")
+			await send(start_message)
+			await send({"type": "http.response.body", "body": body})
+
+		await self.app(scope, receive, send_wrapper)
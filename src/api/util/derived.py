@@ -0,0 +1,113 @@
+"""Per-process structures derived from the catalogue, rebuilt off the request path.
+
+``DerivedIndex.get`` returns the structure built for the current catalogue store version
+(``catalogue_store.current_version``). Once the store has moved on, the previous structure
+keeps being served while a background thread builds the next one, which is then published
+with one assignment; readers never wait for a rebuild. Only the first build in a process --
+nothing to serve yet -- runs on the caller's thread, and ``warm`` starts it at startup.
+
+Each worker keeps its own copy, so this is a thread rather than a ``jobs`` entry: a job runs
+in one worker only.
+"""
+import logging
+import threading
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.api.dependencies.database import Base, SessionLocal
+from src.api.util import catalogue_store
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_indexes: List["DerivedIndex"] = []
+
+
+class DerivedIndex(Generic[T]):
+	"""A value computed by ``build(db)`` from the catalogue, swapped in when a newer one is ready."""
+
+	def __init__(self, name: str, build: Callable[[Session], T]):
+		self.name = name
+		self._build = build
+		self._current: Optional[Tuple[int, T]] = None  # (store version read before building, value)
+		self._generation = 0  # bumped by reset(), so builds against a replaced database are discarded
+		self._rebuilding = False
+		self._lock = threading.Lock()
+		self._build_lock = threading.Lock()  # one build at a time; a first get() waits for a running one
+		_indexes.append(self)
+
+	def peek(self) -> Optional[T]:
+		"""The published value, or None before the first build."""
+		current = self._current
+		return current[1] if current is not None else None
+
+	@property
+	def version(self) -> Optional[int]:
+		"""Catalogue version the published value was built for; part of cache keys for results using it."""
+		current = self._current
+		return current[0] if current is not None else None
+
+	def get(self, db: Session) -> T:
+		"""The published value, starting a background rebuild if the catalogue has changed since."""
+		current = self._current
+		if current is None:
+			return self.refresh(db, only_if_missing=True)
+		if current[0] != catalogue_store.current_version():
+			self.rebuild_in_background()
+		return current[1]
+
+	def refresh(self, db: Session, only_if_missing: bool = False) -> T:
+		"""Build and publish on the caller's thread."""
+		with self._build_lock:
+			current = self._current
+			if only_if_missing and current is not None:
+				return current[1]
+			generation = self._generation
+			# Read the version first: a write landing mid-build leaves the result marked older,
+			# so it is rebuilt again rather than kept
+			version = catalogue_store.current_version()
+			value = self._build(db)
+			if generation == self._generation:
+				self._current = (version, value)
+			return value
+
+	def rebuild_in_background(self):
+		with self._lock:
+			if self._rebuilding:
+				return
+			self._rebuilding = True
+		threading.Thread(target=self._rebuild, name=f"rebuild-{self.name}", daemon=True).start()
+
+	def _rebuild(self):
+		try:
+			db = SessionLocal()
+			try:
+				self.refresh(db)
+			finally:
+				db.close()
+		except Exception:
+			logger.exception("Rebuilding %s failed; serving the previous version", self.name)
+		finally:
+			with self._lock:
+				self._rebuilding = False
+
+	def warm(self):
+		"""Start the first build in the background (application startup)."""
+		if self._current is None:
+			self.rebuild_in_background()
+
+	def reset(self):
+		"""Forget the published value; the next get() builds afresh."""
+		with self._lock:
+			self._generation += 1
+			self._current = None
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _reset_on_create(target, connection, **kw):
+	# Structures built from a previous database must not be served for this one
+	for index in _indexes:
+		index.reset()
@@ -0,0 +1,79 @@
+"""Query cost limits for the GraphQL endpoint.
+
+Depth is capped by strawberry's ``QueryDepthLimiter``. ``complexity_limit`` adds a
+validation rule that estimates how many objects a query can resolve: every field costs 1,
+and a list field multiplies the cost of its selections by its ``limit`` argument (or
+``LIST_ESTIMATE`` when it has none). Queries over the budget are rejected before any
+resolver runs.
+"""
+from typing import Optional, Set, Type
+
+from graphql import (
+	FieldNode, FragmentSpreadNode, GraphQLError, GraphQLList, GraphQLNonNull, GraphQLObjectType, InlineFragmentNode,
+	IntValueNode, OperationDefinitionNode, OperationType, SelectionSetNode, ValidationRule, get_named_type,
+)
+
+# Assumed length of list fields without a ``limit`` argument (a recipe's ingredients, a pantry)
+LIST_ESTIMATE = 10
+
+
+def _is_list(field_type) -> bool:
+	if isinstance(field_type, GraphQLNonNull):
+		field_type = field_type.of_type
+	return isinstance(field_type, GraphQLList)
+
+
+def _list_size(node: FieldNode, field_def, max_list_size: int) -> int:
+	for argument in node.arguments or ():
+		if argument.name.value == "limit":
+			if isinstance(argument.value, IntValueNode):
+				return min(int(argument.value.value), max_list_size)
+			return max_list_size  # a variable: assume the largest page
+	limit_arg = field_def.args.get("limit")
+	if limit_arg is not None and isinstance(limit_arg.default_value, int):
+		return limit_arg.default_value
+	return LIST_ESTIMATE
+
+
+def complexity_limit(max_complexity: int, max_list_size: int) -> Type[ValidationRule]:
+	"""Validation rule class rejecting operations estimated above ``max_complexity``."""
+
+	class ComplexityLimit(ValidationRule):
+		def _cost(self, selection_set: Optional[SelectionSetNode], parent: GraphQLObjectType, fragments: Set[str]) -> int:
+			if selection_set is None:
+				return 0
+			cost = 0
+			for selection in selection_set.selections:
+				if isinstance(selection, FieldNode):
+					name = selection.name.value
+					if name.startswith("__"):
+						continue  # introspection and __typename
+					field_def = parent.fields.get(name)
+					if field_def is None:
+						continue  # reported by the standard rules
+					child_type = get_named_type(field_def.type)
+					children = self._cost(selection.selection_set, child_type, fragments) \
+						if isinstance(child_type, GraphQLObjectType) else 0
+					multiplier = _list_size(selection, field_def, max_list_size) if _is_list(field_def.type) else 1
+					cost += 1 + multiplier * children
+				elif isinstance(selection, InlineFragmentNode):
+					cost += self._cost(selection.selection_set, parent, fragments)
+				elif isinstance(selection, FragmentSpreadNode):
+					name = selection.name.value
+					fragment = self.context.get_fragment(name)
+					if fragment is not None and name not in fragments:
+						cost += self._cost(fragment.selection_set, parent, fragments | {name})
+			return cost
+
+		def enter_operation_definition(self, node: OperationDefinitionNode, *_args):
+			root = self.context.schema.query_type if node.operation == OperationType.QUERY \
+				else self.context.schema.get_root_type(node.operation)
+			if root is None:
+				return
+			cost = self._cost(node.selection_set, root, set())
+			if cost > max_complexity:
+				self.report_error(GraphQLError(
+					f"Query complexity {cost} exceeds the maximum of {max_complexity}.", node,
+				))
+
+	return ComplexityLimit
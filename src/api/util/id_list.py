@@ -0,0 +1,18 @@
+from typing import Iterable, List, Optional
+
+
+def parse_id_list(value: Optional[str]) -> List[int]:
+	"""Parse a comma-separated id list (e.g. Recipe.ingredient_id_list), skipping blanks and junk."""
+	if not value:
+		return []
+	ids = []
+	for part in value.split(','):
+		part = part.strip()
+		if part.isdigit():
+			ids.append(int(part))
+	return ids
+
+
+def format_id_list(ids: Iterable[int]) -> str:
+	"""Inverse of parse_id_list."""
+	return ",".join(str(i) for i in ids)
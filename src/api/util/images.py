@@ -0,0 +1,271 @@
+"""Resized recipe images served from a size-bounded disk cache.
+
+``Recipe.image_url`` points at full-size remote images. ``ImagePipeline.render`` fetches a
+source once (the original bytes are kept in the cache too), produces a WebP or JPEG at one of
+``SIZES`` -- or a tiny blurred ``placeholder`` to show while a card loads -- and stores it
+under a key derived from the source URL, so a changed image_url never serves a stale file.
+
+``DiskCache`` evicts least-recently-used files once the directory grows past
+``IMAGE_CACHE_MAX_BYTES``. Resizing needs Pillow; without it ``available`` is False and the
+image endpoint redirects to the source instead.
+"""
+import hashlib
+import ipaddress
+import logging
+import os
+import socket
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Callable, Dict, List, Optional
+
+from src.api.util import lazy
+
+logger = logging.getLogger(__name__)
+
+try:
+	from PIL import Image, ImageFilter, ImageOps
+except ImportError:  # Pillow is optional; images are then served from their source
+	Image = None
+
+CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", ".image_cache")
+CACHE_MAX_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Size name -> output width in pixels (height follows the aspect ratio)
+SIZES: Dict[str, int] = {"thumb": 180, "card": 360, "large": 960}
+PLACEHOLDER = "placeholder"
+PLACEHOLDER_WIDTH = 24
+
+# Largest source accepted from a remote host
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+FETCH_TIMEOUT = 10.0
+# Redirect hops followed for one source; every hop is checked like the original URL
+MAX_REDIRECTS = 5
+
+# Locks serialising work on the same cache key (keys share a lock by hash)
+LOCK_STRIPES = 64
+
+MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+# Only needed when a source image is not cached yet
+httpx = lazy.module("httpx")
+
+
+class ImageSourceError(Exception):
+	"""The source image could not be fetched or decoded.
+
+	Messages may name internal hosts or addresses: log them, do not return them to clients.
+	"""
+
+
+def _is_public(address: str) -> bool:
+	"""Whether an IP address is globally routable (not loopback, private, link-local, reserved...)."""
+	ip = ipaddress.ip_address(address.split("%", 1)[0])  # drop an IPv6 zone id
+	if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+		ip = ip.ipv4_mapped
+	return ip.is_global and not (ip.is_multicast or ip.is_reserved or ip.is_unspecified)
+
+
+def _addresses(host: str, port: int):
+	return {info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)}
+
+
+def _check_url(url) -> None:
+	"""Refuse non-http(s) URLs and hosts resolving to any non-public address."""
+	if url.scheme not in ("http", "https") or not url.host:
+		raise ImageSourceError(f"Unsupported image URL: {url}")
+	try:
+		addresses = _addresses(url.host, url.port or (443 if url.scheme == "https" else 80))
+	except (OSError, UnicodeError) as e:
+		raise ImageSourceError(f"Could not resolve {url.host}: {e}") from e
+	if not addresses or not all(_is_public(address) for address in addresses):
+		raise ImageSourceError(f"Refusing to fetch {url}: {url.host} is not a public address")
+
+
+def _check_peer(response) -> None:
+	# The host may resolve differently at connect time (DNS rebinding), so check where we got
+	stream = response.extensions.get("network_stream")
+	peer = stream.get_extra_info("server_addr") if stream is not None else None
+	if peer and not _is_public(peer[0]):
+		raise ImageSourceError(f"Refusing to read {response.url}: connected to non-public address {peer[0]}")
+
+
+def fetch_source(url: str) -> bytes:
+	"""Download a source image over http(s).
+
+	image_url is user input, so the server must not be usable to reach internal services:
+	other schemes (file://...) are refused, and the host of the URL and of every redirect hop
+	must resolve to public addresses only, checked again on the connected socket. Proxy
+	environment variables are ignored so that check sees the real peer. Local setups and
+	tests swap ``ImagePipeline.fetcher`` instead.
+	"""
+	try:
+		with httpx.Client(timeout=FETCH_TIMEOUT, follow_redirects=False, trust_env=False) as client:
+			target = httpx.URL(url)
+			for _ in range(MAX_REDIRECTS + 1):
+				_check_url(target)
+				with client.stream("GET", target) as response:
+					_check_peer(response)
+					if response.is_redirect:
+						target = response.next_request.url
+						continue
+					response.raise_for_status()
+					data = bytearray()
+					for chunk in response.iter_bytes():
+						data += chunk
+						if len(data) > MAX_SOURCE_BYTES:
+							raise ImageSourceError(f"{url} is larger than {MAX_SOURCE_BYTES} bytes")
+					return bytes(data)
+	except (httpx.HTTPError, httpx.InvalidURL) as e:
+		raise ImageSourceError(f"Could not fetch {url}: {e}") from e
+	raise ImageSourceError(f"Could not fetch {url}: more than {MAX_REDIRECTS} redirects")
+
+
+class DiskCache:
+	"""Files in one directory, evicted least-recently-used first beyond ``max_bytes``.
+
+	Recency survives restarts through modification times: reads bump them, and the index is
+	rebuilt from a directory scan on first use.
+	"""
+
+	def __init__(self, directory: str, max_bytes: int):
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+		self._size = 0
+		self._lock = threading.Lock()
+		self._loaded = False
+
+	def _load(self):
+		os.makedirs(self.directory, exist_ok=True)
+		entries = []
+		for entry in os.scandir(self.directory):
+			if entry.is_file() and not entry.name.endswith(".tmp"):
+				stat = entry.stat()
+				entries.append((stat.st_mtime, entry.name, stat.st_size))
+		for _, key, size in sorted(entries):
+			self._entries[key] = size
+			self._size += size
+		self._loaded = True
+
+	def path(self, key: str) -> str:
+		return os.path.join(self.directory, key)
+
+	def get(self, key: str) -> Optional[str]:
+		"""Path of a cached file (marking it recently used), or None."""
+		with self._lock:
+			if not self._loaded:
+				self._load()
+			if key not in self._entries:
+				return None
+			path = self.path(key)
+			try:
+				os.utime(path)
+			except FileNotFoundError:
+				# Evicted by another worker sharing the directory
+				self._size -= self._entries.pop(key)
+				return None
+			self._entries.move_to_end(key)
+			return path
+
+	def put(self, key: str, data: bytes) -> str:
+		"""Store a file atomically, evicting old entries to stay within ``max_bytes``."""
+		path = self.path(key)
+		with self._lock:
+			if not self._loaded:
+				self._load()
+			tmp_path = f"{path}.{threading.get_ident()}.tmp"
+			with open(tmp_path, "wb") as f:
+				f.write(data)
+			os.replace(tmp_path, path)
+
+			self._size -= self._entries.pop(key, 0)
+			self._entries[key] = len(data)
+			self._size += len(data)
+			while self._size > self.max_bytes and len(self._entries) > 1:
+				old_key, old_size = self._entries.popitem(last=False)
+				self._size -= old_size
+				try:
+					os.remove(self.path(old_key))
+				except FileNotFoundError:
+					pass
+		return path
+
+	def stats(self) -> Dict[str, int]:
+		with self._lock:
+			if not self._loaded:
+				self._load()
+			return {"entries": len(self._entries), "size_bytes": self._size, "max_bytes": self.max_bytes}
+
+
+def _resize(source: bytes, width: int, image_format: str, blur: bool = False) -> bytes:
+	try:
+		image = Image.open(BytesIO(source))
+		image = ImageOps.exif_transpose(image).convert("RGB")
+	except Exception as e:
+		raise ImageSourceError(f"Could not decode image: {e}") from e
+
+	if image.width > width:
+		image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+	if blur:
+		image = image.filter(ImageFilter.GaussianBlur(1))
+
+	output = BytesIO()
+	if image_format == "webp":
+		image.save(output, "WEBP", quality=40 if blur else 80, method=4)
+	else:
+		image.save(output, "JPEG", quality=40 if blur else 82, optimize=True, progressive=not blur)
+	return output.getvalue()
+
+
+class ImagePipeline:
+	"""Fetch-once, resize-once access to recipe images through a ``DiskCache``."""
+
+	def __init__(self, cache: DiskCache, fetcher: Callable[[str], bytes] = fetch_source, lock_stripes: int = LOCK_STRIPES):
+		self.cache = cache
+		self.fetcher = fetcher
+		# Concurrent requests for the same image wait for one fetch/resize instead of repeating it.
+		# A fixed set of locks shared by hash, so memory does not grow with every key ever requested.
+		# render() takes a source lock while holding a render lock, never the reverse, so with
+		# separate sets two threads cannot wait on each other.
+		self._render_locks = [threading.Lock() for _ in range(lock_stripes)]
+		self._source_locks = [threading.Lock() for _ in range(lock_stripes)]
+
+	@property
+	def available(self) -> bool:
+		return Image is not None
+
+	@staticmethod
+	def _stripe(locks: List[threading.Lock], key: str) -> threading.Lock:
+		return locks[hash(key) % len(locks)]
+
+	def source(self, url: str) -> bytes:
+		"""Original bytes of ``url``, fetched on first use only."""
+		key = f"src-{hashlib.sha256(url.encode()).hexdigest()}"
+		with self._stripe(self._source_locks, key):
+			path = self.cache.get(key)
+			if path is None:
+				path = self.cache.put(key, self.fetcher(url))
+		with open(path, "rb") as f:
+			return f.read()
+
+	def render(self, url: str, size: str, image_format: str) -> str:
+		"""Path of ``url`` resized to ``size`` (a ``SIZES`` name or ``PLACEHOLDER``) in ``image_format``."""
+		digest = hashlib.sha256(url.encode()).hexdigest()[:24]
+		key = f"{digest}-{size}.{image_format}"
+		path = self.cache.get(key)
+		if path is not None:
+			return path
+
+		with self._stripe(self._render_locks, key):
+			path = self.cache.get(key)
+			if path is None:
+				if size == PLACEHOLDER:
+					data = _resize(self.source(url), PLACEHOLDER_WIDTH, image_format, blur=True)
+				else:
+					data = _resize(self.source(url), SIZES[size], image_format)
+				path = self.cache.put(key, data)
+		return path
+
+
+pipeline = ImagePipeline(DiskCache(CACHE_DIR, CACHE_MAX_BYTES))
@@ -0,0 +1,102 @@
+"""Import-time profile of the app, from ``python -X importtime``.
+
+Run ``python -m src.api.util.import_profile`` from the repository root for a table of the
+slowest imports of ``src.api.main`` in a fresh interpreter:
+
+    python -m src.api.util.import_profile --limit 20 --sort self
+
+``IMPORT_TIME_BUDGET_MS`` is the cold-import budget the test suite enforces; heavy
+dependencies belong behind ``util.lazy`` rather than in it.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple, Optional
+
+APP_MODULE = "src.api.main"
+
+# Cold import of APP_MODULE, excluding interpreter startup
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "2000"))
+
+# Dependencies only some routes use; importing the app must not load them
+LAZY_MODULES = ("fuzzywuzzy", "Levenshtein", "jose", "argon2", "httpx", "strawberry", "graphql")
+
+_PREFIX = "import time:"
+
+
+class ImportTiming(NamedTuple):
+	module: str
+	self_us: int
+	cumulative_us: int
+	depth: int  # nesting level in the import tree; 0 for imports made by the profiled code
+
+
+def parse(output: str) -> List[ImportTiming]:
+	"""Parse ``-X importtime`` stderr, skipping its header and unrelated lines."""
+	timings = []
+	for line in output.splitlines():
+		if not line.startswith(_PREFIX):
+			continue
+		fields = line[len(_PREFIX):].split("|")
+		if len(fields) != 3:
+			continue
+		try:
+			self_us, cumulative_us = int(fields[0]), int(fields[1])
+		except ValueError:
+			continue  # the "self [us] | cumulative | imported package" header
+		name = fields[2].rstrip()
+		module = name.lstrip()
+		timings.append(ImportTiming(module, self_us, cumulative_us, (len(name) - len(module) - 1) // 2))
+	return timings
+
+
+def profile(module: str = APP_MODULE, cwd: Optional[str] = None) -> List[ImportTiming]:
+	"""Import ``module`` in a fresh interpreter and return its import timings."""
+	result = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", f"import {module}"],
+		cwd=cwd, capture_output=True, text=True,
+	)
+	if result.returncode != 0:
+		raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+	return parse(result.stderr)
+
+
+def total_ms(timings: List[ImportTiming], module: str = APP_MODULE) -> float:
+	"""Cumulative import time of ``module`` in milliseconds."""
+	for timing in reversed(timings):
+		if timing.module == module:
+			return timing.cumulative_us / 1000
+	raise ValueError(f"{module} is not in the profile")
+
+
+def format_table(timings: List[ImportTiming], limit: int = 30, sort: str = "cumulative") -> str:
+	"""Text table of the ``limit`` slowest imports by ``sort`` ("cumulative" or "self")."""
+	key = (lambda timing: timing.self_us) if sort == "self" else (lambda timing: timing.cumulative_us)
+	rows = sorted(timings, key=key, reverse=True)[:limit]
+	width = max([len("module")] + [len(timing.module) for timing in rows])
+	lines = [f"{'module':<{width}}  {'self ms':>9}  {'cumulative ms':>13}  depth"]
+	lines.append("-" * len(lines[0]))
+	for timing in rows:
+		lines.append(
+			f"{timing.module:<{width}}  {timing.self_us / 1000:>9.1f}  {timing.cumulative_us / 1000:>13.1f}  {timing.depth:>5}"
+		)
+	return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Show the slowest imports of the app.")
+	parser.add_argument("module", nargs="?", default=APP_MODULE)
+	parser.add_argument("--limit", type=int, default=30)
+	parser.add_argument("--sort", choices=("cumulative", "self"), default="cumulative")
+	args = parser.parse_args(argv)
+
+	timings = profile(args.module)
+	print(format_table(timings, args.limit, args.sort))
+	total = total_ms(timings, args.module)
+	print(f"\n{args.module}: {total:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms)")
+	return 0 if args.module != APP_MODULE or total <= IMPORT_TIME_BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+	sys.exit(main())
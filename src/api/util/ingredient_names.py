@@ -0,0 +1,148 @@
+"""Ingredient name normalization and name -> canonical id resolution.
+
+``normalize`` maps spellings of the same ingredient ("Butter", "butter ", "Butters") to one
+key, stored in ``Ingredient.normalized_name`` and ``IngredientAlias.normalized_name``. The
+``resolver`` keeps an in-memory map from those keys to ingredient ids so ingredient create,
+bulk import and recipe submission resolve names without touching the database; misses fall
+back to the indexed normalized_name columns, never to a table scan. Each worker has its own
+map, so an id may be stale after another worker renamed or deleted the ingredient: paths that
+load the ingredient anyway use ``resolve_ingredient``, which notices and looks the name up again.
+"""
+import re
+import threading
+import unicodedata
+from typing import Dict, Optional
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from src.api.dependencies.database import Base
+from src.api.models.ingredient import Ingredient
+from src.api.models.ingredient_alias import IngredientAlias
+
+_PUNCTUATION = re.compile(r"[^\w\s'-]+", re.UNICODE)
+
+# Words that look plural but are not (or whose singular reads wrong)
+_INVARIANT = {"molasses", "grits", "greens", "brussels", "species", "series"}
+_IRREGULAR = {
+	"leaves": "leaf", "loaves": "loaf", "halves": "half", "geese": "goose",
+	"cookies": "cookie", "brownies": "brownie", "smoothies": "smoothie", "pies": "pie",
+}
+
+
+def singularize(word: str) -> str:
+	"""Singular form of an English food word, by suffix rules plus a few exceptions."""
+	if word in _INVARIANT or len(word) <= 3:
+		return word
+	if word in _IRREGULAR:
+		return _IRREGULAR[word]
+	if word.endswith("ies"):
+		return word[:-3] + "y"
+	if word.endswith("oes") or word.endswith(("ches", "shes", "sses", "xes", "zes")):
+		return word[:-2]
+	if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+		return word[:-1]
+	return word
+
+
+def normalize(name: str) -> str:
+	"""Canonical lookup key: NFKC, casefolded, punctuation stripped, whitespace collapsed, last word singular."""
+	name = unicodedata.normalize("NFKC", name).casefold()
+	words = _PUNCTUATION.sub(" ", name).split()
+	if not words:
+		return ""
+	words[-1] = singularize(words[-1])
+	return " ".join(words)
+
+
+@event.listens_for(Ingredient.name, "set")
+def _sync_normalized_name(target, value, oldvalue, initiator):
+	# Keeps ORM-created ingredients (controllers, seeding) in step with their name
+	target.normalized_name = normalize(value) if value is not None else None
+
+
+class NameResolver:
+	"""Thread-safe cache of normalized ingredient name (or alias) -> ingredient id."""
+
+	def __init__(self):
+		self._ids: Dict[str, int] = {}
+		self._lock = threading.Lock()
+
+	def resolve(self, db: Session, name: str) -> Optional[int]:
+		"""Id of the ingredient ``name`` refers to, or None if there is none."""
+		key = normalize(name)
+		if not key:
+			return None
+		with self._lock:
+			ingredient_id = self._ids.get(key)
+		if ingredient_id is not None:
+			return ingredient_id
+		return self._lookup(db, key)
+
+	def resolve_ingredient(self, db: Session, name: str) -> Optional[Ingredient]:
+		"""The ingredient ``name`` refers to, or None if there is none.
+
+		A cached id whose ingredient is gone or no longer carries the name (changed by another
+		worker) is dropped, and the name is looked up in the database instead.
+		"""
+		key = normalize(name)
+		if not key:
+			return None
+		with self._lock:
+			ingredient_id = self._ids.get(key)
+		if ingredient_id is not None:
+			ingredient = db.get(Ingredient, ingredient_id)
+			if ingredient is not None and (ingredient.normalized_name == key or db.query(IngredientAlias.id).filter(
+					IngredientAlias.normalized_name == key, IngredientAlias.ingredient_id == ingredient_id).first()):
+				return ingredient
+			with self._lock:
+				if self._ids.get(key) == ingredient_id:
+					del self._ids[key]
+
+		ingredient_id = self._lookup(db, key)
+		return db.get(Ingredient, ingredient_id) if ingredient_id is not None else None
+
+	def _lookup(self, db: Session, key: str) -> Optional[int]:
+		ingredient_id = (
+			db.query(Ingredient.id).filter(Ingredient.normalized_name == key).order_by(Ingredient.id).scalar()
+			or db.query(IngredientAlias.ingredient_id).filter(IngredientAlias.normalized_name == key).scalar()
+		)
+		if ingredient_id is not None:
+			self.remember(key, ingredient_id)
+		return ingredient_id
+
+	def remember(self, key: str, ingredient_id: int):
+		with self._lock:
+			self._ids[key] = ingredient_id
+
+	def forget_ingredient(self, ingredient_id: int):
+		"""Drop every key pointing at an ingredient (after a rename or delete)."""
+		with self._lock:
+			self._ids = {key: value for key, value in self._ids.items() if value != ingredient_id}
+
+	def clear(self):
+		with self._lock:
+			self._ids.clear()
+
+
+# Shared by the ingredient and recipe controllers
+resolver = NameResolver()
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _backfill_normalized_names(target, connection, **kw):
+	# Ids cached for a previous database are meaningless for this one
+	resolver.clear()
+
+	# Databases created before normalized_name existed get the column and its values here
+	columns = {column["name"] for column in inspect(connection).get_columns(Ingredient.__tablename__)}
+	if "normalized_name" not in columns:
+		connection.execute(text("ALTER TABLE ingredients ADD COLUMN normalized_name VARCHAR"))
+		connection.execute(text("CREATE INDEX IF NOT EXISTS ix_ingredients_normalized_name ON ingredients (normalized_name)"))
+
+	rows = connection.execute(text("SELECT id, name FROM ingredients WHERE normalized_name IS NULL")).all()
+	if rows:
+		connection.execute(
+			text("UPDATE ingredients SET normalized_name = :normalized WHERE id = :id"),
+			[{"id": ingredient_id, "normalized": normalize(name)} for ingredient_id, name in rows],
+		)
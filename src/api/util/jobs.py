@@ -0,0 +1,310 @@
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Any, Set
+
+from sqlalchemy import event, inspect, or_, text, update
+from sqlalchemy.orm import Session
+
+from src.api.dependencies.database import Base, SessionLocal
+from src.api.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Seconds before retry n (1-based) of a failed job
+RETRY_BACKOFF = 2.0
+
+# How long a claim on a running job holds without renewal. Runners renew their leases every
+# LEASE_SECONDS / 3, so only a runner that died (or hung for a whole lease) loses its jobs.
+LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "60"))
+
+
+def _now() -> datetime:
+	# Naive UTC, like the other DateTime columns: aware and naive values compare differently per database
+	return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _due(now: datetime):
+	return or_(Job.run_after.is_(None), Job.run_after <= now)
+
+
+HANDLERS: Dict[str, Callable[[Session, Dict[str, Any]], None]] = {}
+
+
+def handler(name: str):
+	"""Register a function ``fn(db, payload)`` as the handler for jobs called ``name``."""
+
+	def register(fn):
+		HANDLERS[name] = fn
+		return fn
+
+	return register
+
+
+def enqueue(db: Session, name: str, payload: Optional[Dict[str, Any]] = None) -> Job:
+	"""Add a job to the caller's transaction; it becomes runnable once that transaction commits.
+
+	An identical job that is still queued is reused rather than duplicated, so a burst of
+	writes triggers a single rebuild.
+	"""
+	if name not in HANDLERS:
+		raise ValueError(f"Unknown job: {name}")
+
+	encoded = json.dumps(payload, sort_keys=True) if payload is not None else None
+	same_payload = Job.payload.is_(None) if encoded is None else Job.payload == encoded
+	existing = db.query(Job).filter(Job.name == name, same_payload, Job.status == JobStatus.Queued).first()
+	if existing is not None:
+		return existing
+
+	job = Job(name=name, payload=encoded, status=JobStatus.Queued)
+	db.add(job)
+	db.flush()
+	db.info.setdefault("enqueued_jobs", []).append(job.id)
+	return job
+
+
+class JobRunner:
+	"""Executes queued jobs on a small in-process thread pool.
+
+	Jobs are persisted in the ``jobs`` table. Claiming a job is an atomic queued -> running
+	update that records this runner as the ``owner`` with a lease; a heartbeat thread renews
+	the leases of the jobs this runner is executing. Jobs whose lease has lapsed -- their
+	runner stopped or hung -- are re-queued by whichever runner notices first on its heartbeat,
+	so several workers can share one table without running a live job twice. A failed job is
+	re-queued with ``run_after`` set to the end of its backoff, which the claim honours.
+	"""
+
+	def __init__(self, max_workers: int = 2, lease_seconds: float = LEASE_SECONDS):
+		self.max_workers = max_workers
+		self.lease_seconds = lease_seconds
+		self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+		self._executor: Optional[ThreadPoolExecutor] = None
+		self._heartbeat: Optional[threading.Thread] = None
+		self._stopped = threading.Event()
+		self._running: Set[int] = set()
+		self._lock = threading.Lock()
+
+	@property
+	def started(self) -> bool:
+		return self._executor is not None
+
+	def start(self):
+		with self._lock:
+			if self._executor is None:
+				self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="jobs")
+				self._stopped.clear()
+				self._heartbeat = threading.Thread(target=self._beat, name="jobs-heartbeat", daemon=True)
+				self._heartbeat.start()
+		self._submit_queued()
+
+	def shutdown(self):
+		with self._lock:
+			executor, self._executor = self._executor, None
+			heartbeat, self._heartbeat = self._heartbeat, None
+		if executor is not None:
+			executor.shutdown(wait=True)
+		self._stopped.set()
+		if heartbeat is not None:
+			heartbeat.join()
+
+	def submit(self, job_id: int, delay: float = 0.0):
+		"""Schedule a queued job on the pool (no-op when the runner is not started)."""
+		if not self.started:
+			return
+		if delay > 0:
+			timer = threading.Timer(delay, self.submit, args=(job_id,))
+			timer.daemon = True
+			timer.start()
+			return
+		with self._lock:
+			if self._executor is not None:
+				self._executor.submit(self.run, job_id)
+
+	def _beat(self):
+		while not self._stopped.wait(self.lease_seconds / 3):
+			try:
+				self.heartbeat()
+			except Exception:
+				logger.exception("Job heartbeat failed")
+
+	def heartbeat(self):
+		"""Renew this runner's leases and take over jobs whose runner's lease lapsed."""
+		self.renew_leases()
+		# Only what was just reclaimed: every other queued job is already scheduled by some runner
+		for job_id in self.reclaim_expired():
+			self.submit(job_id)
+
+	def renew_leases(self) -> int:
+		"""Extend the leases of the jobs this runner is executing; returns how many were renewed."""
+		with self._lock:
+			running = list(self._running)
+		if not running:
+			return 0
+		db = SessionLocal()
+		try:
+			renewed = db.execute(
+				update(Job)
+				.where(Job.id.in_(running), Job.owner == self.owner, Job.status == JobStatus.Running)
+				.values(lease_expires_at=_now() + timedelta(seconds=self.lease_seconds))
+			).rowcount
+			db.commit()
+		finally:
+			db.close()
+		return renewed
+
+	def reclaim_expired(self) -> List[int]:
+		"""Re-queue running jobs whose lease has lapsed and return their ids.
+
+		Jobs without a lease were claimed before leases existed and count as lapsed.
+		"""
+		db = SessionLocal()
+		try:
+			expired = or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < _now())
+			job_ids = [job_id for (job_id,) in db.query(Job.id).filter(Job.status == JobStatus.Running, expired)]
+			reclaimed = []
+			for job_id in job_ids:
+				# Conditional, so a lease renewed in the meantime keeps its job
+				if db.execute(
+					update(Job)
+					.where(Job.id == job_id, Job.status == JobStatus.Running, expired)
+					.values(status=JobStatus.Queued, owner=None, lease_expires_at=None)
+				).rowcount:
+					reclaimed.append(job_id)
+			db.commit()
+		finally:
+			db.close()
+		if reclaimed:
+			logger.warning("Re-queued jobs %s after their lease expired", reclaimed)
+		return reclaimed
+
+	def _submit_queued(self):
+		"""At start: schedule every queued job, each once its backoff (``run_after``) has passed."""
+		self.reclaim_expired()
+		db = SessionLocal()
+		try:
+			queued = db.query(Job.id, Job.run_after).filter(Job.status == JobStatus.Queued).all()
+		finally:
+			db.close()
+		now = _now()
+		for job_id, run_after in queued:
+			self.submit(job_id, delay=(run_after - now).total_seconds() if run_after is not None else 0.0)
+
+	def _finish(self, db: Session, job_id: int, **values) -> bool:
+		# Only while still the owner: a runner whose lease lapsed must not overwrite the new run
+		return bool(db.execute(
+			update(Job)
+			.where(Job.id == job_id, Job.owner == self.owner, Job.status == JobStatus.Running)
+			.values(owner=None, lease_expires_at=None, **values)
+		).rowcount)
+
+	def run(self, job_id: int) -> bool:
+		"""Claim and execute one job; returns False if another worker already claimed it."""
+		db = SessionLocal()
+		try:
+			now = _now()
+			claimed = db.execute(
+				update(Job)
+				.where(Job.id == job_id, Job.status == JobStatus.Queued, _due(now))
+				.values(status=JobStatus.Running, attempts=Job.attempts + 1, started_at=now, owner=self.owner,
+				        lease_expires_at=now + timedelta(seconds=self.lease_seconds), run_after=None)
+			).rowcount
+			db.commit()
+			if not claimed:
+				return False
+			with self._lock:
+				self._running.add(job_id)
+
+			job = db.get(Job, job_id)
+			payload = json.loads(job.payload) if job.payload else {}
+			try:
+				HANDLERS[job.name](db, payload)
+				db.commit()
+			except Exception as e:
+				db.rollback()
+				logger.exception("Job %s (%s) failed", job_id, job.name)
+				job = db.get(Job, job_id)
+				retry = job.attempts < job.max_attempts
+				backoff = RETRY_BACKOFF * 2 ** (job.attempts - 1)
+				finished = self._finish(
+					db, job_id, last_error=str(e)[:1000],
+					status=JobStatus.Queued if retry else JobStatus.Failed,
+					finished_at=None if retry else _now(),
+					run_after=_now() + timedelta(seconds=backoff) if retry else None,
+				)
+				db.commit()
+				if retry and finished:
+					self.submit(job_id, delay=backoff)
+				return True
+
+			if not self._finish(db, job_id, status=JobStatus.Succeeded, last_error=None, finished_at=_now()):
+				logger.warning("Job %s finished after its lease expired; it was re-queued meanwhile", job_id)
+			db.commit()
+			return True
+		finally:
+			with self._lock:
+				self._running.discard(job_id)
+			db.close()
+
+	def run_pending(self) -> int:
+		"""Synchronously run every queued job that is due (CLI and tests); returns how many ran."""
+		db = SessionLocal()
+		try:
+			queued = [job_id for (job_id,) in db.query(Job.id).filter(Job.status == JobStatus.Queued, _due(_now()))
+			          .order_by(Job.id)]
+		finally:
+			db.close()
+		return sum(1 for job_id in queued if self.run(job_id))
+
+
+runner = JobRunner()
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _add_lease_columns(target, connection, **kw):
+	# Job tables created before leases (and retry times) existed get the columns here
+	columns = {column["name"] for column in inspect(connection).get_columns(Job.__tablename__)}
+	if "owner" not in columns:
+		connection.execute(text("ALTER TABLE jobs ADD COLUMN owner VARCHAR"))
+	if "lease_expires_at" not in columns:
+		connection.execute(text("ALTER TABLE jobs ADD COLUMN lease_expires_at DATETIME"))
+		connection.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_lease_expires_at ON jobs (lease_expires_at)"))
+	if "run_after" not in columns:
+		connection.execute(text("ALTER TABLE jobs ADD COLUMN run_after DATETIME"))
+		connection.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_run_after ON jobs (run_after)"))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _submit_enqueued(session):
+	for job_id in session.info.pop("enqueued_jobs", []):
+		runner.submit(job_id)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_enqueued(session):
+	session.info.pop("enqueued_jobs", None)
+
+
+@handler("rebuild_similar_recipes")
+def _rebuild_similar_recipes(db: Session, payload: Dict[str, Any]):
+	from src.api.util import recommendations
+	recommendations.rebuild(db)
+
+
+@handler("reindex_ingredient")
+def _reindex_ingredient(db: Session, payload: Dict[str, Any]):
+	from src.api.util import search_index
+	search_index.reindex_for_ingredient(db, payload["ingredient_id"])
+	# Search results cached before the re-index may be stale; invalidate them on commit
+	db.info["catalogue_changed"] = True
+
+
+@handler("build_catalogue_snapshot")
+def _build_catalogue_snapshot(db: Session, payload: Dict[str, Any]):
+	from src.api.util import shared_catalogue
+	if shared_catalogue.SNAPSHOT_PATH:
+		shared_catalogue.build(db, shared_catalogue.SNAPSHOT_PATH)
@@ -0,0 +1,42 @@
+"""Deferred imports for dependencies that only some routes use.
+
+``module("fuzzywuzzy.fuzz")`` returns a stand-in that imports the real module on first
+attribute access. Fuzzy search, Argon2 and JWT crypto are then loaded by the first request
+that needs them instead of by ``import src.api.main``, which keeps worker boot and test
+sessions fast. ``python -m src.api.util.import_profile`` shows what startup still imports.
+"""
+import importlib
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+	"""Proxy for a module that is imported when one of its attributes is first read."""
+
+	__slots__ = ("_name", "_module")
+
+	def __init__(self, name: str):
+		self._name = name
+		self._module: Optional[ModuleType] = None
+
+	def _load(self) -> ModuleType:
+		module = self._module
+		if module is None:
+			# import_module holds the import lock, so concurrent first uses import once
+			module = self._module = importlib.import_module(self._name)
+		return module
+
+	@property
+	def loaded(self) -> bool:
+		return self._module is not None
+
+	def __getattr__(self, attr: str):
+		return getattr(self._load(), attr)
+
+	def __repr__(self) -> str:
+		state = "loaded" if self.loaded else "not loaded"
+		return f"<lazy module {self._name!r} ({state})>"
+
+
+def module(name: str) -> LazyModule:
+	return LazyModule(name)
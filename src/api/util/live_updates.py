@@ -0,0 +1,128 @@
+"""In-process fan-out of change events to clients connected over server-sent events.
+
+Controllers call ``hub.publish`` after a successful commit. Each event is serialized once,
+whatever the number of listeners, and handed to every matching connection: pantry events go
+to the owning user only, catalogue events (ingredients) to everyone.
+
+A connection is one coroutine waiting on a small bounded queue -- no thread, no database
+session -- so thousands of idle clients fit on a single worker. A client that stops reading
+fills its queue; its backlog is then replaced by one ``resync`` event telling it to re-fetch,
+so a slow client never holds up the others or grows memory without bound.
+
+Only clients connected to the worker that made the change are notified; with several
+workers, clients catch up by re-fetching whenever they (re)connect.
+"""
+import asyncio
+import json
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+# Events buffered per connection before it is told to resync instead
+QUEUE_SIZE = 64
+
+# Seconds between keep-alive comments on an idle stream (proxies drop silent connections)
+HEARTBEAT_INTERVAL = 15.0
+
+HEARTBEAT = b": ping\n\n"
+
+
+def encode(kind: str, data: Dict[str, Any]) -> bytes:
+	"""One server-sent event frame: ``event: <kind>`` plus compact JSON data."""
+	return f"event: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+RESYNC = encode("resync", {})
+
+
+class Subscription:
+	"""One connected client: a bounded queue of encoded events, read on its event loop."""
+	__slots__ = ("user_id", "loop", "queue", "overflowed")
+
+	def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop):
+		self.user_id = user_id
+		self.loop = loop
+		self.queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+		self.overflowed = False
+
+	def put(self, frame: bytes):
+		"""Queue a frame; must run on ``self.loop``."""
+		if self.overflowed:
+			return
+		try:
+			self.queue.put_nowait(frame)
+		except asyncio.QueueFull:
+			# The client can no longer apply deltas in order; drop them and ask for a re-fetch
+			while not self.queue.empty():
+				self.queue.get_nowait()
+			self.queue.put_nowait(RESYNC)
+			self.overflowed = True
+
+	async def get(self, timeout: Optional[float] = None) -> bytes:
+		"""Next frame, or ``HEARTBEAT`` if none arrives within ``timeout`` seconds."""
+		try:
+			frame = await asyncio.wait_for(self.queue.get(), timeout)
+		except asyncio.TimeoutError:
+			return HEARTBEAT
+		if frame is RESYNC:
+			self.overflowed = False
+		return frame
+
+
+class EventHub:
+	"""Registry of open subscriptions, safe to publish to from any thread."""
+
+	def __init__(self):
+		self._by_user: Dict[int, Set[Subscription]] = {}
+		self._lock = threading.Lock()
+
+	def subscribe(self, user_id: int) -> Subscription:
+		"""Register a subscription on the running event loop."""
+		subscription = Subscription(user_id, asyncio.get_running_loop())
+		with self._lock:
+			self._by_user.setdefault(user_id, set()).add(subscription)
+		return subscription
+
+	def unsubscribe(self, subscription: Subscription):
+		with self._lock:
+			subscriptions = self._by_user.get(subscription.user_id)
+			if subscriptions is not None:
+				subscriptions.discard(subscription)
+				if not subscriptions:
+					del self._by_user[subscription.user_id]
+
+	def connection_count(self) -> int:
+		with self._lock:
+			return sum(len(subscriptions) for subscriptions in self._by_user.values())
+
+	def publish(self, kind: str, data: Dict[str, Any], user_id: Optional[int] = None):
+		"""Send an event to ``user_id``'s connections, or to every connection when None.
+
+		Controllers run in the threadpool, so delivery is scheduled on each subscriber's loop
+		(one callback per loop, not per connection).
+		"""
+		with self._lock:
+			if user_id is None:
+				targets = [s for subscriptions in self._by_user.values() for s in subscriptions]
+			else:
+				targets = list(self._by_user.get(user_id, ()))
+		if not targets:
+			return
+
+		frame = encode(kind, data)
+		by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+		for subscription in targets:
+			by_loop.setdefault(subscription.loop, []).append(subscription)
+		for loop, subscriptions in by_loop.items():
+			try:
+				loop.call_soon_threadsafe(_deliver, subscriptions, frame)
+			except RuntimeError:
+				# Loop already closed (server shutting down); its streams are gone too
+				pass
+
+
+def _deliver(subscriptions: List[Subscription], frame: bytes):
+	for subscription in subscriptions:
+		subscription.put(frame)
+
+
+hub = EventHub()
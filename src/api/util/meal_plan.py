@@ -0,0 +1,203 @@
+"""Meal-plan optimizer: pick recipes that use the most of a pantry and need the fewest purchases.
+
+A plan's score is ``pantry ingredients used - purchase_weight * ingredients to buy``, counted
+over the union of the chosen recipes' ingredient bitmaps (an ingredient shared by two meals
+is used or bought once). Solving it:
+
+1. Candidates: an inverted index (ingredient ordinal -> recipe ids) counts, in C via ``Counter``,
+   how many pantry ingredients each recipe contains. Only the ``max_candidates`` recipes with
+   the most overlap are searched, topped up with the smallest recipes when the pantry
+   matches too few -- so the work after this step does not grow with the catalogue.
+2. Greedy max-coverage: add the candidate with the best marginal score, ``meals`` times.
+3. Local search: swap a chosen recipe for a candidate while that improves the score, until
+   no swap helps or the time budget runs out.
+"""
+import heapq
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.api.models.recipe import Recipe
+from src.api.util import catalogue_store, pantry_match
+from src.api.util.derived import DerivedIndex
+from src.api.util.id_list import parse_id_list
+
+DEFAULT_TIME_BUDGET = 0.08  # seconds; leaves headroom for the request around it
+MAX_CANDIDATES = 2000
+# Deadline checks happen every this many score evaluations
+_CHECK_EVERY = 256
+
+
+class PlanIndex:
+	"""Per-catalogue-version lookup structures for the optimizer."""
+
+	def __init__(self, rows: Iterable[Tuple[int, Iterable[int], Iterable[int]]], version: int,
+	             recipe_bitmaps: Optional[pantry_match.RecipeBitmaps] = None):
+		"""Build from (recipe id, ingredient ids, category ids) rows.
+
+		``recipe_bitmaps`` lets the index share the recipe bitmaps pantry matching already holds;
+		pantries passed to ``optimize`` must be encoded with ``self.recipe_bitmaps``.
+		"""
+		rows = list(rows)
+		if recipe_bitmaps is None:
+			recipe_bitmaps = pantry_match.RecipeBitmaps(
+				((recipe_id, ingredient_ids) for recipe_id, ingredient_ids, _ in rows), version
+			)
+		self.version = version
+		self.recipe_bitmaps = recipe_bitmaps
+		self.bitmaps: Dict[int, int] = recipe_bitmaps.bitmaps
+		postings: Dict[int, List[int]] = {}
+		self.categories: Dict[int, Set[int]] = {}
+		for recipe_id, _, category_ids in rows:
+			for ordinal in pantry_match.bits(self.bitmaps.get(recipe_id, 0)):
+				postings.setdefault(ordinal, []).append(recipe_id)
+			for category_id in category_ids:
+				self.categories.setdefault(category_id, set()).add(recipe_id)
+		self.postings: Dict[int, array] = {key: array("q", ids) for key, ids in postings.items()}
+		# Fallback candidates when the pantry matches too few recipes: fewest purchases first
+		self.by_size: List[int] = sorted(self.bitmaps, key=lambda recipe_id: self.bitmaps[recipe_id].bit_count())
+
+	def allowed(self, category_ids: Optional[Iterable[int]]) -> Optional[Set[int]]:
+		"""Recipes in any of ``category_ids``, or None for no restriction."""
+		if category_ids is None:
+			return None
+		allowed: Set[int] = set()
+		for category_id in category_ids:
+			allowed |= self.categories.get(category_id, set())
+		return allowed
+
+
+def _build_index(db: Session) -> PlanIndex:
+	store = catalogue_store.get_store(db)
+	categories = {
+		recipe_id: parse_id_list(category_id_list)
+		for recipe_id, category_id_list in db.query(Recipe.id, Recipe.category_id_list).yield_per(10_000)
+	}
+	rows = (
+		(recipe_id, ingredient_ids, categories.get(recipe_id, ()))
+		for recipe_id, ingredient_ids in zip(store.recipe_ids, store.recipe_ingredients)
+	)
+	return PlanIndex(rows, store.version, pantry_match.get_bitmaps(db))
+
+
+# Rebuilding takes about a second at 100k recipes, so it happens off the request path
+index = DerivedIndex("plan_index", _build_index)
+
+
+def get_index(db: Session) -> PlanIndex:
+	"""Return the optimizer index; after a catalogue write the previous one is served until the rebuild finishes."""
+	return index.get(db)
+
+
+@dataclass
+class Plan:
+	recipe_ids: List[int] = field(default_factory=list)
+	pantry_used: int = 0
+	to_buy: int = 0
+	score: float = 0.0
+	swaps: int = 0
+	elapsed_ms: float = 0.0
+
+
+def _candidates(index: PlanIndex, pantry: int, meals: int, allowed: Optional[Set[int]], max_candidates: int) -> List[int]:
+	overlap: Counter = Counter()
+	for ordinal in pantry_match.bits(pantry):
+		overlap.update(index.postings.get(ordinal, ()))
+	if allowed is not None:
+		overlap = Counter({recipe_id: count for recipe_id, count in overlap.items() if recipe_id in allowed})
+
+	# Overlaps are small integers: find the lowest count that still yields max_candidates
+	# recipes from a histogram, so only those few are ranked
+	threshold, total = 0, 0
+	for count, recipes in sorted(Counter(overlap.values()).items(), reverse=True):
+		threshold, total = count, total + recipes
+		if total >= max_candidates:
+			break
+	items = [item for item in overlap.items() if item[1] >= threshold]
+	candidates = [recipe_id for recipe_id, _ in heapq.nlargest(max_candidates, items, key=itemgetter(1))]
+
+	if len(candidates) < meals:
+		seen = set(candidates)
+		for recipe_id in index.by_size:
+			if len(candidates) >= meals:
+				break
+			if recipe_id not in seen and (allowed is None or recipe_id in allowed):
+				candidates.append(recipe_id)
+	return candidates
+
+
+def optimize(index: PlanIndex, pantry: int, meals: int, category_ids: Optional[Iterable[int]] = None,
+             purchase_weight: float = 1.0, time_budget: float = DEFAULT_TIME_BUDGET,
+             max_candidates: int = MAX_CANDIDATES) -> Plan:
+	"""Choose up to ``meals`` recipes for a pantry bitmap (see the module docstring)."""
+	started = time.perf_counter()
+	deadline = started + time_budget
+
+	def score(union: int) -> float:
+		used = (union & pantry).bit_count()
+		return used - purchase_weight * (union.bit_count() - used)
+
+	candidates = _candidates(index, pantry, meals, index.allowed(category_ids), max_candidates)
+	bitmaps = index.bitmaps
+
+	# Greedy: best marginal score given what earlier picks already cover
+	chosen: List[int] = []
+	union = 0
+	remaining = list(candidates)
+	for _ in range(min(meals, len(remaining))):
+		best_position, best_gain = 0, None
+		for position, recipe_id in enumerate(remaining):
+			new = bitmaps[recipe_id] & ~union
+			used = (new & pantry).bit_count()
+			gain = used - purchase_weight * (new.bit_count() - used)
+			if best_gain is None or gain > best_gain:
+				best_position, best_gain = position, gain
+		recipe_id = remaining.pop(best_position)
+		chosen.append(recipe_id)
+		union |= bitmaps[recipe_id]
+
+	# Local search: best swap per chosen slot, repeated while something improves
+	current = score(union)
+	swaps = 0
+	evaluations = 0
+	improved = True
+	while improved and remaining and time.perf_counter() < deadline:
+		improved = False
+		for slot in range(len(chosen)):
+			others = 0
+			for other_slot, recipe_id in enumerate(chosen):
+				if other_slot != slot:
+					others |= bitmaps[recipe_id]
+			best_position, best_score = None, current
+			for position, recipe_id in enumerate(remaining):
+				candidate_score = score(others | bitmaps[recipe_id])
+				if candidate_score > best_score + 1e-9:
+					best_position, best_score = position, candidate_score
+				evaluations += 1
+				if evaluations % _CHECK_EVERY == 0 and time.perf_counter() >= deadline:
+					break
+			if best_position is not None:
+				chosen[slot], remaining[best_position] = remaining[best_position], chosen[slot]
+				current = best_score
+				swaps += 1
+				improved = True
+			if time.perf_counter() >= deadline:
+				break
+
+	union = 0
+	for recipe_id in chosen:
+		union |= bitmaps[recipe_id]
+	used = (union & pantry).bit_count()
+	return Plan(
+		recipe_ids=chosen,
+		pantry_used=used,
+		to_buy=union.bit_count() - used,
+		score=current,
+		swaps=swaps,
+		elapsed_ms=(time.perf_counter() - started) * 1000,
+	)
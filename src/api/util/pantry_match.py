@@ -0,0 +1,129 @@
+"""Pantry coverage of recipes computed over ingredient bitmaps.
+
+Every recipe's ingredient set is held as a Python int with bit ``i`` set for the ingredient
+with ordinal ``i``. Ordinals are dense: an ingredient's row in the catalogue store (its
+position in the sorted ``ingredient_ids``), so a bitmap is at most (number of ingredients) / 8
+bytes however large or sparse the ids are. A pantry is encoded the same way, so the ingredients
+a user already has for a recipe are ``(recipe & pantry).bit_count()`` -- one AND and one popcount
+over machine words, whatever the number of ingredients. The bitmaps are built from the compact
+catalogue store, once per catalogue version; pantries must be encoded (``encode``) and results
+decoded (``decode``) with the same ``RecipeBitmaps``.
+"""
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.api.models.pantry_ingredient import PantryIngredient
+from src.api.models.user import User
+from src.api.util import catalogue_store
+
+
+def to_bitmap(positions: Iterable[int]) -> int:
+	bitmap = 0
+	for position in positions:
+		if position >= 0:
+			bitmap |= 1 << position
+	return bitmap
+
+
+def bits(bitmap: int) -> Iterator[int]:
+	"""The positions set in a bitmap, lowest first (the inverse of to_bitmap)."""
+	while bitmap:
+		low = bitmap & -bitmap
+		yield low.bit_length() - 1
+		bitmap ^= low
+
+
+class RecipeBitmaps:
+	"""Ingredient bitmap and distinct ingredient count of every recipe."""
+
+	def __init__(self, rows: Iterable[Tuple[int, Iterable[int]]], version: int, ingredient_ids: Sequence[int] = ()):
+		"""Build from (recipe id, ingredient ids) rows; ``ingredient_ids`` (sorted) take ordinals 0, 1, ...
+
+		Ids a recipe names that are not in ``ingredient_ids`` get the next free ordinals.
+		"""
+		self.version = version
+		self.ingredient_ids: List[int] = list(ingredient_ids)
+		self.ordinals: Dict[int, int] = {ingredient_id: ordinal for ordinal, ingredient_id in enumerate(self.ingredient_ids)}
+		self.bitmaps: Dict[int, int] = {}
+		self.sizes: Dict[int, int] = {}
+		for recipe_id, ids in rows:
+			bitmap = to_bitmap(self._ordinal(ingredient_id) for ingredient_id in ids)
+			self.bitmaps[recipe_id] = bitmap
+			self.sizes[recipe_id] = bitmap.bit_count()
+
+	@classmethod
+	def from_store(cls, store) -> "RecipeBitmaps":
+		return cls(zip(store.recipe_ids, store.recipe_ingredients), store.version, store.ingredient_ids)
+
+	def _ordinal(self, ingredient_id: int) -> int:
+		ordinal = self.ordinals.get(ingredient_id)
+		if ordinal is None:
+			ordinal = self.ordinals[ingredient_id] = len(self.ingredient_ids)
+			self.ingredient_ids.append(ingredient_id)
+		return ordinal
+
+	def encode(self, ingredient_ids: Iterable[int]) -> int:
+		"""Bitmap of ingredient ids; ids no recipe uses are left out, as they cannot match."""
+		ordinals = self.ordinals
+		return to_bitmap(ordinals[ingredient_id] for ingredient_id in ingredient_ids if ingredient_id in ordinals)
+
+	def decode(self, bitmap: int) -> Iterator[int]:
+		"""Ingredient ids set in a bitmap (the inverse of encode)."""
+		return (self.ingredient_ids[ordinal] for ordinal in bits(bitmap))
+
+	def has(self, recipe_id: int, ingredient_id: int) -> bool:
+		ordinal = self.ordinals.get(ingredient_id)
+		return ordinal is not None and bool(self.bitmaps.get(recipe_id, 0) >> ordinal & 1)
+
+	def coverage(self, pantry: int, recipe_ids: Optional[Iterable[int]] = None) -> Dict[int, Tuple[int, int]]:
+		"""Map recipe id -> (ingredients in the pantry, ingredients missing).
+
+		Covers ``recipe_ids`` (unknown ids are skipped) or the whole catalogue when None.
+		"""
+		ids = self.bitmaps.keys() if recipe_ids is None else (i for i in recipe_ids if i in self.bitmaps)
+		result = {}
+		for recipe_id in ids:
+			have = (self.bitmaps[recipe_id] & pantry).bit_count()
+			result[recipe_id] = (have, self.sizes[recipe_id] - have)
+		return result
+
+
+_bitmaps: Optional[RecipeBitmaps] = None
+_lock = threading.Lock()
+
+
+def get_bitmaps(db: Session) -> RecipeBitmaps:
+	"""Return the recipe bitmaps, rebuilding them after any catalogue write."""
+	global _bitmaps
+	store = catalogue_store.get_store(db)
+	bitmaps = _bitmaps
+	if bitmaps is not None and bitmaps.version == store.version:
+		return bitmaps
+
+	with _lock:
+		if _bitmaps is None or _bitmaps.version != store.version:
+			_bitmaps = RecipeBitmaps.from_store(store)
+		return _bitmaps
+
+
+def pantry_bitmap(db: Session, username: str, bitmaps: RecipeBitmaps) -> int:
+	"""Bitmap of the ingredients in a user's pantry, in the ordinals of ``bitmaps``."""
+	rows = (
+		db.query(PantryIngredient.ingredient_id)
+		.join(User, User.id == PantryIngredient.user_id)
+		.filter(User.username == username)
+	)
+	return bitmaps.encode(ingredient_id for (ingredient_id,) in rows)
+
+
+def annotate(db: Session, rows: List[dict], username: str) -> List[dict]:
+	"""Copy of ``rows`` (dicts with an ``id``) with pantry_have / pantry_missing counts added."""
+	bitmaps = get_bitmaps(db)
+	counts = bitmaps.coverage(pantry_bitmap(db, username, bitmaps), (row["id"] for row in rows))
+	annotated = []
+	for row in rows:
+		have, missing = counts.get(row["id"], (0, 0))
+		annotated.append({**row, "pantry_have": have, "pantry_missing": missing})
+	return annotated
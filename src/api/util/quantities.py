@@ -0,0 +1,211 @@
+"""Parsing of free-text pantry quantities into numeric amounts in a base unit.
+
+``PantryIngredient.quantity`` and ``unit`` stay as entered ("Two", "kgs", "1 1/2", "cups");
+``parse`` turns them into a dimension (mass, volume or count) and an amount in that
+dimension's base unit (grams, millilitres, pieces), stored in ``amount`` / ``dimension``.
+Sufficiency checks and totals are then plain SQL sums over those columns.
+
+Count units (cans, cloves, bunches...) are all treated as pieces: they only add up with
+each other for the same ingredient, which is what the pantry holds anyway.
+"""
+import re
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, inspect, text
+
+from src.api.dependencies.database import Base
+from src.api.models.pantry_ingredient import PantryIngredient
+
+MASS = "mass"
+VOLUME = "volume"
+COUNT = "count"
+
+BASE_UNITS = {MASS: "g", VOLUME: "ml", COUNT: "piece"}
+
+# Canonical unit -> (dimension, size in the dimension's base unit)
+UNITS: Dict[str, Tuple[str, float]] = {
+	"mg": (MASS, 0.001),
+	"g": (MASS, 1.0),
+	"kg": (MASS, 1000.0),
+	"oz": (MASS, 28.349523125),
+	"lb": (MASS, 453.59237),
+	"ml": (VOLUME, 1.0),
+	"cl": (VOLUME, 10.0),
+	"dl": (VOLUME, 100.0),
+	"l": (VOLUME, 1000.0),
+	"tsp": (VOLUME, 4.92892159375),
+	"tbsp": (VOLUME, 14.78676478125),
+	"fl oz": (VOLUME, 29.5735295625),
+	"cup": (VOLUME, 236.5882365),
+	"pint": (VOLUME, 473.176473),
+	"quart": (VOLUME, 946.352946),
+	"gallon": (VOLUME, 3785.411784),
+	"piece": (COUNT, 1.0),
+	"dozen": (COUNT, 12.0),
+}
+
+# Spellings seen in user input -> canonical unit (plurals are handled by _unit_key)
+ALIASES: Dict[str, str] = {
+	"milligram": "mg", "gram": "g", "gr": "g", "kilogram": "kg", "kilo": "kg",
+	"ounce": "oz", "pound": "lb",
+	"millilitre": "ml", "milliliter": "ml", "centilitre": "cl", "centiliter": "cl",
+	"decilitre": "dl", "deciliter": "dl", "litre": "l", "liter": "l", "ltr": "l",
+	"teaspoon": "tsp", "tablespoon": "tbsp", "tbs": "tbsp", "tbl": "tbsp",
+	"fluid ounce": "fl oz", "floz": "fl oz", "fl. oz": "fl oz",
+	"c": "cup", "pt": "pint", "qt": "quart", "gal": "gallon",
+	"pc": "piece", "whole": "piece", "each": "piece", "ea": "piece", "item": "piece", "unit": "piece",
+	"clove": "piece", "slice": "piece", "can": "piece", "tin": "piece", "jar": "piece", "bottle": "piece",
+	"head": "piece", "bunch": "piece", "stalk": "piece", "sprig": "piece", "egg": "piece",
+}
+
+# (from unit, to unit) -> multiplier, for every pair of units in the same dimension
+CONVERSIONS: Dict[Tuple[str, str], float] = {
+	(source, target): source_size / target_size
+	for source, (source_dimension, source_size) in UNITS.items()
+	for target, (target_dimension, target_size) in UNITS.items()
+	if source_dimension == target_dimension
+}
+
+_WORD_NUMBERS = {
+	"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+	"nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "half": 0.5, "quarter": 0.25,
+}
+_UNICODE_FRACTIONS = {"½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75, "⅛": 0.125}
+_FRACTION = re.compile(r"^(\d+)/(\d+)$")
+# "2-3", "2 to 3": a pantry counts as holding the lower bound
+_RANGE = re.compile(r"(\d+(?:[.,]\d+)*)\s*(?:-|–|to)\s*\d+(?:[.,]\d+)*")
+# "1,000", "12,500.5": commas before groups of exactly three digits separate thousands; other commas are decimal
+_THOUSANDS = re.compile(r"^\d{1,3}(?:,\d{3})+(?:\.\d+)?$")
+_DIGIT_LETTER = re.compile(r"(\d)([^\d\s./,])")
+
+
+class Quantity(NamedTuple):
+	dimension: str
+	amount: float  # in BASE_UNITS[dimension]
+
+
+def _unit_key(unit: str) -> Optional[str]:
+	"""Canonical unit for a spelling, trying singular forms ("kgs", "pinches")."""
+	unit = unit.strip(" .")
+	for candidate in (unit, unit[:-1] if unit.endswith("s") else None, unit[:-2] if unit.endswith("es") else None):
+		if candidate is None:
+			continue
+		if candidate in UNITS:
+			return candidate
+		if candidate in ALIASES:
+			return ALIASES[candidate]
+	return None
+
+
+def _number(token: str) -> Optional[float]:
+	if token in _WORD_NUMBERS:
+		return float(_WORD_NUMBERS[token])
+	fraction = _FRACTION.match(token)
+	if fraction:
+		denominator = int(fraction.group(2))
+		return int(fraction.group(1)) / denominator if denominator else None
+	token = token.replace(",", "") if _THOUSANDS.match(token) else token.replace(",", ".")
+	try:
+		return float(token)
+	except ValueError:
+		return None
+
+
+def parse(quantity: Optional[str], unit: Optional[str] = None) -> Optional[Quantity]:
+	"""Parse a quantity and unit as entered ("Two", "kgs"; "1 1/2", "cups"; "200g", "").
+
+	Returns None when there is no number or the unit is not recognised.
+	"""
+	text_value = f"{quantity or ''} {unit or ''}".lower()
+	for symbol, value in _UNICODE_FRACTIONS.items():
+		text_value = text_value.replace(symbol, f" {value} ")
+	text_value = _RANGE.sub(r"\1", text_value)
+	text_value = _DIGIT_LETTER.sub(r"\1 \2", text_value)
+
+	tokens = text_value.split()
+	amount: Optional[float] = None
+	index = 0
+	while index < len(tokens):
+		token = tokens[index]
+		if token == "dozen":
+			amount = (amount or 1.0) * 12
+		elif token in ("a", "an"):
+			# "a cup" is one cup; "a half" and "one and a half" leave the number to "half"
+			if amount is None and tokens[index + 1:index + 2] not in (["half"], ["quarter"]):
+				amount = 1.0
+		elif token != "and":
+			value = _number(token)
+			if value is None:
+				break
+			amount = (amount or 0.0) + value
+		index += 1
+
+	if amount is None:
+		return None
+
+	rest = " ".join(tokens[index:])
+	if rest.startswith("of "):
+		rest = rest[3:]
+	if not rest:
+		return Quantity(COUNT, amount)
+
+	# "3 large eggs": the first word that names a unit
+	canonical = _unit_key(rest) or next(filter(None, map(_unit_key, rest.split())), None)
+	if canonical is None:
+		return None
+	dimension, size = UNITS[canonical]
+	return Quantity(dimension, amount * size)
+
+
+def convert(amount: float, from_unit: str, to_unit: str) -> float:
+	"""Convert between two units of the same dimension (``ValueError`` otherwise)."""
+	source, target = _unit_key(from_unit.lower()), _unit_key(to_unit.lower())
+	factor = CONVERSIONS.get((source, target))
+	if factor is None:
+		raise ValueError(f"Cannot convert {from_unit} to {to_unit}")
+	return amount * factor
+
+
+def columns_for(quantity: Optional[str], unit: Optional[str]) -> Dict[str, Optional[object]]:
+	"""``amount`` / ``dimension`` column values for a quantity and unit."""
+	parsed = parse(quantity, unit)
+	return {"amount": parsed.amount, "dimension": parsed.dimension} if parsed else {"amount": None, "dimension": None}
+
+
+@event.listens_for(PantryIngredient.quantity, "set")
+def _sync_from_quantity(target, value, oldvalue, initiator):
+	# Keeps ORM-created rows (controllers, seeding) in step with their text fields
+	for column, column_value in columns_for(value, target.unit).items():
+		setattr(target, column, column_value)
+
+
+@event.listens_for(PantryIngredient.unit, "set")
+def _sync_from_unit(target, value, oldvalue, initiator):
+	for column, column_value in columns_for(target.quantity, value).items():
+		setattr(target, column, column_value)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _add_amount_columns(target, connection, **kw):
+	# Databases created before the structured columns existed get them and their values here,
+	# once: afterwards a NULL dimension just means the quantity did not parse
+	columns = {column["name"] for column in inspect(connection).get_columns(PantryIngredient.__tablename__)}
+	if "amount" not in columns:
+		connection.execute(text("ALTER TABLE pantry_ingredients ADD COLUMN amount FLOAT"))
+		connection.execute(text("ALTER TABLE pantry_ingredients ADD COLUMN dimension VARCHAR"))
+		connection.execute(text(
+			"CREATE INDEX IF NOT EXISTS ix_pantry_ingredients_holdings "
+			"ON pantry_ingredients (user_id, ingredient_id, dimension, amount)"
+		))
+		_backfill_amounts(connection)
+
+
+def _backfill_amounts(connection):
+	rows = connection.execute(text("SELECT id, quantity, unit FROM pantry_ingredients WHERE dimension IS NULL")).all()
+	parsed = [{"id": row_id, **columns_for(quantity, unit)} for row_id, quantity, unit in rows]
+	parsed = [row for row in parsed if row["dimension"] is not None]
+	if parsed:
+		connection.execute(
+			text("UPDATE pantry_ingredients SET amount = :amount, dimension = :dimension WHERE id = :id"),
+			parsed,
+		)
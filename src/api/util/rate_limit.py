@@ -0,0 +1,210 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from src.api.util.auth import SECRET_KEY, ALGORITHM, jwt
+
+
+class InMemoryBackend:
+	"""Token buckets held in this process.
+
+	Any object with the same ``take`` signature (e.g. one backed by Redis or a shared
+	table) can be installed with ``set_backend`` so several workers share their budgets.
+	"""
+
+	def __init__(self, max_keys: int = 100_000):
+		self.max_keys = max_keys
+		self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+		"""Spend ``cost`` tokens from the bucket at ``key``.
+
+		Returns (allowed, retry_after_seconds); retry_after is 0 when allowed.
+		"""
+		now = time.monotonic()
+		with self._lock:
+			tokens, updated_at = self._buckets.pop(key, (capacity, now))
+			tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+			allowed = tokens >= cost
+			if allowed:
+				tokens -= cost
+			self._buckets[key] = (tokens, now)
+
+			# Idle buckets are full again anyway, so forgetting the oldest is safe
+			while len(self._buckets) > self.max_keys:
+				self._buckets.popitem(last=False)
+
+		return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+	def reset(self):
+		with self._lock:
+			self._buckets.clear()
+
+
+backend = InMemoryBackend()
+
+
+def set_backend(new_backend):
+	"""Install a shared bucket store used by every limiter."""
+	global backend
+	backend = new_backend
+
+
+def client_ip(request: Request) -> str:
+	return request.client.host if request.client else "unknown"
+
+
+def token_subject(request: Request) -> Optional[str]:
+	"""Username from a valid bearer token, without touching the database."""
+	authorization = request.headers.get("authorization", "")
+	scheme, _, token = authorization.partition(" ")
+	if scheme.lower() != "bearer" or not token:
+		return None
+	try:
+		return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+	except jwt.JWTError:
+		return None
+
+
+async def form_username(request: Request) -> List[str]:
+	"""The account a login form targets (username or email as submitted)."""
+	username = (await request.form()).get("username")
+	return [username] if isinstance(username, str) else []
+
+
+def json_fields(*names: str) -> Callable[[Request], Awaitable[List[str]]]:
+	"""Accounts named by string fields of a JSON body (e.g. the username and email of a signup)."""
+
+	async def subjects(request: Request) -> List[str]:
+		try:
+			body = await request.json()
+		except ValueError:
+			return []  # rejected by validation anyway
+		if not isinstance(body, dict):
+			return []
+		return [body[name] for name in names if isinstance(body.get(name), str)]
+
+	return subjects
+
+
+async def refresh_selector(request: Request) -> List[str]:
+	"""The refresh token a request presents, by its selector (the verifier is secret and stays out of keys)."""
+	tokens = await json_fields("refresh_token")(request)
+	return [selector for selector, _, _ in (token.partition(".") for token in tokens) if selector]
+
+
+class RateLimit:
+	"""FastAPI dependency enforcing token buckets per client IP and per authenticated user.
+
+	``rate`` is tokens refilled per second and ``burst`` the bucket capacity. Exhausting
+	either bucket answers 429 with a Retry-After header. Routes called without a bearer
+	token pass ``subjects``, returning the accounts a request targets (the submitted
+	username, the refresh token...), so those get a bucket of their own whatever address
+	the requests come from.
+	"""
+
+	def __init__(self, name: str, rate: float, burst: int,
+	             subjects: Optional[Callable[[Request], Awaitable[List[str]]]] = None):
+		self.name = name
+		self.rate = rate
+		self.burst = burst
+		self.subjects = subjects
+
+	async def keys(self, request: Request) -> List[str]:
+		keys = [f"{self.name}:ip:{client_ip(request)}"]
+		username = token_subject(request)
+		if username:
+			keys.append(f"{self.name}:user:{username}")
+		if self.subjects is not None:
+			for subject in await self.subjects(request):
+				subject = " ".join(subject.casefold().split())
+				if subject:
+					keys.append(f"{self.name}:account:{subject}")
+		return keys
+
+	async def __call__(self, request: Request):
+		for key in await self.keys(request):
+			allowed, retry_after = backend.take(key, self.rate, self.burst)
+			if not allowed:
+				raise HTTPException(
+					status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+					detail="Too many requests",
+					headers={"Retry-After": str(math.ceil(retry_after))},
+				)
+
+
+class ConcurrencyLimit:
+	"""FastAPI dependency admitting at most ``max_concurrent`` requests to a route at once.
+
+	Up to ``max_waiting`` further requests queue for at most ``max_wait`` seconds; beyond
+	that the route sheds load with 503 and a Retry-After header instead of piling up work.
+	"""
+
+	def __init__(self, name: str, max_concurrent: int, max_waiting: int, max_wait: float = 5.0,
+	             retry_after: int = 1):
+		self.name = name
+		self.max_concurrent = max_concurrent
+		self.max_waiting = max_waiting
+		self.max_wait = max_wait
+		self.retry_after = retry_after
+		self.active = 0
+		self._waiters: "deque[asyncio.Future]" = deque()
+
+	def _overloaded(self) -> HTTPException:
+		return HTTPException(
+			status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+			detail="Server busy, please retry",
+			headers={"Retry-After": str(self.retry_after)},
+		)
+
+	async def _acquire(self):
+		if self.active < self.max_concurrent and not self._waiters:
+			self.active += 1
+			return
+		if len(self._waiters) >= self.max_waiting:
+			raise self._overloaded()
+
+		waiter = asyncio.get_running_loop().create_future()
+		self._waiters.append(waiter)
+		try:
+			# A releasing request hands its slot over directly, so ``active`` is unchanged
+			await asyncio.wait_for(waiter, self.max_wait)
+		except asyncio.TimeoutError:
+			raise self._overloaded()
+		finally:
+			if waiter in self._waiters:
+				self._waiters.remove(waiter)
+
+	def _release(self):
+		while self._waiters:
+			waiter = self._waiters.popleft()
+			if not waiter.done():
+				waiter.set_result(None)
+				return
+		self.active -= 1
+
+	async def __call__(self):
+		await self._acquire()
+		try:
+			yield
+		finally:
+			self._release()
+
+
+# Argon2-backed auth routes: few per minute per client, a handful hashing at once
+login_rate_limit = RateLimit("login", rate=10 / 60, burst=10, subjects=form_username)
+register_rate_limit = RateLimit("register", rate=5 / 60, burst=5, subjects=json_fields("username", "email"))
+# Refreshing is cheap (no Argon2): the IP bucket guards against token guessing, the per-token
+# one against a single (possibly stolen) token being replayed from many addresses
+refresh_rate_limit = RateLimit("refresh", rate=1, burst=10, subjects=refresh_selector)
+auth_concurrency = ConcurrencyLimit("auth", max_concurrent=4, max_waiting=16)
+
+# Fuzzy search routes: interactive, so a generous burst with steady refill
+search_rate_limit = RateLimit("search", rate=10, burst=30)
+search_concurrency = ConcurrencyLimit("search", max_concurrent=8, max_waiting=32)
@@ -0,0 +1,71 @@
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from src.api.models.recipe import Recipe
+from src.api.models.recipe_similarity import RecipeSimilarity
+from src.api.util.id_list import parse_id_list
+
+# Neighbours stored per recipe
+TOP_K = 10
+
+# Ingredients used by more recipes than this (salt, oil, ...) say little about similarity and
+# would make candidate generation quadratic, so they only count towards set sizes
+MAX_POSTING_LENGTH = 5000
+
+
+def compute_neighbors(recipes: Iterable[Tuple[int, List[int]]], k: int = TOP_K) -> Dict[int, List[Tuple[int, float]]]:
+	"""Top-``k`` Jaccard neighbours of every recipe by ingredient set.
+
+	Works like a sparse recipe x ingredient matrix product: an inverted index from ingredient
+	to recipes yields, for each recipe, the intersection size with every recipe sharing at
+	least one ingredient, so recipes with nothing in common are never compared.
+	"""
+	ingredient_sets = {recipe_id: set(ingredient_ids) for recipe_id, ingredient_ids in recipes}
+
+	postings: Dict[int, List[int]] = defaultdict(list)
+	for recipe_id, ingredients in ingredient_sets.items():
+		for ingredient_id in ingredients:
+			postings[ingredient_id].append(recipe_id)
+
+	neighbors = {}
+	for recipe_id, ingredients in ingredient_sets.items():
+		overlap: Dict[int, int] = defaultdict(int)
+		for ingredient_id in ingredients:
+			posting = postings[ingredient_id]
+			if len(posting) > MAX_POSTING_LENGTH:
+				continue
+			for other_id in posting:
+				if other_id != recipe_id:
+					overlap[other_id] += 1
+
+		scored = (
+			(shared / (len(ingredients) + len(ingredient_sets[other_id]) - shared), -other_id, other_id)
+			for other_id, shared in overlap.items()
+		)
+		neighbors[recipe_id] = [(other_id, score) for score, _, other_id in heapq.nlargest(k, scored)]
+
+	return neighbors
+
+
+def rebuild(db: Session, k: int = TOP_K) -> int:
+	"""Recompute the recipe_similarities table from scratch; returns the number of rows written."""
+	recipes = [(recipe_id, parse_id_list(id_list)) for recipe_id, id_list in db.query(Recipe.id, Recipe.ingredient_id_list)]
+	neighbors = compute_neighbors(recipes, k)
+
+	rows = [
+		{"recipe_id": recipe_id, "similar_recipe_id": other_id, "score": score, "rank": rank}
+		for recipe_id, ranked in neighbors.items()
+		for rank, (other_id, score) in enumerate(ranked)
+	]
+
+	# Swap the whole table in one transaction so readers never see a half-built state
+	db.execute(delete(RecipeSimilarity))
+	if rows:
+		db.execute(insert(RecipeSimilarity), rows)
+	db.commit()
+	return len(rows)
+
@@ -0,0 +1,94 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Approximate memory budget for cached results, in bytes
+MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Rough per-entry and per-row bookkeeping cost on top of the string payload
+_ENTRY_OVERHEAD = 256
+_ROW_OVERHEAD = 64
+
+
+def normalize_query(query: str) -> str:
+	"""Casefold and collapse whitespace so equivalent queries share a cache entry."""
+	return " ".join(query.casefold().split())
+
+
+def estimate_size(rows: List[Dict[str, Any]]) -> int:
+	"""Approximate memory held by a list of result dicts."""
+	size = _ENTRY_OVERHEAD
+	for row in rows:
+		size += _ROW_OVERHEAD + sum(len(str(value)) for value in row.values())
+	return size
+
+
+class SearchCache:
+	"""LRU cache of search results bounded by an approximate memory budget.
+
+	Entries are keyed by the version of the catalogue store they were computed from
+	(``catalogue_store.get_store(db).version``), so a new store -- rebuilt after a local write
+	or after catalogue.poll() noticed another worker's, or a shared snapshot remapped after
+	a write in any worker -- makes older entries unreachable; they age out through LRU.
+	Results are never cached under a version whose store they were not ranked against.
+	"""
+
+	def __init__(self, max_bytes: int = MAX_BYTES):
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._size = 0
+		self._entries: "OrderedDict[Tuple, Tuple[List[Dict[str, Any]], int]]" = OrderedDict()
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def key(endpoint: str, version: int, query: str, *params: Hashable) -> Tuple:
+		"""Cache key of a result computed from the catalogue store at ``version``."""
+		return endpoint, version, normalize_query(query), *params
+
+	def get(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return entry[0]
+
+	def put(self, key: Tuple, rows: List[Dict[str, Any]]):
+		size = estimate_size(rows)
+		if size > self.max_bytes:
+			return
+		with self._lock:
+			previous = self._entries.pop(key, None)
+			if previous is not None:
+				self._size -= previous[1]
+			self._entries[key] = (rows, size)
+			self._size += size
+			while self._size > self.max_bytes:
+				_, (_, evicted_size) = self._entries.popitem(last=False)
+				self._size -= evicted_size
+				self.evictions += 1
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self._size = 0
+
+	def stats(self) -> Dict[str, int]:
+		with self._lock:
+			return {
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"entries": len(self._entries),
+				"size_bytes": self._size,
+				"max_bytes": self.max_bytes,
+			}
+
+
+# Shared by the recipe and ingredient search endpoints
+search_cache = SearchCache()
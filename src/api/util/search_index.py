@@ -0,0 +1,197 @@
+"""Database-native full-text index over recipes.
+
+SQLite uses an FTS5 virtual table ranked with BM25; Postgres uses a ``tsvector`` column
+with a GIN index ranked with ``ts_rank_cd``. Both are kept in sync by database triggers on
+``recipes``, so every recipe write path (controllers, seeding, bulk updates) is covered.
+Ingredient renames touch many recipes, so they are re-indexed by the ``reindex_ingredient``
+background job instead of inline. Other databases have no backend and callers fall back
+to a Python scan.
+"""
+import re
+from typing import List, Optional
+
+from sqlalchemy import event, text
+
+from src.api.dependencies.database import Base, engine
+
+INDEX_TABLE = "recipe_search"
+
+# How a recipe's comma-separated ingredient_id_list is matched against an ingredient id
+_SQLITE_HAS_INGREDIENT = "',' || replace({recipe}.ingredient_id_list, ' ', '') || ',' LIKE '%,' || {ingredient} || ',%'"
+_SQLITE_INGREDIENT_NAMES = (
+	"(SELECT group_concat(i.name, ' ') FROM ingredients i WHERE "
+	+ _SQLITE_HAS_INGREDIENT.format(recipe="{recipe}", ingredient="i.id") + ")"
+)
+_SQLITE_ROW = "{recipe}.id, {recipe}.title, coalesce({recipe}.description, ''), {recipe}.instructions, " + _SQLITE_INGREDIENT_NAMES
+
+
+SQLITE_CREATE = [
+	f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5("
+	"title, description, instructions, ingredients, tokenize = 'unicode61 remove_diacritics 2')",
+
+	f"CREATE TRIGGER IF NOT EXISTS {INDEX_TABLE}_recipe_insert AFTER INSERT ON recipes BEGIN "
+	f"INSERT INTO {INDEX_TABLE}(rowid, title, description, instructions, ingredients) "
+	f"VALUES ({_SQLITE_ROW.format(recipe='NEW')}); END",
+
+	f"CREATE TRIGGER IF NOT EXISTS {INDEX_TABLE}_recipe_update AFTER UPDATE ON recipes BEGIN "
+	f"DELETE FROM {INDEX_TABLE} WHERE rowid = OLD.id; "
+	f"INSERT INTO {INDEX_TABLE}(rowid, title, description, instructions, ingredients) "
+	f"VALUES ({_SQLITE_ROW.format(recipe='NEW')}); END",
+
+	f"CREATE TRIGGER IF NOT EXISTS {INDEX_TABLE}_recipe_delete AFTER DELETE ON recipes BEGIN "
+	f"DELETE FROM {INDEX_TABLE} WHERE rowid = OLD.id; END",
+
+	# Ingredient changes used to be re-indexed inline; that work is now a background job
+	*(f"DROP TRIGGER IF EXISTS {INDEX_TABLE}_ingredient_{op}" for op in ("insert", "update", "delete")),
+]
+
+# Recipes whose ingredient_id_list contains :ingredient_id
+_SQLITE_RECIPES_WITH = (
+	"SELECT r.id FROM recipes r WHERE "
+	+ _SQLITE_HAS_INGREDIENT.format(recipe="r", ingredient=":ingredient_id")
+)
+
+SQLITE_REINDEX = [
+	f"DELETE FROM {INDEX_TABLE} WHERE rowid IN ({_SQLITE_RECIPES_WITH})",
+	f"INSERT INTO {INDEX_TABLE}(rowid, title, description, instructions, ingredients) "
+	f"SELECT {_SQLITE_ROW.format(recipe='r')} FROM recipes r WHERE r.id IN ({_SQLITE_RECIPES_WITH})",
+]
+
+SQLITE_REBUILD = [
+	f"DELETE FROM {INDEX_TABLE}",
+	f"INSERT INTO {INDEX_TABLE}(rowid, title, description, instructions, ingredients) "
+	f"SELECT {_SQLITE_ROW.format(recipe='r')} FROM recipes r",
+]
+
+SQLITE_DROP = [f"DROP TABLE IF EXISTS {INDEX_TABLE}"]
+
+# Column weights: title and ingredient names matter most, instructions least
+SQLITE_QUERY = (
+	f"SELECT rowid FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH :query "
+	f"ORDER BY bm25({INDEX_TABLE}, 10.0, 4.0, 1.0, 6.0) LIMIT :limit"
+)
+
+_POSTGRES_HAS_INGREDIENT = "{ingredient}::text = ANY(string_to_array(replace({recipe}.ingredient_id_list, ' ', ''), ','))"
+
+POSTGRES_CREATE = [
+	f"CREATE TABLE IF NOT EXISTS {INDEX_TABLE} ("
+	"recipe_id INTEGER PRIMARY KEY REFERENCES recipes(id) ON DELETE CASCADE, "
+	"document TSVECTOR NOT NULL)",
+
+	f"CREATE INDEX IF NOT EXISTS ix_{INDEX_TABLE}_document ON {INDEX_TABLE} USING GIN (document)",
+
+	f"CREATE OR REPLACE FUNCTION {INDEX_TABLE}_document(r recipes) RETURNS tsvector AS $$ "
+	"SELECT setweight(to_tsvector('english', coalesce(r.title, '')), 'A') "
+	"|| setweight(to_tsvector('english', coalesce((SELECT string_agg(i.name, ' ') FROM ingredients i WHERE "
+	+ _POSTGRES_HAS_INGREDIENT.format(ingredient="i.id", recipe="r") + "), '')), 'A') "
+	"|| setweight(to_tsvector('english', coalesce(r.description, '')), 'B') "
+	"|| setweight(to_tsvector('english', coalesce(r.instructions, '')), 'D') "
+	"$$ LANGUAGE sql STABLE",
+
+	f"CREATE OR REPLACE FUNCTION {INDEX_TABLE}_on_recipe() RETURNS trigger AS $$ BEGIN "
+	f"INSERT INTO {INDEX_TABLE}(recipe_id, document) VALUES (NEW.id, {INDEX_TABLE}_document(NEW)) "
+	"ON CONFLICT (recipe_id) DO UPDATE SET document = EXCLUDED.document; "
+	"RETURN NEW; END $$ LANGUAGE plpgsql",
+
+	f"DROP TRIGGER IF EXISTS {INDEX_TABLE}_recipe ON recipes",
+	f"CREATE TRIGGER {INDEX_TABLE}_recipe AFTER INSERT OR UPDATE ON recipes "
+	f"FOR EACH ROW EXECUTE FUNCTION {INDEX_TABLE}_on_recipe()",
+
+	f"DROP TRIGGER IF EXISTS {INDEX_TABLE}_ingredient ON ingredients",
+	f"DROP FUNCTION IF EXISTS {INDEX_TABLE}_on_ingredient()",
+]
+
+POSTGRES_REINDEX = [
+	f"UPDATE {INDEX_TABLE} s SET document = {INDEX_TABLE}_document(r) FROM recipes r "
+	"WHERE s.recipe_id = r.id AND " + _POSTGRES_HAS_INGREDIENT.format(ingredient="CAST(:ingredient_id AS integer)", recipe="r"),
+]
+
+POSTGRES_REBUILD = [
+	f"DELETE FROM {INDEX_TABLE}",
+	f"INSERT INTO {INDEX_TABLE}(recipe_id, document) SELECT r.id, {INDEX_TABLE}_document(r) FROM recipes r",
+]
+
+POSTGRES_DROP = [f"DROP TABLE IF EXISTS {INDEX_TABLE} CASCADE"]
+
+POSTGRES_QUERY = (
+	f"SELECT s.recipe_id FROM {INDEX_TABLE} s, to_tsquery('english', :query) q "
+	"WHERE s.document @@ q ORDER BY ts_rank_cd(s.document, q) DESC LIMIT :limit"
+)
+
+_BACKENDS = {
+	"sqlite": (SQLITE_CREATE, SQLITE_REBUILD, SQLITE_DROP, SQLITE_QUERY, SQLITE_REINDEX),
+	"postgresql": (POSTGRES_CREATE, POSTGRES_REBUILD, POSTGRES_DROP, POSTGRES_QUERY, POSTGRES_REINDEX),
+}
+
+# Chosen from the engine built out of DATABASE_URL; None means "no native index"
+BACKEND: Optional[str] = engine.dialect.name if engine.dialect.name in _BACKENDS else None
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query: str) -> List[str]:
+	"""Split a free-text query into lowercase word tokens."""
+	return _TOKEN.findall(query.lower())
+
+
+def _match_expression(tokens: List[str]) -> str:
+	"""Build a prefix-matching OR query in the backend's syntax from sanitized tokens."""
+	if BACKEND == "postgresql":
+		return " | ".join(f"{token}:*" for token in tokens)
+	return " OR ".join(f'"{token}"*' for token in tokens)
+
+
+def rebuild(connection):
+	"""Repopulate the index from the recipes table."""
+	for statement in _BACKENDS[BACKEND][1]:
+		connection.execute(text(statement))
+
+
+def reindex_for_ingredient(connection, ingredient_id: int):
+	"""Refresh the index rows of every recipe that uses ``ingredient_id``."""
+	if BACKEND is None:
+		return
+	for statement in _BACKENDS[BACKEND][4]:
+		connection.execute(text(statement), {"ingredient_id": ingredient_id})
+
+
+def match(db, query: str, limit: int) -> Optional[List[int]]:
+	"""Return up to ``limit`` recipe ids matching ``query``, best first.
+
+	Returns None when the database has no native full-text backend.
+	"""
+	return match_tokens(db, tokenize(query), limit)
+
+
+def match_tokens(db, tokens: List[str], limit: int) -> Optional[List[int]]:
+	"""Like match() for an already tokenized (e.g. spell-corrected) query."""
+	if BACKEND is None:
+		return None
+	if not tokens:
+		return []
+
+	statement = text(_BACKENDS[BACKEND][3])
+	rows = db.execute(statement, {"query": _match_expression(tokens), "limit": limit})
+	return [row[0] for row in rows]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_index(target, connection, **kw):
+	if BACKEND is None or connection.dialect.name != BACKEND:
+		return
+	for statement in _BACKENDS[BACKEND][0]:
+		connection.execute(text(statement))
+
+	# Backfill databases created before the index existed
+	indexed = connection.execute(text(f"SELECT count(*) FROM {INDEX_TABLE}")).scalar()
+	recipes = connection.execute(text("SELECT count(*) FROM recipes")).scalar()
+	if indexed != recipes:
+		rebuild(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_index(target, connection, **kw):
+	if BACKEND is None or connection.dialect.name != BACKEND:
+		return
+	for statement in _BACKENDS[BACKEND][2]:
+		connection.execute(text(statement))
@@ -0,0 +1,173 @@
+"""Catalogue store shared by every worker process through a memory-mapped file.
+
+With ``CATALOGUE_SNAPSHOT_PATH`` set, the compact store (see ``catalogue_store``) is
+serialized to that file as packed arrays plus string tables. Workers ``mmap`` it read-only,
+so all of them share one physical copy through the page cache instead of each building
+their own.
+
+A new file is written by the ``build_catalogue_snapshot`` background job, which any worker
+enqueues after a catalogue write; the job table guarantees one builder per write burst,
+and a lock file serializes builders so a build never replaces a newer one. The file is
+written next to the target and renamed over it, so readers always see a complete file;
+each reader notices the new inode on its next lookup and maps it, while stores already
+handed out keep the old mapping alive until they are dropped.
+
+File layout (native byte order, every section 8-byte aligned)::
+
+    magic (8 bytes) | stamp (int64) | section count (int64)
+    section table: (offset int64, length int64) per section, in SECTIONS order
+    section data
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.api.util import catalogue
+from src.api.util.catalogue_store import CatalogueStore, IdListColumn, StringColumn
+
+SNAPSHOT_PATH = os.environ.get("CATALOGUE_SNAPSHOT_PATH") or None
+
+MAGIC = b"WCWCAT01"
+SECTIONS = (
+	"recipe_ids",
+	"title_offsets", "title_data",
+	"description_offsets", "description_data",
+	"ingredient_offsets", "ingredient_values",
+	"ingredient_ids",
+	"name_offsets", "name_data",
+)
+_HEADER = struct.Struct("=8sqq")
+_SECTION = struct.Struct("=qq")
+_INT_SECTIONS = {name for name in SECTIONS if not name.endswith("_data")}
+
+
+def _sections(store: CatalogueStore):
+	return {
+		"recipe_ids": store.recipe_ids,
+		"title_offsets": store.titles.offsets, "title_data": store.titles.data,
+		"description_offsets": store.descriptions.offsets, "description_data": store.descriptions.data,
+		"ingredient_offsets": store.recipe_ingredients.offsets, "ingredient_values": store.recipe_ingredients.values,
+		"ingredient_ids": store.ingredient_ids,
+		"name_offsets": store.ingredient_names.offsets, "name_data": store.ingredient_names.data,
+	}
+
+
+def _padding(size: int) -> int:
+	return -size % 8
+
+
+def write(store: CatalogueStore, path: str, stamp: Optional[int] = None):
+	"""Serialize ``store`` to ``path``, replacing any previous file atomically."""
+	stamp = time.time_ns() if stamp is None else stamp
+	buffers = [bytes(_sections(store)[name]) for name in SECTIONS]
+
+	offset = _HEADER.size + _SECTION.size * len(SECTIONS)
+	table = []
+	for buffer in buffers:
+		offset += _padding(offset)
+		table.append((offset, len(buffer)))
+		offset += len(buffer)
+
+	tmp_path = f"{path}.{os.getpid()}.tmp"
+	with open(tmp_path, "wb") as f:
+		f.write(_HEADER.pack(MAGIC, stamp, len(SECTIONS)))
+		for entry in table:
+			f.write(_SECTION.pack(*entry))
+		for (start, _), buffer in zip(table, buffers):
+			f.write(b"\0" * (start - f.tell()))
+			f.write(buffer)
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(tmp_path, path)
+
+
+def open_store(path: str) -> CatalogueStore:
+	"""Map a snapshot file read-only and return a store whose columns point into the mapping."""
+	with open(path, "rb") as f:
+		mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+	magic, stamp, count = _HEADER.unpack_from(mapped, 0)
+	if magic != MAGIC or count != len(SECTIONS):
+		raise ValueError(f"{path} is not a catalogue snapshot")
+
+	view = memoryview(mapped)
+	columns = {}
+	for index, name in enumerate(SECTIONS):
+		start, length = _SECTION.unpack_from(mapped, _HEADER.size + index * _SECTION.size)
+		section = view[start:start + length]
+		columns[name] = section.cast("q") if name in _INT_SECTIONS else section
+
+	return CatalogueStore(
+		stamp,
+		columns["recipe_ids"],
+		StringColumn(columns["title_offsets"], columns["title_data"]),
+		StringColumn(columns["description_offsets"], columns["description_data"]),
+		IdListColumn(columns["ingredient_offsets"], columns["ingredient_values"]),
+		columns["ingredient_ids"],
+		StringColumn(columns["name_offsets"], columns["name_data"]),
+	)
+
+
+def build(db: Session, path: str):
+	"""Write a fresh snapshot of the database to ``path``.
+
+	Holding the lock file while reading the database means builders finish in the order
+	they read, so an older build can never overwrite a newer one.
+	"""
+	import fcntl  # POSIX only; imported here so the module loads everywhere when sharing is off
+
+	with open(f"{path}.lock", "a") as lock:
+		fcntl.flock(lock, fcntl.LOCK_EX)
+		try:
+			write(CatalogueStore.from_db(db, 0), path)
+		finally:
+			fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class SharedStore:
+	"""Hands out the store mapped from the snapshot file, remapping after the file is replaced."""
+
+	def __init__(self, path: str):
+		self.path = path
+		self._identity: Optional[Tuple[int, int]] = None
+		self._store: Optional[CatalogueStore] = None
+		self._lock = threading.Lock()
+
+	def current(self) -> Optional[CatalogueStore]:
+		"""The mapped store, or None while no snapshot has been written yet."""
+		try:
+			stat = os.stat(self.path)
+		except FileNotFoundError:
+			return None
+
+		identity = (stat.st_ino, stat.st_mtime_ns)
+		if identity != self._identity:
+			with self._lock:
+				if identity != self._identity:
+					self._store = open_store(self.path)
+					self._identity = identity
+		return self._store
+
+
+shared_store = SharedStore(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+
+
+def _request_build(version: int):
+	from src.api.dependencies.database import SessionLocal
+	from src.api.util import jobs
+
+	db = SessionLocal()
+	try:
+		jobs.enqueue(db, "build_catalogue_snapshot")
+		db.commit()
+	finally:
+		db.close()
+
+
+if SNAPSHOT_PATH:
+	catalogue.on_change(_request_build)
@@ -0,0 +1,180 @@
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from src.api.models.ingredient import Ingredient
+from src.api.models.recipe import Recipe
+from src.api.util import lazy
+from src.api.util.derived import DerivedIndex
+from src.api.util.search_index import tokenize
+
+Levenshtein = lazy.module("Levenshtein")
+
+# Completions returned for a token that is the prefix of known terms (as-you-type queries)
+MAX_COMPLETIONS = 20
+
+
+def max_distance_for(token: str) -> int:
+	"""Edit distance tolerated for a token; short tokens must be (nearly) exact."""
+	if len(token) <= 2:
+		return 0
+	if len(token) <= 5:
+		return 1
+	return 2
+
+
+class SymSpell:
+	"""Deletion-neighbourhood dictionary for constant-time spelling correction.
+
+	Every term is indexed under all strings obtained by deleting up to ``max_distance``
+	characters from its first ``prefix_length`` characters. A lookup generates the same
+	deletions of the query token and only verifies the handful of terms that share one,
+	so its cost depends on the token length rather than on the vocabulary size.
+	"""
+
+	def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+		self.max_distance = max_distance
+		self.prefix_length = prefix_length
+		self.deletes: Dict[str, Set[str]] = {}
+		self.terms: Set[str] = set()
+		self._sorted_terms: List[str] = []
+
+	def _deletions(self, word: str, distance: int) -> Set[str]:
+		word = word[:self.prefix_length]
+		result = {word}
+		frontier = {word}
+		for _ in range(distance):
+			frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - result
+			result |= frontier
+		return result
+
+	def add(self, term: str):
+		if term in self.terms:
+			return
+		self.terms.add(term)
+		bisect.insort(self._sorted_terms, term)
+		for deletion in self._deletions(term, self.max_distance):
+			self.deletes.setdefault(deletion, set()).add(term)
+
+	def lookup(self, token: str, max_distance: Optional[int] = None) -> List[str]:
+		"""Return the known terms closest to ``token`` (all at the smallest distance found)."""
+		if token in self.terms:
+			return [token]
+
+		max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+		best, best_distance = [], max_distance + 1
+		for deletion in self._deletions(token, max_distance):
+			for term in tuple(self.deletes.get(deletion, ())):
+				distance = Levenshtein.distance(token, term)
+				if distance < best_distance:
+					best, best_distance = [term], distance
+				elif distance == best_distance and term not in best:
+					best.append(term)
+		return sorted(best)
+
+	def complete(self, prefix: str, limit: int = MAX_COMPLETIONS) -> List[str]:
+		"""Return up to ``limit`` known terms starting with ``prefix``."""
+		start = bisect.bisect_left(self._sorted_terms, prefix)
+		result = []
+		for term in self._sorted_terms[start:start + limit]:
+			if not term.startswith(prefix):
+				break
+			result.append(term)
+		return result
+
+	def expand(self, token: str) -> List[str]:
+		"""Terms a query token may stand for: itself or its completions if known, else corrections."""
+		completions = self.complete(token)
+		if completions:
+			return completions
+		return self.lookup(token, max_distance_for(token))
+
+
+class Vocabulary:
+	"""Spelling dictionaries over the catalogue plus an ingredient term -> ids index."""
+
+	def __init__(self):
+		self.recipe_terms = SymSpell()
+		self.ingredient_terms = SymSpell()
+		self.ingredient_postings: Dict[str, Set[int]] = {}
+		self._ingredient_tokens: Dict[int, Set[str]] = {}
+
+	def add_recipe_title(self, title: str):
+		for token in tokenize(title):
+			self.recipe_terms.add(token)
+
+	def index_ingredient(self, ingredient_id: int, name: str):
+		self.remove_ingredient(ingredient_id)
+		tokens = set(tokenize(name))
+		self._ingredient_tokens[ingredient_id] = tokens
+		for token in tokens:
+			self.recipe_terms.add(token)
+			self.ingredient_terms.add(token)
+			self.ingredient_postings.setdefault(token, set()).add(ingredient_id)
+
+	def remove_ingredient(self, ingredient_id: int):
+		for token in self._ingredient_tokens.pop(ingredient_id, ()):
+			self.ingredient_postings.get(token, set()).discard(ingredient_id)
+
+	def correct_recipe_query(self, tokens: Iterable[str]) -> List[str]:
+		"""Replace unknown tokens with their closest known terms; known tokens are kept."""
+		corrected = []
+		for token in tokens:
+			if token in self.recipe_terms.terms or self.recipe_terms.complete(token, 1):
+				corrected.append(token)
+			else:
+				corrected.extend(self.recipe_terms.lookup(token, max_distance_for(token)))
+		return corrected
+
+	def ingredient_candidates(self, query: str) -> Set[int]:
+		"""Ids of ingredients whose name contains a term matching some query token."""
+		ids = set()
+		for token in tokenize(query):
+			for term in self.ingredient_terms.expand(token):
+				ids |= self.ingredient_postings.get(term, set())
+		return ids
+
+
+def _build_vocabulary(db: Session) -> Vocabulary:
+	# Read from the database rather than the store: a shared snapshot lags the writes
+	vocabulary = Vocabulary()
+	for ingredient_id, name in db.query(Ingredient.id, Ingredient.name):
+		vocabulary.index_ingredient(ingredient_id, name)
+	for (title,) in db.query(Recipe.title):
+		vocabulary.add_recipe_title(title)
+	return vocabulary
+
+
+# Rebuilt when the catalogue version changes -- which catalogue.poll() also advances for writes made
+# by other workers; this worker's own writes are applied incrementally by the on_* hooks below
+vocabulary = DerivedIndex("spelling_vocabulary", _build_vocabulary)
+_lock = threading.Lock()
+
+
+def get_vocabulary(db: Session) -> Vocabulary:
+	"""Return the process-wide vocabulary; after a catalogue change the previous one is served until rebuilt."""
+	return vocabulary.get(db)
+
+
+def on_ingredient_saved(ingredient_id: int, name: str):
+	"""Keep an already built vocabulary in step with an ingredient insert or rename."""
+	current = vocabulary.peek()
+	if current is not None:
+		with _lock:
+			current.index_ingredient(ingredient_id, name)
+
+
+def on_ingredient_deleted(ingredient_id: int):
+	current = vocabulary.peek()
+	if current is not None:
+		with _lock:
+			current.remove_ingredient(ingredient_id)
+
+
+def on_recipe_saved(title: Optional[str]):
+	current = vocabulary.peek()
+	if current is not None and title:
+		with _lock:
+			current.add_recipe_title(title)
@@ -17,10 +17,73 @@ function setAccessToken(token) {
 }
 
 /**
- * Remove access token from sessionStorage
+ * Remove access and refresh tokens from sessionStorage
  */
 function removeAccessToken() {
     sessionStorage.removeItem('access_token');
+    sessionStorage.removeItem('refresh_token');
+}
+
+/**
+ * Store the tokens from a /auth/login or /auth/refresh response
+ * @param {Object} data - Token response
+ */
+function storeTokens(data) {
+    setAccessToken(data.access_token);
+    if (data.refresh_token) {
+        sessionStorage.setItem('refresh_token', data.refresh_token);
+    }
+}
+
+/**
+ * Swap the stored refresh token for a new access token (POST /auth/refresh),
+ * so an expired session renews without asking for the password again.
+ * Refresh tokens are single-use: the response carries the next one.
+ * @returns {Promise<boolean>} - True if a new access token was stored
+ */
+async function refreshAccessToken() {
+    const refreshToken = sessionStorage.getItem('refresh_token');
+    if (!refreshToken) {
+        return false;
+    }
+
+    try {
+        const response = await fetch(`${API_BASE_URL}/auth/refresh`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken })
+        });
+
+        if (!response.ok) {
+            // Expired, revoked or already used: the user has to log in again
+            if (response.status === 401) {
+                removeAccessToken();
+            }
+            return false;
+        }
+
+        storeTokens(await response.json());
+        return true;
+    } catch (error) {
+        console.error('Error refreshing session:', error);
+        return false;
+    }
+}
+
+/**
+ * GET /auth/me, renewing the access token once if it has expired
+ * @returns {Promise<Response>}
+ */
+async function fetchMe() {
+    let response = await fetch(`${API_BASE_URL}/auth/me`, {
+        headers: getAuthHeaders()
+    });
+    if (response.status === 401 && await refreshAccessToken()) {
+        response = await fetch(`${API_BASE_URL}/auth/me`, {
+            headers: getAuthHeaders()
+        });
+    }
+    return response;
 }
 
 /**
@@ -49,12 +112,10 @@ async function isAuthenticated() {
     }
 
     try {
-        const response = await fetch(`${API_BASE_URL}/auth/me`, {
-            headers: getAuthHeaders()
-        });
+        const response = await fetchMe();
 
         if (!response.ok) {
-            // Token is invalid or expired, remove it
+            // Token is invalid and could not be refreshed, remove it
             removeAccessToken();
             return false;
         }
@@ -101,9 +162,7 @@ async function getCurrentUser() {
     }
 
     try {
-        const response = await fetch(`${API_BASE_URL}/auth/me`, {
-            headers: getAuthHeaders()
-        });
+        const response = await fetchMe();
 
         if (!response.ok) {
             throw new Error('Failed to get user info');
@@ -149,8 +208,8 @@ async function login(username, password) {
 
         const data = await response.json();
 
-        // Store token in sessionStorage
-        setAccessToken(data.access_token);
+        // Store tokens in sessionStorage
+        storeTokens(data);
 
         return data;
     } catch (error) {
@@ -160,10 +219,22 @@ async function login(username, password) {
 }
 
 /**
- * Logout user by removing token and redirecting
+ * Logout user by revoking the refresh token, removing tokens and redirecting
  * @param {string} redirectUrl - URL to redirect to after logout (default: index.html)
  */
-function logout(redirectUrl = 'index.html') {
+async function logout(redirectUrl = 'index.html') {
+    const refreshToken = sessionStorage.getItem('refresh_token');
+    if (refreshToken) {
+        try {
+            await fetch(`${API_BASE_URL}/auth/logout`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ refresh_token: refreshToken })
+            });
+        } catch (error) {
+            console.error('Error revoking session:', error);
+        }
+    }
     removeAccessToken();
     window.location.href = redirectUrl;
 }
@@ -201,6 +272,76 @@ async function register(username, email, password) {
     }
 }
 
+/**
+ * Listen for changes pushed by the server (GET /events/, server-sent events).
+ * Uses fetch rather than EventSource so the bearer token travels in a header.
+ * Reconnects after a dropped connection; handlers.resync is called after every reconnect
+ * and whenever the server reports that events were dropped, so lists can be re-fetched.
+ * @param {Object} handlers - Callbacks by event name (pantry, ingredient, resync), given the parsed data
+ * @returns {Function} - Call to stop listening
+ */
+function subscribeToUpdates(handlers) {
+    const controller = new AbortController();
+    let connectedBefore = false;
+
+    const dispatch = (frame) => {
+        let name = 'message';
+        let data = '';
+        frame.split('\n').forEach(line => {
+            if (line.startsWith('event: ')) {
+                name = line.slice(7);
+            } else if (line.startsWith('data: ')) {
+                data += line.slice(6);
+            }
+        });
+        if (data && handlers[name]) {
+            handlers[name](JSON.parse(data));
+        }
+    };
+
+    const connect = async () => {
+        const headers = getAuthHeaders();
+        if (!headers.Authorization) {
+            return;
+        }
+
+        try {
+            const response = await fetch(`${API_BASE_URL}/events/`, { headers, signal: controller.signal });
+            if (!response.ok) {
+                // Signed out or token expired: nothing to listen to
+                return;
+            }
+            if (connectedBefore && handlers.resync) {
+                handlers.resync({});
+            }
+            connectedBefore = true;
+
+            const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+            let buffer = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += value;
+                let end;
+                while ((end = buffer.indexOf('\n\n')) !== -1) {
+                    dispatch(buffer.slice(0, end));
+                    buffer = buffer.slice(end + 2);
+                }
+            }
+        } catch (error) {
+            if (controller.signal.aborted) return;
+            console.error('Live updates disconnected:', error);
+        }
+
+        if (!controller.signal.aborted) {
+            setTimeout(connect, 5000);
+        }
+    };
+
+    connect();
+    return () => controller.abort();
+}
+
 // Export API_BASE_URL for use in other scripts
 window.API_BASE_URL = API_BASE_URL;
 
@@ -1,3 +1,6 @@
+// Pantry rows currently shown; kept in sync with server-pushed changes
+let pantryItems = [];
+
 /**
  * Fetch all ingredients for search/autocomplete
  * @returns {Promise<Array>} - Array of ingredient objects
@@ -165,6 +168,75 @@ function renderPantryTable(pantryItems) {
     });
 }
 
+/**
+ * Insert or replace a pantry row and re-render, without re-downloading the pantry
+ * @param {Object} item - Pantry ingredient object
+ */
+function upsertPantryItem(item) {
+    const index = pantryItems.findIndex(existing => existing.id === item.id);
+    if (index === -1) {
+        pantryItems.push(item);
+    } else {
+        pantryItems[index] = {
+            ...item,
+            ingredient_name: item.ingredient_name || pantryItems[index].ingredient_name
+        };
+    }
+    renderPantryTable(pantryItems);
+    refilterPantryTable();
+}
+
+/**
+ * Remove a pantry row and re-render
+ * @param {number} pantryId - Pantry ingredient ID
+ */
+function removePantryItem(pantryId) {
+    pantryItems = pantryItems.filter(item => item.id !== pantryId);
+    renderPantryTable(pantryItems);
+    refilterPantryTable();
+}
+
+/**
+ * Apply a change pushed by the server (see subscribeToUpdates in auth.js)
+ * @param {Object} event - {op: 'upsert', item} or {op: 'delete', id}
+ */
+function applyPantryEvent(event) {
+    if (event.op === 'delete') {
+        removePantryItem(event.id);
+    } else {
+        upsertPantryItem(event.item);
+    }
+}
+
+/**
+ * Keep ingredient names in the table current when an ingredient is renamed
+ * @param {Object} event - {op: 'upsert', item} or {op: 'delete', id}
+ */
+function applyIngredientEvent(event) {
+    if (event.op !== 'upsert') return;
+    let changed = false;
+    pantryItems.forEach(item => {
+        if (item.ingredient_id === event.item.id && item.ingredient_name !== event.item.name) {
+            item.ingredient_name = event.item.name;
+            changed = true;
+        }
+    });
+    if (changed) {
+        renderPantryTable(pantryItems);
+        refilterPantryTable();
+    }
+}
+
+/**
+ * Re-apply the current search filter after the table was re-rendered
+ */
+function refilterPantryTable() {
+    const searchInput = document.getElementById('pantrySearchInput');
+    if (searchInput && searchInput.value) {
+        filterPantryTable(searchInput.value);
+    }
+}
+
 /**
  * Filter pantry table by search query
  * @param {string} query - Search query
@@ -297,7 +369,7 @@ async function handleAddIngredient(ingredientInput, quantityInput, unitInput) {
         const userId = await getCurrentUserId();
 
         // Add to pantry
-        await addToPantry(ingredientId, quantity, unit, userId);
+        const created = await addToPantry(ingredientId, quantity, unit, userId);
 
         // Clear form
         ingredientInput.value = '';
@@ -305,8 +377,7 @@ async function handleAddIngredient(ingredientInput, quantityInput, unitInput) {
         unitInput.value = '';
         delete ingredientInput.dataset.ingredientId;
 
-        // Reload pantry
-        await loadPantry();
+        upsertPantryItem({ ...created, ingredient_name: created.ingredient_name || ingredientName });
 
         showToast('Ingredient added successfully!', 'success');
     } catch (error) {
@@ -356,12 +427,12 @@ async function editPantryItem(pantryId) {
             }
 
             try {
-                await updatePantryIngredient(pantryId, {
+                const updated = await updatePantryIngredient(pantryId, {
                     quantity: formData.quantity.trim(),
                     unit: formData.unit.trim()
                 });
 
-                await loadPantry();
+                upsertPantryItem(updated);
                 showToast('Pantry item updated successfully!', 'success');
             } catch (error) {
                 showToast('Failed to update pantry item: ' + error.message, 'error');
@@ -390,7 +461,7 @@ async function deletePantryItem(pantryId) {
         onConfirm: async () => {
             try {
                 await deletePantryIngredient(pantryId);
-                await loadPantry();
+                removePantryItem(pantryId);
                 showToast('Pantry item deleted successfully!', 'success');
             } catch (error) {
                 showToast('Failed to delete pantry item: ' + error.message, 'error');
@@ -404,8 +475,9 @@ async function deletePantryItem(pantryId) {
  */
 async function loadPantry() {
     try {
-        const pantryItems = await fetchMyPantry();
+        pantryItems = await fetchMyPantry();
         renderPantryTable(pantryItems);
+        refilterPantryTable();
     } catch (error) {
         console.error('Error loading pantry:', error);
         showToast('Failed to load pantry. Please make sure the API server is running.', 'error');
@@ -431,8 +503,13 @@ async function initializePantryPage() {
     // Initialize add ingredient form
     initializeAddIngredientForm();
 
-    // Load pantry
-    loadPantry();
+    // Load pantry, then follow changes made on other devices
+    await loadPantry();
+    subscribeToUpdates({
+        pantry: applyPantryEvent,
+        ingredient: applyIngredientEvent,
+        resync: loadPantry
+    });
 }
 
 // Make functions globally available
@@ -8,6 +8,39 @@ function getUrlParameter(name) {
     return urlParams.get(name);
 }
 
+/**
+ * Short stable hash of an image URL, used as the ?v= version of /images/ URLs so they can
+ * be cached forever and still change when the recipe image does
+ * @param {string} imageUrl - Source image URL
+ * @returns {string}
+ */
+function imageVersion(imageUrl) {
+    let hash = 5381;
+    for (let i = 0; i < imageUrl.length; i++) {
+        hash = ((hash * 33) ^ imageUrl.charCodeAt(i)) >>> 0;
+    }
+    return hash.toString(36);
+}
+
+/**
+ * URL of a recipe image resized by the API
+ * @param {Object} recipe - Recipe object with id and image_url
+ * @param {string} size - thumb, card, large or placeholder
+ * @returns {string}
+ */
+function recipeImageUrl(recipe, size) {
+    return `${API_BASE_URL}/images/${recipe.id}/${size}?v=${imageVersion(recipe.image_url || '')}`;
+}
+
+/**
+ * Card <img>: a 180px thumbnail (360px on high-DPI screens) over a blurred placeholder
+ * @param {Object} recipe - Recipe object with id, title and image_url
+ * @returns {string} - Image HTML
+ */
+function cardImage(recipe) {
+    return `<img src="${recipeImageUrl(recipe, 'thumb')}" srcset="${recipeImageUrl(recipe, 'thumb')} 1x, ${recipeImageUrl(recipe, 'card')} 2x" alt="${recipe.title}" width="180" height="180" loading="lazy" style="object-fit: cover; display: block; margin: 0 auto; background: center / cover url('${recipeImageUrl(recipe, 'placeholder')}');">`;
+}
+
 /**
  * Fetch ingredient details by ID
  * @param {number} ingredientId - Ingredient ID
@@ -104,6 +137,7 @@ async function loadRecipeDetails() {
 
         // Display recipe details
         await displayRecipe(recipe);
+        loadSimilarRecipes(recipe.id);
 
     } catch (error) {
         console.error('Error loading recipe:', error);
@@ -111,6 +145,43 @@ async function loadRecipeDetails() {
     }
 }
 
+/**
+ * Load and display recipes similar to the current one
+ * @param {number} recipeId - ID of the recipe being viewed
+ */
+async function loadSimilarRecipes(recipeId) {
+    const container = document.getElementById('similar-recipes');
+    if (!container) {
+        return;
+    }
+
+    try {
+        const response = await fetch(`${API_BASE_URL}/recipes/${recipeId}/similar?limit=4&fields=id,title,servings,image_url`);
+        if (!response.ok) {
+            throw new Error(`Failed to load similar recipes: ${response.statusText}`);
+        }
+        const recipes = await response.json();
+        if (recipes.length === 0) {
+            return;
+        }
+
+        container.innerHTML = `<h3 style="grid-column: 1/-1;">Similar recipes</h3>`;
+        recipes.forEach(recipe => {
+            const card = document.createElement('a');
+            card.className = 'card';
+            card.href = `RecipeDetail.html?id=${recipe.id}`;
+            card.innerHTML = `
+                ${cardImage(recipe)}
+                <h3>${recipe.title}</h3>
+                <p class="muted">${recipe.servings ? `${recipe.servings} servings` : ''}</p>
+            `;
+            container.appendChild(card);
+        });
+    } catch (error) {
+        console.error('Error loading similar recipes:', error);
+    }
+}
+
 /**
  * Display recipe details on the page
  * @param {object} recipe - Recipe object from API
@@ -129,8 +200,42 @@ async function displayRecipe(recipe) {
     );
 
     // Fetch user's pantry to check which ingredients they have
-    const userPantry = await fetchUserPantry();
+    let userPantry = await fetchUserPantry();
+    renderRecipe(recipe, ingredients, categories, userPantry);
+
+    if (userPantry !== null) {
+        // Re-render from pushed changes instead of re-fetching the pantry and ingredients
+        subscribeToUpdates({
+            pantry: (event) => {
+                userPantry = userPantry.filter(item => item.id !== (event.op === 'delete' ? event.id : event.item.id));
+                if (event.op === 'upsert') {
+                    userPantry.push(event.item);
+                }
+                renderRecipe(recipe, ingredients, categories, userPantry);
+            },
+            ingredient: (event) => {
+                const ingredient = event.op === 'upsert' && ingredients.find(ing => ing && ing.id === event.item.id);
+                if (ingredient) {
+                    ingredient.name = event.item.name;
+                    renderRecipe(recipe, ingredients, categories, userPantry);
+                }
+            },
+            resync: async () => {
+                userPantry = await fetchUserPantry() || [];
+                renderRecipe(recipe, ingredients, categories, userPantry);
+            }
+        });
+    }
+}
 
+/**
+ * Render the recipe page from already-fetched data
+ * @param {object} recipe - Recipe object from API
+ * @param {Array<object>} ingredients - The recipe's ingredients
+ * @param {Array<object>} categories - The recipe's categories
+ * @param {Array<object>|null} userPantry - The user's pantry items, or null if not logged in
+ */
+function renderRecipe(recipe, ingredients, categories, userPantry) {
     // Create a set of ingredient IDs that the user has in their pantry
     const pantryIngredientIds = new Set();
     if (userPantry) {
@@ -171,9 +276,10 @@ async function displayRecipe(recipe) {
     const photoSection = document.getElementById('recipe-photo-section');
     photoSection.innerHTML = `
         <img 
-            src="${recipe.image_url}" 
+            src="${recipeImageUrl(recipe, 'large')}" 
             alt="${recipe.title}" 
             class="recipe-photo"
+            style="background: center / cover url('${recipeImageUrl(recipe, 'placeholder')}');"
         >
     `;
 
@@ -212,7 +318,8 @@ async function displayRecipe(recipe) {
             <aside class="card">
                 <h3>Ingredients</h3>
                 ${statusMessage}
-                <button id="downloadIngredientsPdf" class="btn btn-download" style="margin-top:8px">Download PDF</button>
+                <button id="downloadShoppingList" class="btn btn-download" style="margin-top:8px">Download shopping list</button>
+                <button id="toggleMealPlan" class="btn btn-download" style="margin-top:8px">Add to meal plan</button>
                 <ul style="margin-top:8px;padding-left:18px">
                     ${ingredientsHtml}
                 </ul>
@@ -228,7 +335,8 @@ async function displayRecipe(recipe) {
         contentHtml += `
             <aside class="card">
                 <h3>Ingredients</h3>
-                <button id="downloadIngredientsPdf" class="btn btn-download" style="margin-top:8px">Download PDF</button>
+                <button id="downloadShoppingList" class="btn btn-download" style="margin-top:8px">Download shopping list</button>
+                <button id="toggleMealPlan" class="btn btn-download" style="margin-top:8px">Add to meal plan</button>
                 <ul style="margin-top:8px;padding-left:18px">
                     ${ingredientsHtml}
                 </ul>
@@ -259,129 +367,71 @@ async function displayRecipe(recipe) {
     }
 
     contentSection.innerHTML = contentHtml;
-    // Attach PDF download handler (if button exists)
-    const downloadBtn = document.getElementById('downloadIngredientsPdf');
-    if (downloadBtn) {
-        downloadBtn.addEventListener('click', () => {
-            // pantryIngredientIds is a Set when userPantry exists, otherwise empty/undefined
-            const pantrySet = (userPantry ? pantryIngredientIds : null);
-            generateIngredientsPDF(recipe.title, ingredients, pantrySet);
-        });
-    }
+
+    const planButton = document.getElementById('toggleMealPlan');
+    const updatePlanButton = () => {
+        const planned = getPlannedRecipes();
+        planButton.textContent = planned.includes(recipe.id) ? 'Remove from meal plan' : 'Add to meal plan';
+    };
+    updatePlanButton();
+    planButton.addEventListener('click', () => {
+        togglePlannedRecipe(recipe.id);
+        updatePlanButton();
+    });
+
+    document.getElementById('downloadShoppingList').addEventListener('click', () => {
+        // This recipe plus every recipe planned on other pages, in one list
+        const recipeIds = [recipe.id, ...getPlannedRecipes().filter(id => id !== recipe.id)];
+        downloadShoppingList(recipeIds);
+    });
 }
 
 /**
- * Generate a simple PDF listing ingredients and marking missing ones.
- * @param {string} recipeTitle
- * @param {Array<object>} ingredients
- * @param {Set<number>|null} pantryIds - Set of ingredient ids the user has, or null if unknown
+ * Recipe ids the user added to their meal plan (kept in localStorage)
+ * @returns {Array<number>}
  */
-function generateIngredientsPDF(recipeTitle, ingredients, pantryIds) {
+function getPlannedRecipes() {
     try {
-        // Support jspdf UMD export or global jsPDF
-        let jsPDFCtor = null;
-        if (window.jspdf && window.jspdf.jsPDF) {
-            jsPDFCtor = window.jspdf.jsPDF;
-        } else if (window.jsPDF) {
-            jsPDFCtor = window.jsPDF;
-        }
-        if (!jsPDFCtor) {
-            alert('PDF library not available.');
-            return;
-        }
+        return JSON.parse(localStorage.getItem('mealPlanRecipes')) || [];
+    } catch (error) {
+        return [];
+    }
+}
 
-        // Create a receipt-style PDF
-        const doc = new jsPDFCtor({ unit: 'pt', format: 'letter' });
-        // Use monospace font for receipt look where available
-        //try { doc.setFont('helvetica', 'normal'); } catch (e) {}
-        try { doc.setFont('courier'); } catch (e) {}
-
-        const startX = 40;
-        let y = 40;
-
-        // Header (centered brand)
-        doc.setFontSize(14);
-        doc.setTextColor(34,34,34);
-        const title = recipeTitle || 'Ingredients';
-        const pageWidth = doc.internal.pageSize.getWidth();
-        const centerX = pageWidth / 2;
-        doc.setTextColor(0);
-        doc.text(title, centerX, y, { align: 'center' });
-        y += 18;
-
-        // Sub header small
-        doc.setFontSize(9);
-        const now = new Date();
-        doc.text(`Generated: ${now.toLocaleString()}`, centerX, y, { align: 'center' });
-        y += 16;
-
-        // Separator line
-        doc.setDrawColor(180);
-        doc.setLineWidth(0.5);
-        doc.line(startX, y, pageWidth - startX, y);
-        y += 14;
-
-        // Column headers
-        doc.setFontSize(10);
-        doc.text('Item', startX, y);
-        doc.text('Have?', pageWidth - startX - 40, y);
-        y += 12;
-
-        doc.setLineWidth(0.25);
-        doc.line(startX, y, pageWidth - startX, y);
-        y += 12;
-
-        // List ingredients
-        const lineHeight = 14;
-        let missingCount = 0;
-        ingredients.forEach((ing) => {
-            if (y > doc.internal.pageSize.getHeight() - 60) {
-                doc.addPage();
-                y = 40;
-            }
-            const has = pantryIds ? pantryIds.has(ing.id) : null;
-            // Item name
-            doc.setFontSize(10);
-            doc.setTextColor(0);
-            const name = typeof ing.name === 'string' ? ing.name : (ing.name || 'Unknown');
-            // wrap long names if needed
-            const maxWidth = pageWidth - startX * 2 - 70;
-            const split = doc.splitTextToSize(name, maxWidth);
-            doc.text(split, startX, y);
-
-            // Have / Missing marker with colored text
-            const markerX = pageWidth - startX - 40;
-            if (has === true) {
-                doc.setTextColor(16,185,129); // green
-                doc.text("Have", markerX, y);
-            } else if (has === false) {
-                doc.setTextColor(239,68,68); // red
-                doc.text("Missing", markerX, y);
-                missingCount += 1;
-            } else {
-                doc.setTextColor(100,100,100); // gray
-                doc.text("Unknown", markerX, y);
-            }
+/**
+ * Add a recipe to the meal plan, or remove it if already there
+ * @param {number} recipeId - Recipe ID
+ */
+function togglePlannedRecipe(recipeId) {
+    const planned = getPlannedRecipes();
+    const updated = planned.includes(recipeId) ? planned.filter(id => id !== recipeId) : [...planned, recipeId];
+    localStorage.setItem('mealPlanRecipes', JSON.stringify(updated));
+}
 
-            y += lineHeight * Math.max(1, split.length);
+/**
+ * Download the combined shopping list of several recipes, minus the user's pantry
+ * (the server builds and streams the file; see POST /shopping-list/export)
+ * @param {Array<number>} recipeIds - Recipe IDs
+ */
+async function downloadShoppingList(recipeIds) {
+    try {
+        const response = await fetch(`${API_BASE_URL}/shopping-list/export`, {
+            method: 'POST',
+            headers: { ...getAuthHeaders(), 'Content-Type': 'application/json' },
+            body: JSON.stringify({ recipe_ids: recipeIds })
         });
+        if (!response.ok) {
+            throw new Error(`Failed to export shopping list: ${response.statusText}`);
+        }
 
-        // Footer summary
-        y += 8;
-        doc.setDrawColor(180);
-        doc.line(startX, y, pageWidth - startX, y);
-        y += 14;
-        doc.setFontSize(10);
-        doc.setTextColor(0);
-        const total = ingredients.length;
-        doc.text(`Total items: ${total}`, startX, y);
-        doc.text(`Missing: ${missingCount}`, pageWidth - startX - 100, y);
-
-        const safeTitle = recipeTitle ? recipeTitle.replace(/[^a-z0-9\-_ ]/gi, '') : 'ingredients';
-        doc.save(`${safeTitle}-ingredients.pdf`);
-    } catch (err) {
-        console.error('Error generating PDF', err);
-        alert('Unable to generate PDF.');
+        const link = document.createElement('a');
+        link.href = URL.createObjectURL(await response.blob());
+        link.download = 'shopping-list.txt';
+        link.click();
+        URL.revokeObjectURL(link.href);
+    } catch (error) {
+        console.error('Error downloading shopping list:', error);
+        alert('Unable to download the shopping list.');
     }
 }
 
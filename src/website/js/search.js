@@ -1,5 +1,122 @@
 const API_BASE_URL = 'http://localhost:8000';
 
+// Columns rendered by recipe cards; list endpoints skip everything else (e.g. instructions)
+const CARD_FIELDS = 'id,title,description,servings,image_url';
+
+/**
+ * Fetch a recipe list endpoint with the card fields; signed-in users also get
+ * pantry coverage counts (pantry_have / pantry_missing) on every recipe
+ * @param {string} path - Endpoint path, optionally with query parameters
+ * @returns {Promise<Response>}
+ */
+function fetchRecipeCards(path) {
+    const token = sessionStorage.getItem('access_token');
+    let url = `${API_BASE_URL}${path}${path.includes('?') ? '&' : '?'}fields=${CARD_FIELDS}`;
+    if (!token) {
+        return fetch(url);
+    }
+    url += '&pantry_match=true';
+    return fetch(url, { headers: { 'Authorization': `Bearer ${token}` } });
+}
+
+/**
+ * Short stable hash of an image URL, used as the ?v= version of /images/ URLs so they can
+ * be cached forever and still change when the recipe image does
+ * @param {string} imageUrl - Source image URL
+ * @returns {string}
+ */
+function imageVersion(imageUrl) {
+    let hash = 5381;
+    for (let i = 0; i < imageUrl.length; i++) {
+        hash = ((hash * 33) ^ imageUrl.charCodeAt(i)) >>> 0;
+    }
+    return hash.toString(36);
+}
+
+/**
+ * URL of a recipe image resized by the API
+ * @param {Object} recipe - Recipe object with id and image_url
+ * @param {string} size - thumb, card, large or placeholder
+ * @returns {string}
+ */
+function recipeImageUrl(recipe, size) {
+    return `${API_BASE_URL}/images/${recipe.id}/${size}?v=${imageVersion(recipe.image_url || '')}`;
+}
+
+/**
+ * Card <img>: a 180px thumbnail (360px on high-DPI screens) over a blurred placeholder
+ * @param {Object} recipe - Recipe object with id, title and image_url
+ * @returns {string} - Image HTML
+ */
+function cardImage(recipe) {
+    return `<img src="${recipeImageUrl(recipe, 'thumb')}" srcset="${recipeImageUrl(recipe, 'thumb')} 1x, ${recipeImageUrl(recipe, 'card')} 2x" alt="${recipe.title}" width="180" height="180" loading="lazy" style="object-fit: cover; display: block; margin: 0 auto; background: center / cover url('${recipeImageUrl(recipe, 'placeholder')}');">`;
+}
+
+/**
+ * "Can cook" / "Missing N" badge for a recipe returned with pantry counts
+ * @param {Object} recipe - Recipe object
+ * @returns {string} - Badge HTML, or an empty string without pantry counts
+ */
+function pantryBadge(recipe) {
+    if (recipe.pantry_missing === undefined) {
+        return '';
+    }
+    const label = recipe.pantry_missing === 0 ? 'Can cook' : `Missing ${recipe.pantry_missing}`;
+    return `<span class="chip">${label}</span>`;
+}
+
+/**
+ * Stream search results as the server scores them: title matches arrive first, fuzzy
+ * matches as scoring proceeds, and the final ranking at the end
+ * @param {string} query - Search query
+ * @param {Function} onUpdate - Called with (recipes best first, done) after every batch
+ * @returns {Promise<Array>} Final ranked recipes
+ */
+async function streamSearchResults(query, onUpdate) {
+    const response = await fetchRecipeCards(`/recipes/search/stream?query=${encodeURIComponent(query)}&threshold=70`);
+    if (!response.ok) {
+        throw new Error(`Search failed: ${response.statusText}`);
+    }
+
+    const found = new Map();
+    const ranked = () => [...found.values()].sort((a, b) => (b.score ?? 0) - (a.score ?? 0));
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+
+        for (const line of lines) {
+            if (!line) {
+                continue;
+            }
+            const event = JSON.parse(line);
+            if (event.type === 'results') {
+                event.items.forEach(item => found.set(item.id, item));
+                onUpdate(ranked(), false);
+            } else if (event.type === 'done') {
+                // Earlier batches may include recipes that were later outranked
+                const recipes = event.ids.map(id => found.get(id)).filter(Boolean);
+                onUpdate(recipes, true);
+                return recipes;
+            } else if (event.type === 'error') {
+                throw new Error(event.detail);
+            }
+        }
+    }
+
+    const recipes = ranked();
+    onUpdate(recipes, true);
+    return recipes;
+}
+
 /**
  * Perform search and display results
  * @param {string} query - Search query
@@ -13,7 +130,15 @@ async function searchRecipes(query, resultsContainerId, redirectToRecipes = fals
     }
 
     try {
-        const response = await fetch(`${API_BASE_URL}/recipes/search/?query=${encodeURIComponent(query)}&threshold=70`);
+        if (!redirectToRecipes) {
+            // Results appear as they are found instead of after the whole catalogue is scored
+            await streamSearchResults(query, (recipes, done) => {
+                displaySearchResults(recipes, resultsContainerId, query, done);
+            });
+            return;
+        }
+
+        const response = await fetchRecipeCards(`/recipes/search/?query=${encodeURIComponent(query)}&threshold=70`);
 
         if (!response.ok) {
             throw new Error(`Search failed: ${response.statusText}`);
@@ -42,8 +167,9 @@ async function searchRecipes(query, resultsContainerId, redirectToRecipes = fals
  * @param {Array} recipes - Array of recipe objects
  * @param {string} containerId - ID of the container element
  * @param {string} query - The search query
+ * @param {boolean} done - False while a streamed search is still scoring
  */
-function displaySearchResults(recipes, containerId, query) {
+function displaySearchResults(recipes, containerId, query, done = true) {
     const container = document.getElementById(containerId);
     if (!container) {
         console.error('Results container not found');
@@ -53,7 +179,7 @@ function displaySearchResults(recipes, containerId, query) {
     // Clear existing results
     container.innerHTML = '';
 
-    if (recipes.length === 0) {
+    if (recipes.length === 0 && done) {
         container.innerHTML = `
             <div style="grid-column: 1/-1; text-align: center; padding: 40px;">
                 <h3>No recipes found for "${query}"</h3>
@@ -66,7 +192,7 @@ function displaySearchResults(recipes, containerId, query) {
     // Display results count
     const resultInfo = document.createElement('div');
     resultInfo.style.gridColumn = '1/-1';
-    resultInfo.innerHTML = `<p class="muted">Found ${recipes.length} recipe${recipes.length !== 1 ? 's' : ''} for "${query}"</p>`;
+    resultInfo.innerHTML = `<p class="muted">Found ${recipes.length} recipe${recipes.length !== 1 ? 's' : ''} for "${query}"${done ? '' : ' (still searching...)'}</p>`;
     container.appendChild(resultInfo);
 
     // Display each recipe
@@ -79,9 +205,10 @@ function displaySearchResults(recipes, containerId, query) {
         const servingsText = recipe.servings ? `${recipe.servings} servings` : '';
 
         card.innerHTML = `
-            <img src="${recipe.image_url}" alt="${recipe.title}" width="180" height="180" style="object-fit: cover; display: block; margin: 0 auto;">
+            ${cardImage(recipe)}
             <h3>${recipe.title}</h3>
             <p class="muted">${servingsText}</p>
+            ${pantryBadge(recipe)}
             ${recipe.description ? `<p style="margin-top: 8px; font-size: 14px;">${recipe.description.substring(0, 100)}${recipe.description.length > 100 ? '...' : ''}</p>` : ''}
         `;
 
@@ -96,7 +223,7 @@ function displaySearchResults(recipes, containerId, query) {
  */
 async function loadRecentRecipes(containerId, limit = 10) {
     try {
-        const response = await fetch(`${API_BASE_URL}/recipes/recent/?limit=${limit}`);
+        const response = await fetchRecipeCards(`/recipes/recent/?limit=${limit}`);
 
         if (!response.ok) {
             throw new Error(`Failed to load recipes: ${response.statusText}`);
@@ -132,9 +259,10 @@ async function loadRecentRecipes(containerId, limit = 10) {
             const servingsText = recipe.servings ? `${recipe.servings} servings` : '';
 
             card.innerHTML = `
-                <img src="${recipe.image_url}" alt="${recipe.title}" width="180" height="180" style="object-fit: cover; display: block; margin: 0 auto;">
+                ${cardImage(recipe)}
                 <h3>${recipe.title}</h3>
                 <p class="muted">${servingsText}</p>
+                ${pantryBadge(recipe)}
                 ${recipe.description ? `<p style="margin-top: 8px; font-size: 14px;">${recipe.description.substring(0, 100)}${recipe.description.length > 100 ? '...' : ''}</p>` : ''}
             `;
 
@@ -169,7 +297,7 @@ async function loadRecipesByCategory(categoryId, containerId) {
         const category = await categoryResponse.json();
 
         // Fetch recipes for this category
-        const recipesResponse = await fetch(`${API_BASE_URL}/recipes/category/${categoryId}`);
+        const recipesResponse = await fetchRecipeCards(`/recipes/category/${categoryId}`);
         if (!recipesResponse.ok) {
             throw new Error(`Failed to load recipes: ${recipesResponse.statusText}`);
         }
@@ -215,9 +343,10 @@ async function loadRecipesByCategory(categoryId, containerId) {
             const servingsText = recipe.servings ? `${recipe.servings} servings` : '';
 
             card.innerHTML = `
-                <img src="${recipe.image_url}" alt="${recipe.title}" width="180" height="180" style="object-fit: cover; display: block; margin: 0 auto;">
+                ${cardImage(recipe)}
                 <h3>${recipe.title}</h3>
                 <p class="muted">${servingsText}</p>
+                ${pantryBadge(recipe)}
                 ${recipe.description ? `<p style="margin-top: 8px; font-size: 14px;">${recipe.description.substring(0, 100)}${recipe.description.length > 100 ? '...' : ''}</p>` : ''}
             `;
 
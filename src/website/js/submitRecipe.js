@@ -211,16 +211,17 @@ function initializeIngredientInput() {
 
             if (!ingredientName) return;
 
-            // Search for exact match
-            const searchResults = await searchIngredients(ingredientName);
-            const exactMatch = searchResults.find(
-                ing => ing.name.toLowerCase() === ingredientName.toLowerCase()
-            );
+            // Exact match after normalization ("butters " -> "Butter") or through an alias
+            const exactMatch = await resolveIngredient(ingredientName);
 
             if (exactMatch) {
                 addSelectedIngredient(exactMatch.id, exactMatch.name);
                 input.value = '';
-            } else if (searchResults.length > 0) {
+                return;
+            }
+
+            const searchResults = await searchIngredients(ingredientName);
+            if (searchResults.length > 0) {
                 // Ask user if they want to use suggested ingredient or create new
                 await new Promise((resolve) => {
                     showModal({
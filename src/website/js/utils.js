@@ -216,6 +216,24 @@ async function searchIngredients(query) {
     }
 }
 
+/**
+ * Resolve a typed name (any casing, plural or alias) to its canonical ingredient
+ * @param {string} name - Ingredient name
+ * @returns {Promise<Object|null>} - Ingredient object, or null if none matches
+ */
+async function resolveIngredient(name) {
+    try {
+        const response = await fetch(`${API_BASE_URL}/ingredient/resolve/?name=${encodeURIComponent(name)}`);
+        if (!response.ok) {
+            return null;
+        }
+        return await response.json();
+    } catch (error) {
+        console.error('Error resolving ingredient:', error);
+        return null;
+    }
+}
+
 /**
  * Create a new ingredient
  * @param {string} name - Ingredient name
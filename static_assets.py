@@ -0,0 +1,127 @@
+import email.utils
+import gzip
+import hashlib
+import http.server
+import os
+import re
+import shutil
+
+from src.api.util.compression import parse_accept_encoding
+
+try:
+	import brotli
+except ImportError:  # brotli is optional; .gz variants are always produced
+	brotli = None
+
+WEBSITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "website")
+BUILD_DIR = os.path.join(WEBSITE_DIR, "dist")
+
+# Assets referenced from HTML get a content hash in their name so they can be cached forever
+HASHED_EXTENSIONS = (".js", ".css", ".png")
+# Text assets get .br/.gz siblings at build time
+COMPRESSIBLE_EXTENSIONS = (".html", ".js", ".css")
+HASHED_NAME = re.compile(r"\.[0-9a-f]{10}\.[a-z]+$")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+def _content_hash(path: str) -> str:
+	with open(path, "rb") as f:
+		return hashlib.sha256(f.read()).hexdigest()[:10]
+
+
+def _source_files(source: str, output: str):
+	"""Yield (absolute path, posix relative path) for every source file, skipping the build dir."""
+	for root, dirs, files in os.walk(source):
+		dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != os.path.abspath(output)]
+		for name in files:
+			path = os.path.join(root, name)
+			yield path, os.path.relpath(path, source).replace(os.sep, "/")
+
+
+def _write_precompressed(path: str, data: bytes):
+	with open(path + ".gz", "wb") as f:
+		f.write(gzip.compress(data, compresslevel=9, mtime=0))
+	if brotli is not None:
+		with open(path + ".br", "wb") as f:
+			f.write(brotli.compress(data, quality=11))
+
+
+def build(source: str = WEBSITE_DIR, output: str = BUILD_DIR) -> dict:
+	"""Build the static site into ``output`` with hashed names and precompressed variants.
+
+	Returns the manifest mapping original relative paths to their hashed names.
+	"""
+	manifest = {}
+	for path, rel in _source_files(source, output):
+		if rel.endswith(HASHED_EXTENSIONS):
+			stem, ext = os.path.splitext(rel)
+			manifest[rel] = f"{stem}.{_content_hash(path)}{ext}"
+
+	# References appear as quoted attribute values, e.g. src="js/search.js"
+	names = sorted(manifest, key=len, reverse=True)
+	reference = re.compile(r"(?<=[\"'])(" + "|".join(re.escape(n) for n in names) + r")(?=[\"'])") if names else None
+
+	shutil.rmtree(output, ignore_errors=True)
+	for path, rel in _source_files(source, output):
+		target = os.path.join(output, manifest.get(rel, rel))
+		os.makedirs(os.path.dirname(target), exist_ok=True)
+
+		with open(path, "rb") as f:
+			data = f.read()
+		if rel.endswith(".html") and reference is not None:
+			data = reference.sub(lambda m: manifest[m.group(1)], data.decode("utf-8")).encode("utf-8")
+
+		with open(target, "wb") as f:
+			f.write(data)
+		if rel.endswith(COMPRESSIBLE_EXTENSIONS):
+			_write_precompressed(target, data)
+
+	return manifest
+
+
+class PrecompressedRequestHandler(http.server.SimpleHTTPRequestHandler):
+	"""Static file handler serving build-time .br/.gz variants and long-lived cache headers."""
+
+	def send_response(self, code, message=None):
+		self._status_code = code
+		super().send_response(code, message)
+
+	def end_headers(self):
+		if getattr(self, "_status_code", None) in (200, 304):
+			url_path = self.path.split("?", 1)[0].split("#", 1)[0]
+			cache = IMMUTABLE_CACHE if HASHED_NAME.search(url_path) else REVALIDATE_CACHE
+			self.send_header("Cache-Control", cache)
+			if url_path.endswith(COMPRESSIBLE_EXTENSIONS) or url_path.endswith("/"):
+				self.send_header("Vary", "Accept-Encoding")
+		super().end_headers()
+
+	def send_head(self):
+		path = self.translate_path(self.path)
+		if os.path.isdir(path):
+			if not self.path.split("?", 1)[0].endswith("/"):
+				return super().send_head()  # let the base class issue its trailing-slash redirect
+			path = os.path.join(path, "index.html")
+		if not path.endswith(COMPRESSIBLE_EXTENSIONS) or not os.path.isfile(path):
+			return super().send_head()
+
+		accepted = parse_accept_encoding(self.headers.get("Accept-Encoding", ""))
+		for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+			if accepted.get(encoding, accepted.get("*", 0.0)) > 0 and os.path.isfile(path + suffix):
+				f = open(path + suffix, "rb")
+				stat = os.fstat(f.fileno())
+				self.send_response(200)
+				self.send_header("Content-Type", self.guess_type(path))
+				self.send_header("Content-Encoding", encoding)
+				self.send_header("Content-Length", str(stat.st_size))
+				self.send_header("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True))
+				self.end_headers()
+				return f
+
+		return super().send_head()
+
+
+if __name__ == "__main__":
+	built = build()
+	print(f"Built {len(built)} hashed assets into {BUILD_DIR}")